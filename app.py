@@ -1,10 +1,16 @@
 import streamlit as st
 import os
-from emotion_classifier import EmotionClassifier
+from emotion_classifier import get_emotion_classifier
 
 # App title
 st.set_page_config(page_title="💬 MindEase Chatbot")
 
+# One model for the whole server process, shared by every browser session;
+# concurrent messages are batched together
+@st.cache_resource
+def load_emotion_classifier():
+    return get_emotion_classifier(batching=True)
+
 def clear_chat_history():
     st.session_state.messages = [{"role": "assistant", "text": "How may I assist you today?"}]
 
@@ -39,10 +45,7 @@ if prompt := st.chat_input("What's in your mind!"):
         st.markdown(prompt)
 
     # Get response from emotion classifier
-    if not hasattr(st.session_state, 'emotion_classifier'):
-        st.session_state.emotion_classifier = EmotionClassifier()
-    
-    result = st.session_state.emotion_classifier.classify(prompt)
+    result = load_emotion_classifier().classify(prompt)
     emotion = result["primary_emotion"]
     confidence = result["confidence"]
     
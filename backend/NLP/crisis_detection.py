@@ -0,0 +1,162 @@
+"""
+Crisis Detection for the Mental Health Chatbot
+
+Keeps a rolling crisis risk score for each session. Risk that builds up over
+several turns (a run of low-grade toxicity, repeated sensitive topics, a
+drift towards negative emotions) is easy to miss when every message is
+scored on its own. Re-scanning the whole conversation every turn would catch
+it, but its cost grows with the conversation. Instead each turn is folded
+into a small fixed-size state with exponential decay, which is O(1) per turn
+and is stored in UserInfo.risk_factors["rolling_risk"].
+"""
+
+from typing import Dict, Any, Optional, Iterable
+
+# Emotions, from either emotion classifier, that count towards negative drift
+NEGATIVE_EMOTIONS = {"sadness", "anxiety", "fear", "anger", "grief", "disgust"}
+
+RISK_LEVELS = ("low", "medium", "high")
+
+DEFAULT_WEIGHTS = {
+    "toxicity": 0.35,
+    "topics": 0.3,
+    "negative": 0.2,
+    "trend": 0.05,
+    "high_risk": 0.1
+}
+
+class CrisisDetector:
+    """Folds each turn into a rolling, decayed crisis risk state."""
+
+    def __init__(
+        self,
+        decay: float = 0.7,
+        fast_rate: float = 0.5,
+        slow_rate: float = 0.15,
+        weights: Optional[Dict[str, float]] = None,
+        medium_threshold: float = 0.4,
+        high_threshold: float = 0.6
+    ):
+        """Initialize the crisis detector.
+
+        Args:
+            decay: Share of the accumulated toxicity, topic counts and
+                high-risk count carried over to the next turn
+            fast_rate: Update rate of the short-term negative emotion average
+            slow_rate: Update rate of the long-term negative emotion average;
+                the gap between the two is the trend
+            weights: Weight of each component in the score; they should add up to 1
+            medium_threshold: Score from which the cumulative risk is medium
+            high_threshold: Score from which the cumulative risk is high
+        """
+        self.decay = decay
+        self.fast_rate = fast_rate
+        self.slow_rate = slow_rate
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.medium_threshold = medium_threshold
+        self.high_threshold = high_threshold
+
+    def new_state(self) -> Dict[str, Any]:
+        """Return the rolling state of a session without any turns."""
+        return {
+            "turns": 0,
+            "toxicity": 0.0,
+            "topics": {},
+            "high_risk": 0.0,
+            "negative_fast": 0.0,
+            "negative_slow": 0.0,
+            "score": 0.0
+        }
+
+    def update_safety(
+        self,
+        rolling: Optional[Dict[str, Any]],
+        toxicity: float,
+        topics: Iterable[str],
+        high_risk: bool
+    ) -> Dict[str, Any]:
+        """Fold the safety signals of a new turn into the rolling state.
+
+        Starts the turn: the previous signals are decayed once, then the
+        score is recomputed with the emotion averages of the turns before.
+
+        Args:
+            rolling: The rolling state, updated in place; None starts a new one
+            toxicity: Toxicity score of the message
+            topics: Sensitive topics found in the message
+            high_risk: Whether the message matched the high-risk lexicon
+
+        Returns:
+            The updated rolling state
+        """
+        if rolling is None:
+            rolling = self.new_state()
+        rolling["turns"] += 1
+
+        # Toxicity accumulates with decay, so a run of mildly toxic messages
+        # counts about as much as a single very toxic one
+        rolling["toxicity"] = rolling["toxicity"] * self.decay + toxicity
+
+        # Topic counts decay, and ones that have faded out are dropped, so the
+        # state stays bounded by the number of topics
+        counts = {topic: count * self.decay for topic, count in rolling["topics"].items()}
+        for topic in set(topics):
+            counts[topic] = counts.get(topic, 0.0) + 1.0
+        rolling["topics"] = {topic: round(count, 4) for topic, count in counts.items() if count >= 0.05}
+
+        rolling["high_risk"] = rolling["high_risk"] * self.decay + (1.0 if high_risk else 0.0)
+        rolling["score"] = self.score(rolling)
+        return rolling
+
+    def update_emotion(self, rolling: Dict[str, Any], emotion: str, confidence: float) -> Dict[str, Any]:
+        """Fold the emotion of the turn into the rolling state.
+
+        The score is not recomputed here; it includes the new averages from
+        the next safety update on.
+
+        Args:
+            rolling: The rolling state, updated in place
+            emotion: Primary emotion of the message
+            confidence: Confidence of the primary emotion
+
+        Returns:
+            The updated rolling state
+        """
+        negative = confidence if emotion in NEGATIVE_EMOTIONS else 0.0
+        rolling["negative_fast"] += self.fast_rate * (negative - rolling["negative_fast"])
+        rolling["negative_slow"] += self.slow_rate * (negative - rolling["negative_slow"])
+        return rolling
+
+    def score(self, rolling: Dict[str, Any]) -> float:
+        """Combine the rolling state into a risk score between 0 and 1.
+
+        Args:
+            rolling: The rolling state
+
+        Returns:
+            The cumulative risk score
+        """
+        trend = max(0.0, rolling["negative_fast"] - rolling["negative_slow"])
+        components = {
+            "toxicity": min(1.0, rolling["toxicity"]),
+            "topics": min(1.0, sum(rolling["topics"].values()) / 1.5),
+            "negative": rolling["negative_fast"],
+            "trend": min(1.0, trend * 2),
+            "high_risk": min(1.0, rolling["high_risk"])
+        }
+        return round(min(1.0, sum(self.weights[name] * value for name, value in components.items())), 4)
+
+    def risk_level(self, score: float) -> str:
+        """Map a cumulative score to a risk level.
+
+        Args:
+            score: The cumulative risk score
+
+        Returns:
+            "low", "medium" or "high"
+        """
+        if score >= self.high_threshold:
+            return "high"
+        if score >= self.medium_threshold:
+            return "medium"
+        return "low"
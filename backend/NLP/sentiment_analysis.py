@@ -0,0 +1,222 @@
+"""
+Sentiment Analysis for the Mental Health Chatbot
+
+A lexicon sentiment analyzer in the style of VADER, vectorized with NumPy.
+Words are looked up once in a vocabulary-to-index table. Their valences,
+and the negations and intensifiers before them, are then handled with array
+operations over every token of a batch at once, which keeps offline scoring
+of large message sets fast on a single core. Scores follow VADER's output:
+the shares of negative, neutral and positive sentiment and a compound
+valence between -1 and 1.
+"""
+
+from typing import Dict, List, Optional, Sequence
+import itertools
+import re
+import numpy as np
+
+# Valences on VADER's -4 to 4 scale for the vocabulary of the conversations
+# the chatbot sees; a full VADER lexicon file can be loaded instead
+LEXICON = {
+    # Distress
+    "sad": -2.1, "sadness": -1.9, "unhappy": -1.8, "miserable": -2.2, "depressed": -2.3,
+    "depression": -2.7, "down": -0.8, "lonely": -2.0, "alone": -1.0, "empty": -0.8,
+    "hopeless": -2.0, "worthless": -1.9, "useless": -1.8, "lost": -1.3, "broken": -1.4,
+    "grief": -2.2, "crying": -2.1, "cry": -2.1, "cried": -1.6, "tears": -0.9,
+    "tired": -1.9, "exhausted": -1.5, "numb": -1.0, "grey": -0.5, "guilty": -1.8,
+    "ashamed": -2.1, "shame": -2.1, "regret": -1.8, "failure": -2.3, "fail": -2.5,
+    # Anxiety
+    "anxious": -1.0, "anxiety": -0.7, "nervous": -1.1, "worry": -1.9, "worried": -1.2,
+    "worrying": -1.4, "afraid": -2.0, "scared": -1.9, "fear": -2.2, "panic": -2.3,
+    "stress": -1.8, "stressed": -1.4, "overwhelmed": -1.6, "racing": -0.5, "restless": -1.1,
+    # Anger
+    "angry": -2.3, "mad": -2.2, "furious": -2.6, "irritated": -1.6, "annoyed": -1.6,
+    "frustrated": -2.4, "rage": -2.6, "hate": -2.7, "hated": -3.2, "yelled": -1.3,
+    # Harm
+    "die": -2.9, "dead": -3.3, "death": -2.9, "kill": -3.7, "suicide": -3.5,
+    "hurt": -2.4, "harm": -2.2, "pain": -2.3, "painful": -2.2, "abuse": -3.2,
+    # General negative
+    "bad": -2.5, "worse": -2.1, "worst": -3.1, "terrible": -2.1, "awful": -2.0,
+    "horrible": -2.5, "stupid": -2.4, "idiot": -2.3, "dumb": -2.3, "wrong": -2.1,
+    "problem": -1.7, "problems": -1.7, "difficult": -1.5, "hard": -0.4, "struggle": -1.4,
+    "struggling": -1.6,
+    # Positive
+    "happy": 2.7, "glad": 2.0, "joy": 2.8, "joyful": 2.9, "excited": 2.4,
+    "good": 1.9, "great": 3.1, "fantastic": 2.6, "wonderful": 2.7, "amazing": 2.8,
+    "nice": 1.8, "better": 1.9, "best": 3.2, "fine": 0.8, "okay": 0.9, "ok": 1.2,
+    "calm": 1.3, "relaxed": 2.2, "relief": 2.1, "peaceful": 2.2, "safe": 1.9,
+    "hope": 1.9, "hopeful": 2.3, "love": 3.2, "loved": 2.9, "enjoy": 2.2,
+    "fun": 2.3, "proud": 2.1, "grateful": 2.0, "thanks": 1.9, "thank": 1.5,
+    "helped": 1.2, "helpful": 1.8, "support": 1.7, "supported": 1.9, "comfort": 1.5,
+    "strong": 2.3, "confident": 2.2, "smile": 1.5, "laugh": 2.6, "well": 1.1,
+}
+
+NEGATIONS = [
+    "not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "nowhere",
+    "cannot", "without", "dont", "cant", "wont", "isnt", "arent", "wasnt", "didnt",
+    "doesnt", "couldnt", "shouldnt", "wouldnt", "havent", "hasnt", "aint"
+]
+
+# Intensifiers raise the magnitude of the word after them, dampeners lower it
+BOOSTERS = {
+    **{word: 0.293 for word in [
+        "very", "really", "so", "extremely", "incredibly", "totally", "absolutely",
+        "completely", "too", "such", "super", "deeply", "truly", "utterly", "especially",
+        "entirely", "highly", "hugely", "most", "more", "quite", "terribly", "awfully"
+    ]},
+    **{word: -0.293 for word in [
+        "slightly", "somewhat", "kind", "sort", "barely", "hardly", "little", "bit",
+        "marginally", "occasionally", "partly", "scarcely", "less"
+    ]}
+}
+
+NEGATION_SCALAR = -0.74
+BUT_BEFORE = 0.5
+BUT_AFTER = 1.5
+EXCLAMATION_BOOST = 0.292
+NORMALIZATION_ALPHA = 15.0
+
+TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+class SentimentAnalyzer:
+    """Vectorized lexicon sentiment analyzer with single-message and batch APIs."""
+
+    def __init__(self, lexicon: Optional[Dict[str, float]] = None, lexicon_path: Optional[str] = None):
+        """Initialize the analyzer and build its lookup tables.
+
+        Args:
+            lexicon: Word valences on the -4 to 4 scale; the built-in lexicon by default
+            lexicon_path: Optional VADER lexicon file (word, tab, mean valence, ...)
+                to load instead
+        """
+        if lexicon_path:
+            lexicon = self.load_lexicon(lexicon_path)
+        lexicon = dict(lexicon if lexicon is not None else LEXICON)
+
+        # Index 0 is every unknown word, and the last index every other
+        # contraction ending in n't
+        vocabulary = ["<unk>"] + sorted(set(lexicon) | set(NEGATIONS) | set(BOOSTERS)) + ["<n't>"]
+        self.index = {word: i for i, word in enumerate(vocabulary)}
+        self._contraction = len(vocabulary) - 1
+        self._but = self.index.setdefault("but", len(vocabulary))
+        size = len(self.index)
+
+        self.valence = np.zeros(size)
+        self.is_negation = np.zeros(size, dtype=bool)
+        self.booster = np.zeros(size)
+        for word, value in lexicon.items():
+            self.valence[self.index[word]] = value
+        for word in NEGATIONS:
+            self.is_negation[self.index[word]] = True
+        self.is_negation[self._contraction] = True
+        for word, value in BOOSTERS.items():
+            self.booster[self.index[word]] = value
+
+    @staticmethod
+    def load_lexicon(path: str) -> Dict[str, float]:
+        """Read a VADER lexicon file.
+
+        Args:
+            path: Path to the file
+
+        Returns:
+            The word valences
+        """
+        lexicon = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) >= 2:
+                    lexicon[fields[0].lower()] = float(fields[1])
+        return lexicon
+
+    def _token_ids(self, tokens: List[str]) -> np.ndarray:
+        index = self.index
+        contraction = self._contraction
+        return np.fromiter(
+            (index.get(token, contraction if token.endswith("n't") else 0) for token in tokens),
+            dtype=np.intp,
+            count=len(tokens)
+        )
+
+    def polarity_scores_batch(self, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Score the sentiment of a batch of texts.
+
+        Args:
+            texts: The texts to score
+
+        Returns:
+            A dictionary of arrays, one value per text: "neg", "neu" and "pos"
+            (shares of the sentiment, adding up to 1 for texts with any
+            words) and "compound" (valence between -1 and 1)
+        """
+        n = len(texts)
+        lowered = [text.lower().replace("’", "'") for text in texts]
+        per_text = [TOKEN_PATTERN.findall(text) for text in lowered]
+        counts = np.fromiter((len(tokens) for tokens in per_text), dtype=np.intp, count=n)
+        tokens = list(itertools.chain.from_iterable(per_text))
+        ids = self._token_ids(tokens)
+        text_ids = np.repeat(np.arange(n), counts)
+
+        valence = self.valence[ids]
+        is_negation = self.is_negation[ids]
+        booster = self.booster[ids]
+        sentiment = valence != 0
+
+        # Look back up to three words within the same text, as VADER does:
+        # intensifiers add to the magnitude (less the further away they are)
+        # and a negation flips and dampens the valence
+        boost = np.zeros(len(ids))
+        negated = np.zeros(len(ids), dtype=bool)
+        for distance, damping in ((1, 1.0), (2, 0.95), (3, 0.9)):
+            if len(ids) <= distance:
+                break
+            same_text = text_ids[distance:] == text_ids[:-distance]
+            boost[distance:] += np.where(same_text, booster[:-distance] * damping, 0.0)
+            negated[distance:] |= same_text & is_negation[:-distance]
+        valence = np.where(sentiment, valence + np.sign(valence) * boost, 0.0)
+        valence = np.where(negated & sentiment, valence * NEGATION_SCALAR, valence)
+
+        # Words after "but" count more and the ones before it less
+        is_but = ids == self._but
+        buts = np.concatenate(([0], np.cumsum(is_but)))
+        text_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        after_but = buts[1:] - buts[text_starts][text_ids] > 0
+        buts_in_text = np.bincount(text_ids, weights=is_but, minlength=n)
+        before_but = ~after_but & (buts_in_text[text_ids] > 0)
+        valence = valence * np.where(after_but, BUT_AFTER, np.where(before_but, BUT_BEFORE, 1.0))
+
+        # Exclamation marks emphasize whichever way the text leans
+        emphasis = np.fromiter((min(text.count("!"), 4) for text in texts), dtype=float, count=n) * EXCLAMATION_BOOST
+
+        total = np.bincount(text_ids, weights=valence, minlength=n)
+        total = total + np.sign(total) * emphasis
+        compound = total / np.sqrt(total * total + NORMALIZATION_ALPHA)
+
+        positive = np.bincount(text_ids, weights=np.where(valence > 0, valence + 1, 0.0), minlength=n)
+        negative = -np.bincount(text_ids, weights=np.where(valence < 0, valence - 1, 0.0), minlength=n)
+        neutral = np.bincount(text_ids, weights=(valence == 0).astype(float), minlength=n)
+        leans_positive = positive > negative
+        positive = positive + np.where(leans_positive & (positive > 0), emphasis, 0.0)
+        negative = negative + np.where(~leans_positive & (negative > 0), emphasis, 0.0)
+        words = positive + negative + neutral
+        share = np.divide(1.0, words, out=np.zeros(n), where=words > 0)
+
+        return {
+            "neg": np.round(negative * share, 3),
+            "neu": np.round(neutral * share, 3),
+            "pos": np.round(positive * share, 3),
+            "compound": np.round(compound, 4)
+        }
+
+    def polarity_scores(self, text: str) -> Dict[str, float]:
+        """Score the sentiment of one text.
+
+        Args:
+            text: The text to score
+
+        Returns:
+            A dictionary with "neg", "neu", "pos" and "compound" scores
+        """
+        scores = self.polarity_scores_batch([text])
+        return {name: float(values[0]) for name, values in scores.items()}
@@ -0,0 +1,202 @@
+"""
+Admission control for the Mental Health Chatbot API
+
+Limits how many turns run at once and queues the rest in two lanes. A
+cheap pre-screen with the high-risk lexicon puts crisis messages in a
+priority lane that is served first and has reserved capacity, so they do
+not wait behind routine traffic. Routine requests are shed with a fast 503
+and a retry hint when the queue is too deep or queue waits are too long.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, Callable, Deque
+
+from agents.metrics import metrics
+from agents.safety_agent import HIGH_RISK_KEYWORDS
+from ml_models.keyword_matcher import shared_matcher
+
+CRISIS = "crisis"
+ROUTINE = "routine"
+LANES = (CRISIS, ROUTINE)
+
+metrics.histogram("chatbot_admission_wait_seconds", "Time requests waited for a slot, by lane")
+metrics.counter("chatbot_admission_admitted_total", "Requests admitted, by lane")
+metrics.counter("chatbot_admission_shed_total", "Requests rejected with 503, by lane and reason")
+metrics.gauge("chatbot_admission_queue_depth", "Requests waiting for a slot, by lane")
+metrics.gauge("chatbot_admission_active", "Requests holding a slot")
+
+class Overloaded(Exception):
+    """Raised when a request is shed; carries a Retry-After hint in seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Service overloaded ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+def crisis_prescreen(text: str) -> bool:
+    """Check a message against the high-risk lexicon.
+
+    Uses the shared keyword matcher, so the SafetyAgent reuses the scan
+    later in the same turn.
+    """
+    return bool(shared_matcher.match(text).get("safety.high_risk"))
+
+class AdmissionController:
+    """Bounded, two-lane admission for chat turns."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 32,
+        max_queue: int = 256,
+        max_queue_wait: float = 2.0,
+        crisis_reserve: int = 8,
+        prescreen: Optional[Callable[[str], bool]] = crisis_prescreen
+    ):
+        """Initialize the admission controller.
+
+        Args:
+            max_concurrent: Number of turns that may run at once
+            max_queue: Maximum number of routine requests waiting for a slot
+            max_queue_wait: Routine requests are shed while the recent queue
+                wait exceeds this many seconds
+            crisis_reserve: Extra slots that only crisis requests may use
+            prescreen: Function telling whether a message belongs in the crisis lane
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self.crisis_reserve = crisis_reserve
+        self.prescreen = prescreen
+        if prescreen is crisis_prescreen:
+            shared_matcher.register("safety.high_risk", HIGH_RISK_KEYWORDS)
+
+        self.active = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        # Moving averages of the routine queue wait and of the time a slot is held
+        self._routine_wait = 0.0
+        self._service_time = 0.05
+
+    def _limit(self, lane: str) -> int:
+        return self.max_concurrent + (self.crisis_reserve if lane == CRISIS else 0)
+
+    def retry_after(self) -> int:
+        """Estimate how long the queued work takes to drain, in whole seconds."""
+        queued = sum(len(waiters) for waiters in self._waiters.values())
+        return max(1, math.ceil((queued + self.active) * self._service_time / self.max_concurrent))
+
+    def screen(self, message: str) -> str:
+        """Pick the lane for a message and shed routine requests under overload.
+
+        Args:
+            message: The user message
+
+        Returns:
+            The lane, CRISIS or ROUTINE
+
+        Raises:
+            Overloaded: If a routine request must be rejected
+        """
+        if self.prescreen is not None and self.prescreen(message):
+            return CRISIS
+        reason = None
+        if len(self._waiters[ROUTINE]) >= self.max_queue:
+            reason = "queue_full"
+        elif self._waiters[ROUTINE] and self._routine_wait > self.max_queue_wait:
+            reason = "queue_wait"
+        if reason:
+            metrics.inc("chatbot_admission_shed_total", lane=ROUTINE, reason=reason)
+            raise Overloaded(reason, self.retry_after())
+        return ROUTINE
+
+    async def _acquire(self, lane: str):
+        # Crisis requests only wait for other crisis requests; routine ones
+        # also let any queued request go first
+        ahead = self._waiters[CRISIS] if lane == CRISIS else [w for waiters in self._waiters.values() for w in waiters]
+        if self.active < self._limit(lane) and not ahead:
+            self.active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the request was cancelled
+                self._release()
+            else:
+                self._waiters[lane].remove(waiter)
+            raise
+
+    def _release(self):
+        # Hand the slot straight to the next waiter, crisis lane first
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    if lane == CRISIS or self.active <= self.max_concurrent:
+                        waiter.set_result(None)
+                        return
+                    # A reserved crisis slot is freed; routine waiters keep waiting
+                    waiters.appendleft(waiter)
+                    self.active -= 1
+                    return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, lane: str):
+        """Hold a slot for one turn, waiting in the given lane if needed."""
+        queued_at = time.perf_counter()
+        await self._acquire(lane)
+        started = time.perf_counter()
+        wait = started - queued_at
+        if lane == ROUTINE:
+            self._routine_wait = 0.8 * self._routine_wait + 0.2 * wait
+        metrics.observe("chatbot_admission_wait_seconds", wait, lane=lane)
+        metrics.inc("chatbot_admission_admitted_total", lane=lane)
+        try:
+            yield lane
+        finally:
+            self._service_time = 0.9 * self._service_time + 0.1 * (time.perf_counter() - started)
+            self._release()
+
+    @asynccontextmanager
+    async def admit(self, message: str):
+        """Screen a message and hold a slot in its lane for one turn.
+
+        Raises:
+            Overloaded: If a routine request must be rejected
+        """
+        async with self.slot(self.screen(message)) as lane:
+            yield lane
+
+    def stats(self) -> Dict[str, Any]:
+        """Refresh the admission gauges and return the current load."""
+        depths = {lane: len(waiters) for lane, waiters in self._waiters.items()}
+        for lane, depth in depths.items():
+            metrics.set("chatbot_admission_queue_depth", depth, lane=lane)
+        metrics.set("chatbot_admission_active", self.active)
+        return {
+            "active": self.active,
+            "queued": depths,
+            "routine_wait_seconds": self._routine_wait,
+            "service_time_seconds": self._service_time
+        }
+
+def create_admission_controller() -> AdmissionController:
+    """Create the admission controller configured by environment variables.
+
+    ADMISSION_MAX_CONCURRENT, ADMISSION_MAX_QUEUE, ADMISSION_MAX_QUEUE_WAIT
+    and ADMISSION_CRISIS_RESERVE override the defaults.
+    """
+    return AdmissionController(
+        max_concurrent=int(os.getenv("ADMISSION_MAX_CONCURRENT", 32)),
+        max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", 256)),
+        max_queue_wait=float(os.getenv("ADMISSION_MAX_QUEUE_WAIT", 2.0)),
+        crisis_reserve=int(os.getenv("ADMISSION_CRISIS_RESERVE", 8))
+    )
@@ -11,6 +11,7 @@ from .resource_agent import ResourceAgent
 from .safety_agent import SafetyAgent
 from .memory_agent import MemoryAgent
 from .graph import create_agent_graph, ChatbotState
+from .executor import StaticGraphExecutor
 
 __all__ = [
     "TriageAgent",
@@ -19,5 +20,6 @@ __all__ = [
     "SafetyAgent",
     "MemoryAgent",
     "create_agent_graph",
+    "StaticGraphExecutor",
     "ChatbotState"
 ] 
\ No newline at end of file
@@ -5,45 +5,199 @@ This serves as the foundation for all specialized agents in the system.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import threading
+import time
+from .state import ChatbotState, GraphState, as_chatbot_state
+from .metrics import metrics
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_agent_executor() -> ThreadPoolExecutor:
+    """Return the bounded thread pool shared by CPU-bound agents.
+    
+    The pool size is read from AGENT_WORKERS and defaults to the number of
+    CPUs, capped at 8. At least two workers are used by default so that the
+    parallel safety and emotion branches overlap even on a single CPU; model
+    inference releases the GIL while it runs.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = int(os.getenv("AGENT_WORKERS", max(2, min(8, os.cpu_count() or 1))))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent")
+    return _executor
+
+_transformer_executor: Optional[ThreadPoolExecutor] = None
+
+def get_transformer_executor() -> ThreadPoolExecutor:
+    """Return the thread pool reserved for transformer inference.
+    
+    The triage agent runs on the agent pool and waits for the transformer,
+    so the transformer must not queue behind the agents on that same pool:
+    with every agent worker blocked on a transformer call, nothing would be
+    left to run it. The pool size is read from TRANSFORMER_WORKERS and
+    defaults to 1, since inference already uses the CPUs it is given.
+    """
+    global _transformer_executor
+    if _transformer_executor is None:
+        with _executor_lock:
+            if _transformer_executor is None:
+                workers = int(os.getenv("TRANSFORMER_WORKERS", 1))
+                _transformer_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="transformer")
+    return _transformer_executor
 
 class BaseAgent(ABC):
     """Base agent class that all specialized agents must inherit from."""
     
-    def __init__(self, model_name: str, parameters: Optional[Dict[str, Any]] = None):
+    # Agents that run model inference set this so that the async path
+    # runs them on the shared executor instead of the event loop
+    cpu_bound = False
+    
+    def __init__(self, model_name: str, parameters: Optional[Dict[str, Any]] = None, lazy: bool = False):
         """Initialize the base agent.
         
         Args:
             model_name: The name of the model to use for this agent
             parameters: Optional parameters for model configuration
+            lazy: Defer initialize() until ensure_initialized() or first use
         """
         self.model_name = model_name
         self.parameters = parameters or {}
-        self.initialize()
+        self.initialized = False
+        self.load_time: Optional[float] = None
+        self._init_lock = threading.Lock()
+        if not lazy:
+            self.ensure_initialized()
+        
+    @property
+    def name(self) -> str:
+        """Short name of the agent, as used for its graph node and metrics."""
+        return type(self).__name__.replace("Agent", "").lower()
         
     def initialize(self):
         """Initialize any resources needed by the agent."""
         pass
         
+    def ensure_initialized(self):
+        """Run initialize() once, recording how long it took.
+        
+        Safe to call from several threads; later callers wait for the first.
+        """
+        if self.initialized:
+            return
+        with self._init_lock:
+            if not self.initialized:
+                started = time.perf_counter()
+                self.initialize()
+                self.load_time = time.perf_counter() - started
+                self.initialized = True
+        
+    def prepare(self, state: ChatbotState) -> Optional[Dict[str, Any]]:
+        """Compute this agent's changes to the state without applying them.
+        
+        Agents that can run speculatively, before the turn is routed to them,
+        override this and use take_changes() in process().
+        
+        Args:
+            state: The current chatbot state
+            
+        Returns:
+            The changes by field name, or None if there is nothing to change
+        """
+        return None
+        
+    def take_changes(self, state: ChatbotState) -> Optional[Dict[str, Any]]:
+        """Return the changes prepared speculatively for this turn, or prepare them now."""
+        changes = state.candidates.pop(self.name, None)
+        return changes if changes is not None else self.prepare(state)
+        
+    def apply(self, state: ChatbotState, changes: Optional[Dict[str, Any]]) -> ChatbotState:
+        """Apply changes from prepare() to the state.
+        
+        Dictionary fields are merged; other fields are replaced.
+        """
+        for field, value in (changes or {}).items():
+            if isinstance(value, dict):
+                getattr(state, field).update(value)
+            else:
+                setattr(state, field, value)
+        return state
+        
     @abstractmethod
-    def process(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
-        """Process the inputs and generate a response.
+    def process(self, state: ChatbotState) -> ChatbotState:
+        """Process the state and generate a response.
+        
+        Agents update the live state in place and return it, so no copy of
+        the conversation is made between nodes.
         
         Args:
-            inputs: A dictionary containing the input data
+            state: The current chatbot state
             
         Returns:
-            A dictionary containing the processed output
+            The updated chatbot state
         """
         pass
     
-    def __call__(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    def __call__(self, inputs: Union[ChatbotState, GraphState, Dict[str, Any]]) -> Union[ChatbotState, GraphState, Dict[str, Any]]:
         """Make the agent callable.
         
+        The output has the same shape as the input: a live ChatbotState, a
+        GraphState envelope (as used by the agent graph) or, for callers
+        working with dumped states, a plain dictionary.
+        
+        Args:
+            inputs: The state to process
+            
+        Returns:
+            The processed state, in the same shape as the inputs
+        """
+        self.ensure_initialized()
+        with metrics.timer("chatbot_agent", agent=self.name):
+            state = self.process(as_chatbot_state(inputs))
+        if isinstance(inputs, ChatbotState):
+            return state
+        if isinstance(inputs.get("state"), ChatbotState):
+            return {"state": state}
+        return state.model_dump()
+    
+    async def aprocess(self, state: ChatbotState) -> ChatbotState:
+        """Process the state without blocking the event loop.
+        
+        CPU-bound agents run process() on the shared agent executor; other
+        agents are cheap enough to run inline.
+        
+        Args:
+            state: The current chatbot state
+            
+        Returns:
+            The updated chatbot state
+        """
+        if self.cpu_bound:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(get_agent_executor(), self.process, state)
+        return self.process(state)
+    
+    async def acall(self, inputs: Union[ChatbotState, GraphState, Dict[str, Any]]) -> Union[ChatbotState, GraphState, Dict[str, Any]]:
+        """Async counterpart of __call__, used when the graph runs with ainvoke.
+        
         Args:
-            inputs: A dictionary containing the input data
+            inputs: The state to process
             
         Returns:
-            A dictionary containing the processed output
+            The processed state, in the same shape as the inputs
         """
-        return self.process(inputs) 
\ No newline at end of file
+        if not self.initialized:
+            await asyncio.to_thread(self.ensure_initialized)
+        with metrics.timer("chatbot_agent", agent=self.name):
+            state = await self.aprocess(as_chatbot_state(inputs))
+        if isinstance(inputs, ChatbotState):
+            return state
+        if isinstance(inputs.get("state"), ChatbotState):
+            return {"state": state}
+        return state.model_dump()
\ No newline at end of file
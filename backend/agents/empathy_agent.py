@@ -18,14 +18,15 @@ from .state import ChatbotState
 class EmpathyAgent(BaseAgent):
     """Agent responsible for providing empathetic responses."""
     
-    def __init__(self, model_name: str = "empathy-llm", parameters: Optional[Dict[str, Any]] = None):
+    def __init__(self, model_name: str = "empathy-llm", parameters: Optional[Dict[str, Any]] = None, lazy: bool = False):
         """Initialize the Empathy Agent.
         
         Args:
             model_name: The name of the language model to use
             parameters: Optional parameters for the language model
+            lazy: Defer initialize() until the agent is first used
         """
-        super().__init__(model_name, parameters)
+        super().__init__(model_name, parameters, lazy)
         
     def initialize(self):
         """Initialize resources for the empathy agent."""
@@ -93,21 +94,20 @@ class EmpathyAgent(BaseAgent):
         
         return response
         
-    def process(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
-        """Process the user input to generate an empathetic response.
+    def prepare(self, state: ChatbotState) -> Optional[Dict[str, Any]]:
+        """Generate an empathetic response without adding it to the state.
         
         Args:
-            inputs: The input state containing user message and emotion analysis
+            state: The current chatbot state containing user message and emotion analysis
             
         Returns:
-            Updated state with empathetic response
+            The response as state changes, or None
         """
-        state = ChatbotState.model_validate(inputs)
         user_input = state.current_user_input
         
         if not user_input or not state.emotion_analysis:
             # Cannot generate empathetic response without input and emotion analysis
-            return state.model_dump()
+            return None
             
         # Get the primary emotion
         primary_emotion = state.emotion_analysis.primary_emotion
@@ -115,7 +115,17 @@ class EmpathyAgent(BaseAgent):
         # Create empathetic response
         response = self.create_empathetic_response(primary_emotion, user_input)
         
-        # Update the state
-        state.agent_responses["empathy"] = response
+        return {"agent_responses": {"empathy": response}}
+        
+    def process(self, state: ChatbotState) -> ChatbotState:
+        """Process the user input to generate an empathetic response.
+        
+        Uses the response prepared speculatively for this turn, if any.
         
-        return state.model_dump() 
\ No newline at end of file
+        Args:
+            state: The current chatbot state containing user message and emotion analysis
+            
+        Returns:
+            Updated state with empathetic response
+        """
+        return self.apply(state, self.take_changes(state)) 
\ No newline at end of file
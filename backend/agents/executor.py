@@ -0,0 +1,107 @@
+"""
+Native executor for the Mental Health Chatbot agent pipeline.
+
+The agent graph is a small fixed DAG, so it can be run as direct calls on
+the shared live state instead of through LangGraph's channels. This
+executor takes the same topology as create_agent_graph and exposes the
+invoke/ainvoke/astream methods the API uses.
+"""
+
+from typing import Dict, Any, Optional, Callable, Tuple, Union, Iterator, AsyncIterator
+from .base_agent import BaseAgent
+from .state import ChatbotState, GraphState, as_chatbot_state
+
+END = "__end__"
+
+# A route function and the mapping from its decisions to node names
+ConditionalEdge = Tuple[Callable[[ChatbotState], str], Dict[str, str]]
+
+class StaticGraphExecutor:
+    """Runs a fixed graph of agents as direct calls on one live state."""
+
+    def __init__(
+        self,
+        nodes: Dict[str, BaseAgent],
+        edges: Dict[str, Union[str, ConditionalEdge]],
+        entry: Union[str, ConditionalEdge],
+        max_steps: int = 25
+    ):
+        """Initialize the executor.
+
+        Args:
+            nodes: The agents, by node name
+            edges: For each node, the next node name or a conditional edge
+            entry: The first node name or a conditional edge choosing it
+            max_steps: Maximum number of nodes run in one turn, guarding against cycles
+        """
+        for source, edge in list(edges.items()) + [(None, entry)]:
+            targets = [edge] if isinstance(edge, str) else list(edge[1].values())
+            for target in targets:
+                if target != END and target not in nodes:
+                    raise ValueError(f"Edge from {source or 'entry'} leads to unknown node {target!r}")
+        missing = [name for name in nodes if name not in edges]
+        if missing:
+            raise ValueError(f"Nodes without an outgoing edge: {', '.join(missing)}")
+        self.nodes = nodes
+        self.edges = edges
+        self.entry = entry
+        self.max_steps = max_steps
+
+    def _next(self, edge: Union[str, ConditionalEdge], state: ChatbotState) -> str:
+        if isinstance(edge, str):
+            return edge
+        route, mapping = edge
+        return mapping[route(state)]
+
+    def _steps(self, state: ChatbotState) -> Iterator[str]:
+        """Yield the node names to run; each is chosen after the previous one has run."""
+        node = self._next(self.entry, state)
+        for _ in range(self.max_steps):
+            if node == END:
+                return
+            yield node
+            node = self._next(self.edges[node], state)
+        raise RuntimeError(f"Agent graph did not finish within {self.max_steps} steps")
+
+    def invoke(self, inputs: Union[GraphState, Dict[str, Any]], config: Optional[Dict[str, Any]] = None) -> GraphState:
+        """Run one turn.
+
+        Args:
+            inputs: A GraphState envelope (or a dumped state)
+            config: Accepted for compatibility with compiled LangGraph graphs; unused
+
+        Returns:
+            A GraphState envelope holding the updated live state
+        """
+        state = as_chatbot_state(inputs)
+        for node in self._steps(state):
+            self.nodes[node](state)
+        return {"state": state}
+
+    async def ainvoke(self, inputs: Union[GraphState, Dict[str, Any]], config: Optional[Dict[str, Any]] = None) -> GraphState:
+        """Run one turn using the agents' async path."""
+        state = as_chatbot_state(inputs)
+        for node in self._steps(state):
+            await self.nodes[node].acall(state)
+        return {"state": state}
+
+    async def astream(
+        self,
+        inputs: Union[GraphState, Dict[str, Any]],
+        config: Optional[Dict[str, Any]] = None,
+        stream_mode: str = "updates"
+    ) -> AsyncIterator[Dict[str, GraphState]]:
+        """Run one turn, yielding {node: GraphState} after each node like LangGraph's "updates" mode."""
+        if stream_mode != "updates":
+            raise ValueError(f"Unsupported stream mode: {stream_mode}")
+        state = as_chatbot_state(inputs)
+        # An update is yielded once the route out of its node has run, as in
+        # LangGraph, so changes made by routing functions are already visible
+        update = None
+        for node in self._steps(state):
+            if update is not None:
+                yield update
+            await self.nodes[node].acall(state)
+            update = {node: {"state": state}}
+        if update is not None:
+            yield update
@@ -3,9 +3,14 @@ Graph orchestration for the Mental Health Chatbot using Langgraph.
 
 This module defines the flow logic for connecting the specialized agents.
 """
-from typing import Dict, Any, Annotated, TypeVar, Literal
+from typing import Dict, Any, Annotated, TypeVar, Literal, Callable, Optional, Tuple, Union
+import os
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
-from .state import ChatbotState
+from .base_agent import BaseAgent
+from .executor import StaticGraphExecutor, ConditionalEdge
+from .parallel import EmotionPrefetchAgent, SpeculativeAgent
+from .state import ChatbotState, GraphState
 
 # Import the agents
 from .triage_agent import TriageAgent
@@ -17,6 +22,9 @@ from .memory_agent import MemoryAgent
 # Type for agent decisions
 AgentDecision = Literal["triage", "empathy", "resource", "safety", "memory", "end"]
 
+# Response for messages that need a human to step in
+HUMAN_INTERVENTION_MESSAGE = "I'm connecting you with a mental health professional who can better assist you."
+
 def should_run_safety_check(state: ChatbotState) -> AgentDecision:
     """Decide if safety check should be run."""
     # Always run safety check for new user inputs
@@ -30,7 +38,7 @@ def route_based_on_triage(state: ChatbotState) -> AgentDecision:
     if state.safety_check and not state.safety_check.is_safe:
         if state.safety_check.needs_human_intervention:
             # End with a message about human intervention
-            state.final_response = "I'm connecting you with a mental health professional who can better assist you."
+            state.final_response = HUMAN_INTERVENTION_MESSAGE
             return "end"
         # Otherwise continue with a warning
         state.agent_responses["safety_warning"] = "Please note that I'm an AI assistant and not a substitute for professional mental health support."
@@ -54,13 +62,84 @@ def should_end_conversation(state: ChatbotState) -> bool:
     # End if we have a final response
     return state.final_response is not None
 
+def on_live_state(route: Callable[[ChatbotState], AgentDecision]) -> Callable[[GraphState], AgentDecision]:
+    """Adapt a routing function to the GraphState envelope.
+    
+    The routing function receives the live state, so changes it makes (such
+    as the safety warning) are kept for the rest of the turn.
+    """
+    return lambda inputs: route(inputs["state"])
+
+def as_node(agent: BaseAgent) -> RunnableLambda:
+    """Wrap an agent as a graph node with both sync and async entry points.
+    
+    invoke() calls the agent directly, while ainvoke() uses its async path
+    so CPU-bound agents run on the shared executor.
+    """
+    return RunnableLambda(agent.__call__, afunc=agent.acall, name=type(agent).__name__)
+
+def agent_topology(
+    triage_agent: TriageAgent,
+    empathy_agent: EmpathyAgent,
+    resource_agent: ResourceAgent,
+    safety_agent: SafetyAgent,
+    memory_agent: MemoryAgent,
+    parallel: bool = True,
+) -> Tuple[Dict[str, BaseAgent], Dict[str, Union[str, ConditionalEdge]], ConditionalEdge]:
+    """Describe the agent graph as data, shared by both executors.
+    
+    With parallel set, a "prefetch" node starts the emotion classification
+    in the background before the "safety" node runs. The "emotion" node then
+    collects it and, unless the safety check called for human intervention,
+    speculatively prepares the empathy and resource responses.
+    
+    Returns:
+        The agents by node name, each node's outgoing edge (a node name or a
+        route function with its decision mapping) and the conditional entry
+    """
+    nodes = {
+        "safety": safety_agent,
+        "triage": triage_agent,
+        "empathy": empathy_agent,
+        "resource": resource_agent,
+        "memory": memory_agent
+    }
+    edges = {
+        "safety": "triage",
+        "triage": (route_based_on_triage, {
+            "empathy": "empathy",
+            "resource": "resource",
+            "memory": "memory",
+            "end": END
+        }),
+        "empathy": "memory",
+        "resource": "memory",
+        "memory": END
+    }
+    entry = (should_run_safety_check, {
+        "safety": "safety",
+        "triage": "triage"
+    })
+    
+    if parallel:
+        speculative = SpeculativeAgent(triage_agent, [empathy_agent, resource_agent])
+        nodes = {"prefetch": EmotionPrefetchAgent(speculative), "emotion": speculative, **nodes}
+        edges = {"prefetch": "safety", "emotion": "triage", **edges, "safety": "emotion"}
+        entry = (should_run_safety_check, {
+            "safety": "prefetch",
+            "triage": "triage"
+        })
+    return nodes, edges, entry
+
 def create_agent_graph(
     triage_agent: TriageAgent,
     empathy_agent: EmpathyAgent,
     resource_agent: ResourceAgent,
     safety_agent: SafetyAgent,
     memory_agent: MemoryAgent,
-) -> StateGraph:
+    executor: Optional[str] = None,
+    parallel: Optional[bool] = None,
+) -> Union[StateGraph, StaticGraphExecutor]:
     """Create the agent graph for the mental health chatbot.
     
     Args:
@@ -69,37 +148,44 @@ def create_agent_graph(
         resource_agent: The agent for providing mental health resources
         safety_agent: The agent for safety checks
         memory_agent: The agent for managing conversation context
+        executor: "langgraph" or "native"; defaults to the AGENT_EXECUTOR
+            environment variable, then "langgraph"
+        parallel: Run the emotion analysis while the safety check runs and
+            prepare responses speculatively; defaults to the AGENT_PARALLEL
+            environment variable, then on
         
     Returns:
-        A Langgraph StateGraph for orchestrating the agents
+        A compiled Langgraph StateGraph, or a StaticGraphExecutor running the
+        same graph as direct calls. Both are invoked with and return a
+        GraphState envelope.
     """
-    # Create the graph
-    graph = StateGraph(ChatbotState)
+    if parallel is None:
+        parallel = os.getenv("AGENT_PARALLEL", "1").lower() not in ("0", "false", "no")
+    nodes, edges, entry = agent_topology(triage_agent, empathy_agent, resource_agent, safety_agent, memory_agent, parallel)
+    
+    executor = (executor or os.getenv("AGENT_EXECUTOR", "langgraph")).lower()
+    if executor == "native":
+        return StaticGraphExecutor(nodes, edges, entry)
+    if executor != "langgraph":
+        raise ValueError(f"Unknown agent executor: {executor}")
+    
+    # Create the graph; nodes pass a single live ChatbotState along
+    graph = StateGraph(GraphState)
     
     # Add the nodes (agent functions)
-    graph.add_node("safety", safety_agent)
-    graph.add_node("triage", triage_agent)
-    graph.add_node("empathy", empathy_agent)
-    graph.add_node("resource", resource_agent)
-    graph.add_node("memory", memory_agent)
+    for name, agent in nodes.items():
+        graph.add_node(name, as_node(agent))
     
     # Define the edges
-    graph.add_edge("safety", "triage")
-    graph.add_conditional_edges(
-        "triage",
-        route_based_on_triage,
-        {
-            "empathy": "empathy",
-            "resource": "resource",
-            "memory": "memory",
-            "end": END
-        }
-    )
-    graph.add_edge("empathy", "memory")
-    graph.add_edge("resource", "memory")
-    graph.add_edge("memory", END)
+    for source, edge in edges.items():
+        if isinstance(edge, str):
+            graph.add_edge(source, edge)
+        else:
+            route, mapping = edge
+            graph.add_conditional_edges(source, on_live_state(route), mapping)
     
     # Set the entry point
-    graph.set_entry_point(should_run_safety_check)
+    route, mapping = entry
+    graph.set_conditional_entry_point(on_live_state(route), mapping)
     
-    return graph.compile() 
\ No newline at end of file
+    return graph.compile()
\ No newline at end of file
@@ -7,6 +7,8 @@ and user information over time.
 
 from typing import Dict, Any, Optional, List
 import datetime
+import json
+import re
 import sys
 import os
 
@@ -14,24 +16,151 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from .base_agent import BaseAgent
-from .state import ChatbotState, Message, UserInfo
+from .state import ChatbotState, Message, UserInfo, ConversationSummary
 
 class MemoryAgent(BaseAgent):
     """Agent responsible for maintaining conversation context and user information."""
     
-    def __init__(self, model_name: str = "memory-manager", parameters: Optional[Dict[str, Any]] = None):
+    def __init__(self, model_name: str = "memory-manager", parameters: Optional[Dict[str, Any]] = None, lazy: bool = False):
         """Initialize the Memory Agent.
         
         Args:
             model_name: The name of the model to use
             parameters: Optional parameters for configuration
+            lazy: Defer initialize() until the agent is first used
         """
-        super().__init__(model_name, parameters)
+        super().__init__(model_name, parameters, lazy)
         
     def initialize(self):
-        """Initialize memory storage."""
+        """Initialize memory storage and the memory policy."""
         # In a real implementation, this might connect to a database
-        pass
+        
+        # Memory policy, overridable through the agent parameters
+        self.max_turns = self.parameters.get("max_turns", 20)
+        self.summary_max_chars = self.parameters.get("summary_max_chars", 2000)
+        self.emotion_history_size = self.parameters.get("emotion_history_size", 50)
+        self.emotion_decay = self.parameters.get("emotion_decay", 0.8)
+        self.max_state_bytes = self.parameters.get("max_state_bytes", 64 * 1024)
+        
+        # Same settings as the SafetyAgent's detector
+        from NLP.crisis_detection import CrisisDetector
+        self.crisis_detector = CrisisDetector(**self.parameters.get("crisis_detection", {}))
+        
+    def state_bytes(self, state: ChatbotState) -> int:
+        """Return the size of the state as the session stores encode it.
+        
+        This is the JSON written by SessionStore.encode; the agents package
+        cannot import the stores, which import it.
+        
+        Args:
+            state: The current chatbot state
+            
+        Returns:
+            The size in bytes
+        """
+        return len(state.model_dump_json().encode())
+        
+    def _message_bytes(self, message: Message) -> int:
+        # The message's JSON and the comma separating it from the next
+        return len(message.model_dump_json().encode()) + 1
+        
+    def _text_bytes(self, text: str) -> int:
+        # Size of a string inside the JSON, without its quotes; newlines and
+        # quotes take two bytes there
+        return len(json.dumps(text, ensure_ascii=False).encode()) - 2
+        
+    def summarize_message(self, message: Message) -> Optional[str]:
+        """Reduce a message to one summary line.
+        
+        Assistant messages are generated from templates and resources, so
+        only user messages are kept, as their first sentence.
+        
+        Args:
+            message: The message leaving the conversation window
+            
+        Returns:
+            The summary line, or None if the message adds nothing
+        """
+        if message.role != "user":
+            return None
+        first_sentence = re.split(r"(?<=[.!?])\s", message.content.strip(), maxsplit=1)[0]
+        if len(first_sentence) > 120:
+            first_sentence = first_sentence[:117].rstrip() + "..."
+        emotion = (message.metadata or {}).get("emotion")
+        return f"- ({emotion}) {first_sentence}" if emotion else f"- {first_sentence}"
+        
+    def compact_conversation(self, state: ChatbotState) -> ChatbotState:
+        """Keep the last max_turns turns verbatim and fold older ones into the summary.
+        
+        Older turns are also folded in while the encoded state is larger than
+        max_state_bytes, always keeping the latest exchange, and the summary
+        is trimmed to what is left of that budget.
+        
+        Args:
+            state: The current chatbot state
+            
+        Returns:
+            Updated state with a bounded conversation
+        """
+        # Each turn is a user message and the assistant reply
+        keep = 2 * self.max_turns
+        overflow = max(0, len(state.conversation) - keep)
+        summary = state.conversation_summary or ConversationSummary()
+        
+        # Folding creates the summary or raises its count, which adds a few
+        # bytes of its own; allow for the largest count it could reach
+        grown = summary.model_copy(update={"messages_summarized": summary.messages_summarized + len(state.conversation)})
+        current = state.conversation_summary.model_dump_json() if state.conversation_summary else "null"
+        growth = len(grown.model_dump_json().encode()) - len(current.encode())
+        excess = self.state_bytes(state) + growth - self.max_state_bytes
+        folded = sum(self._message_bytes(message) for message in state.conversation[:overflow])
+        while overflow < len(state.conversation) - 2 and folded < excess:
+            folded += self._message_bytes(state.conversation[overflow])
+            overflow += 1
+        if not overflow:
+            return state
+            
+        compacted = state.conversation[:overflow]
+        del state.conversation[:overflow]
+        
+        lines = [line for line in (self.summarize_message(m) for m in compacted) if line]
+        text = "\n".join(filter(None, [summary.text] + lines))
+        
+        # Measure the state with an empty summary, so the summary gets
+        # exactly the bytes left over
+        state.conversation_summary = ConversationSummary(
+            messages_summarized=summary.messages_summarized + len(compacted)
+        )
+        budget = max(0, self.max_state_bytes - self.state_bytes(state))
+        
+        # Roll the oldest lines off once the summary is full or over budget
+        def too_long(text: str) -> bool:
+            return len(text) > self.summary_max_chars or self._text_bytes(text) > budget
+        while too_long(text) and "\n" in text:
+            text = text.split("\n", 1)[1]
+        # A single remaining line keeps its end; every character takes at
+        # least one byte, so cutting to the budget first leaves little to trim
+        text = text[max(0, len(text) - min(self.summary_max_chars, budget)):]
+        while too_long(text):
+            text = text[1:]
+        state.conversation_summary.text = text
+        return state
+        
+    def update_emotion_stats(self, user_info: UserInfo, emotion: str) -> None:
+        """Aggregate an emotion into counts and an exponentially decayed trend.
+        
+        Args:
+            user_info: The user information to update
+            emotion: The primary emotion of the current turn
+        """
+        stats = user_info.preferences.setdefault("emotion_stats", {"turns": 0, "counts": {}, "trend": {}})
+        stats["turns"] += 1
+        stats["counts"][emotion] = stats["counts"].get(emotion, 0) + 1
+        
+        # Trend weights sum to at most 1; recent turns dominate
+        trend = {e: weight * self.emotion_decay for e, weight in stats["trend"].items()}
+        trend[emotion] = trend.get(emotion, 0.0) + (1 - self.emotion_decay)
+        stats["trend"] = {e: round(weight, 6) for e, weight in trend.items() if weight >= 1e-4}
         
     def update_conversation_history(self, state: ChatbotState) -> ChatbotState:
         """Update the conversation history in the state.
@@ -93,8 +222,7 @@ class MemoryAgent(BaseAgent):
             Updated state with user information
         """
         # Initialize user info if it doesn't exist
-        if not state.user_info:
-            state.user_info = UserInfo(user_id=f"user_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}")
+        state.ensure_user_info()
             
         # Update user preferences based on conversation
         if state.emotion_analysis:
@@ -108,33 +236,40 @@ class MemoryAgent(BaseAgent):
                 "timestamp": datetime.datetime.now().isoformat()
             })
             
+            # Keep a window of recent entries; older ones live on in the stats
+            history = state.user_info.preferences["emotion_history"]
+            del history[:max(0, len(history) - self.emotion_history_size)]
+            self.update_emotion_stats(state.user_info, current_emotion)
+            
+            # Fold the emotion into the rolling crisis risk started by the safety check
+            rolling = state.user_info.risk_factors.get("rolling_risk")
+            if rolling is not None:
+                self.crisis_detector.update_emotion(rolling, current_emotion, state.emotion_analysis.confidence)
+            
         # Update risk factors if safety check was performed
         if state.safety_check:
             # Track risk level
             state.user_info.risk_factors["latest_risk_level"] = state.safety_check.risk_level
             state.user_info.risk_factors["latest_assessment"] = datetime.datetime.now().isoformat()
             
-            # Track sensitive topics mentioned
+            # Track sensitive topics mentioned, as a sorted list so the
+            # state stays serializable
             if state.safety_check.sensitive_topics:
-                if "mentioned_topics" not in state.user_info.risk_factors:
-                    state.user_info.risk_factors["mentioned_topics"] = set()
-                    
-                for topic in state.safety_check.sensitive_topics:
-                    state.user_info.risk_factors["mentioned_topics"].add(topic)
+                mentioned = set(state.user_info.risk_factors.get("mentioned_topics", []))
+                mentioned.update(state.safety_check.sensitive_topics)
+                state.user_info.risk_factors["mentioned_topics"] = sorted(mentioned)
                     
         return state
         
-    def process(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    def process(self, state: ChatbotState) -> ChatbotState:
         """Process the current state to update memory.
         
         Args:
-            inputs: The input state to process
+            state: The current chatbot state
             
         Returns:
             Updated state with memory information
         """
-        state = ChatbotState.model_validate(inputs)
-        
         # Update conversation history
         state = self.update_conversation_history(state)
         
@@ -149,4 +284,8 @@ class MemoryAgent(BaseAgent):
         state.emotion_analysis = None
         state.agent_responses = {}
         
-        return state.model_dump() 
\ No newline at end of file
+        # Keep the conversation within the memory policy; done last, so the
+        # size measured is the size stored
+        state = self.compact_conversation(state)
+        
+        return state 
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+Metrics for the Mental Health Chatbot
+
+Lightweight in-process latency histograms, counters and gauges, rendered in
+the Prometheus text exposition format. Recording a value takes a lock and a
+bisect, so it is cheap enough to wrap every agent call.
+"""
+
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+from collections import deque
+from contextlib import contextmanager
+import bisect
+import threading
+import time
+
+# Latency buckets in seconds, from sub-millisecond agent calls to slow model turns
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Size buckets in bytes for conversation states
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    labels = list(labels)
+    if not labels:
+        return ""
+    escaped = [(key, value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")) for key, value in labels]
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+def _quantiles(samples: Iterable[float], quantiles: Tuple[float, ...] = QUANTILES) -> Dict[float, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {q: 0.0 for q in quantiles}
+    return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in quantiles}
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Histogram:
+    """Cumulative bucket counts plus a window of recent samples for quantiles."""
+
+    def __init__(self, buckets: Tuple[float, ...], window: int = 1024):
+        """Initialize the histogram.
+
+        Args:
+            buckets: Upper bounds of the buckets, in increasing order
+            window: Number of recent samples kept for the quantile estimates
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.recent: deque = deque(maxlen=window)
+
+    def observe(self, value: float):
+        """Record one value. The caller holds the registry lock."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+        self.recent.append(value)
+
+    def quantiles(self, quantiles: Tuple[float, ...] = QUANTILES) -> Dict[float, float]:
+        """Return quantiles over the recent samples."""
+        return _quantiles(self.recent, quantiles)
+
+class MetricsRegistry:
+    """Process-wide collection of named histograms, counters and gauges."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+
+    def histogram(self, name: str, description: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """Declare a histogram."""
+        with self._lock:
+            self._help[name] = ("histogram", description)
+            self._buckets[name] = buckets
+            self._histograms.setdefault(name, {})
+
+    def counter(self, name: str, description: str):
+        """Declare a counter."""
+        with self._lock:
+            self._help[name] = ("counter", description)
+            self._counters.setdefault(name, {})
+
+    def gauge(self, name: str, description: str):
+        """Declare a gauge."""
+        with self._lock:
+            self._help[name] = ("gauge", description)
+            self._gauges.setdefault(name, {})
+
+    def observe(self, name: str, value: float, **labels):
+        """Record a value in a declared histogram."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self._buckets[name])
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """Increment a declared counter."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels):
+        """Set a declared gauge, or a counter that is kept elsewhere."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._gauges[name] if name in self._gauges else self._counters[name]
+            series[key] = value
+
+    @contextmanager
+    def timer(self, prefix: str, **labels):
+        """Time a block, counting calls and errors.
+
+        Records into the histogram <prefix>_latency_seconds and the counters
+        <prefix>_calls_total and <prefix>_errors_total.
+
+        Args:
+            prefix: Common prefix of the three metrics
+            labels: Labels for all three metrics
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc(f"{prefix}_errors_total", **labels)
+            raise
+        finally:
+            self.observe(f"{prefix}_latency_seconds", time.perf_counter() - started, **labels)
+            self.inc(f"{prefix}_calls_total", **labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return counts, sums and quantiles of every series, for JSON consumers."""
+        with self._lock:
+            result: Dict[str, Any] = {}
+            for name, series in self._histograms.items():
+                result[name] = [
+                    {"labels": dict(key), "count": h.count, "sum": h.total, "quantiles": h.quantiles()}
+                    for key, h in series.items()
+                ]
+            for name, series in {**self._counters, **self._gauges}.items():
+                result[name] = [{"labels": dict(key), "value": value} for key, value in series.items()]
+            return result
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format.
+
+        Histograms are followed by a <name>_recent summary holding p50, p95
+        and p99 over the most recent samples.
+        """
+        # Copy under the lock and format outside it, so scrapes do not hold up requests
+        with self._lock:
+            histograms = {
+                name: [(key, list(h.counts), h.total, h.count, list(h.recent), h.buckets) for key, h in series.items()]
+                for name, series in self._histograms.items()
+            }
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            descriptions = dict(self._help)
+
+        lines: List[str] = []
+        for name, series in histograms.items():
+            lines.append(f"# HELP {name} {descriptions[name][1]}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, counts, total, count, _, buckets in series:
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', _format_value(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+            lines.append(f"# HELP {name}_recent {descriptions[name][1]} (recent samples)")
+            lines.append(f"# TYPE {name}_recent summary")
+            for key, _, _, _, recent, _ in series:
+                for q, value in _quantiles(recent).items():
+                    lines.append(f"{name}_recent{_format_labels(key + (('quantile', str(q)),))} {_format_value(value)}")
+        for kind, metrics in (("counter", counters), ("gauge", gauges)):
+            for name, series in metrics.items():
+                lines.append(f"# HELP {name} {descriptions[name][1]}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+metrics.histogram("chatbot_agent_latency_seconds", "Time spent in each agent node")
+metrics.counter("chatbot_agent_calls_total", "Agent node calls")
+metrics.counter("chatbot_agent_errors_total", "Agent node calls that raised")
+metrics.histogram("chatbot_request_latency_seconds", "Time to handle a chat request")
+metrics.counter("chatbot_request_calls_total", "Chat requests")
+metrics.counter("chatbot_request_errors_total", "Chat requests that failed")
+metrics.histogram("chatbot_state_bytes", "Stored conversation state size after each turn", SIZE_BUCKETS)
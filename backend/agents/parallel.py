@@ -0,0 +1,112 @@
+"""
+Concurrent agents for the Mental Health Chatbot.
+
+The emotion analysis only reads the user input, so it is started in the
+background before the safety check and runs while the safety node does.
+The safety verdict is therefore known, and streamed, without waiting for
+it. Once both are in, the empathy and resource responses are prepared
+speculatively, and the one the turn is routed to is applied afterwards.
+"""
+
+from typing import Dict, Any, Optional, List
+import asyncio
+from .base_agent import BaseAgent, get_agent_executor
+from .state import ChatbotState
+from .triage_agent import TriageAgent
+
+class SpeculativeAgent(BaseAgent):
+    """Collects the emotion of the turn, then prepares candidate responses.
+
+    The candidates are kept in state.candidates and only the agent the turn
+    is routed to applies its own; the others are dropped with the turn.
+    """
+
+    cpu_bound = True
+
+    def __init__(self, triage_agent: TriageAgent, candidates: List[BaseAgent]):
+        """Initialize the speculative agent.
+
+        Args:
+            triage_agent: The agent whose emotion classifier is used
+            candidates: The agents to prepare responses for
+        """
+        self.triage_agent = triage_agent
+        self.candidates = candidates
+        super().__init__(model_name=triage_agent.model_name, lazy=True)
+
+    @property
+    def name(self) -> str:
+        return "emotion"
+
+    def initialize(self):
+        """Initialize the triage agent and the candidate agents."""
+        self.triage_agent.ensure_initialized()
+        for agent in self.candidates:
+            agent.ensure_initialized()
+
+    def start(self, state: ChatbotState) -> None:
+        """Start classifying the emotion of the turn on the agent executor."""
+        if state.current_user_input and state.emotion_analysis is None:
+            state.pending_emotion = get_agent_executor().submit(
+                self.triage_agent.classify_emotion, state.current_user_input, state.deadline
+            )
+
+    def process(self, state: ChatbotState) -> ChatbotState:
+        """Collect the emotion analysis and prepare the candidate responses.
+
+        Args:
+            state: The current chatbot state containing user message
+
+        Returns:
+            Updated state with emotion analysis and candidates
+        """
+        if not state.current_user_input:
+            return state
+        pending, state.pending_emotion = state.pending_emotion, None
+        if pending is not None:
+            state.emotion_analysis = pending.result()
+        elif state.emotion_analysis is None:
+            state.emotion_analysis = self.triage_agent.classify_emotion(state.current_user_input, state.deadline)
+        state.emotion_backend = state.emotion_analysis.backend
+
+        # A turn handed to a human ends after triage, so no response is needed
+        if state.safety_check and state.safety_check.needs_human_intervention:
+            return state
+        for agent in self.candidates:
+            changes = agent.prepare(state)
+            if changes is not None:
+                state.candidates[agent.name] = changes
+        return state
+
+    async def aprocess(self, state: ChatbotState) -> ChatbotState:
+        """Wait for the emotion analysis on the event loop, then prepare the candidates."""
+        # Blocking an agent worker on it could starve the pool the
+        # classification itself is queued on
+        if state.pending_emotion is not None:
+            await asyncio.wrap_future(state.pending_emotion)
+        return await super().aprocess(state)
+
+class EmotionPrefetchAgent(BaseAgent):
+    """Starts a speculative agent's emotion analysis ahead of the safety check."""
+
+    def __init__(self, speculative: SpeculativeAgent):
+        """Initialize the prefetch agent.
+
+        Args:
+            speculative: The agent that collects the analysis afterwards
+        """
+        self.speculative = speculative
+        super().__init__(model_name=speculative.model_name, lazy=True)
+
+    @property
+    def name(self) -> str:
+        return "prefetch"
+
+    def initialize(self):
+        """Initialize the speculative agent, whose classifier is started here."""
+        self.speculative.ensure_initialized()
+
+    def process(self, state: ChatbotState) -> ChatbotState:
+        """Start the emotion analysis and return at once."""
+        self.speculative.start(state)
+        return state
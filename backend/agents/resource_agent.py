@@ -15,18 +15,20 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from .base_agent import BaseAgent
 from .state import ChatbotState, ResourceInfo
+from ml_models.keyword_matcher import shared_matcher
 
 class ResourceAgent(BaseAgent):
     """Agent responsible for providing mental health resources."""
     
-    def __init__(self, model_name: str = "resource-llm", parameters: Optional[Dict[str, Any]] = None):
+    def __init__(self, model_name: str = "resource-llm", parameters: Optional[Dict[str, Any]] = None, lazy: bool = False):
         """Initialize the Resource Agent.
         
         Args:
             model_name: The name of the language model to use
             parameters: Optional parameters for the language model
+            lazy: Defer initialize() until the agent is first used
         """
-        super().__init__(model_name, parameters)
+        super().__init__(model_name, parameters, lazy)
         
     def initialize(self):
         """Initialize the resource database."""
@@ -113,6 +115,11 @@ class ResourceAgent(BaseAgent):
             "general": []  # Fallback category
         }
         
+        # Matched by the shared keyword automaton, one lexicon per category
+        self.matcher = shared_matcher
+        for category, keywords in self.keywords.items():
+            self.matcher.register(f"resource.{category}", keywords)
+        
     def match_category(self, text: str) -> str:
         """Match the user's query to a resource category.
         
@@ -122,11 +129,11 @@ class ResourceAgent(BaseAgent):
         Returns:
             The matched category
         """
-        text = text.lower()
+        found = self.matcher.match(text)
         
-        # Check each category for keyword matches
-        for category, keywords in self.keywords.items():
-            if any(keyword in text for keyword in keywords):
+        # Check each category for keyword matches, in priority order
+        for category in self.keywords:
+            if found.get(f"resource.{category}"):
                 return category
                 
         # Default to general resources
@@ -174,21 +181,20 @@ class ResourceAgent(BaseAgent):
         
         return response
         
-    def process(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
-        """Process the user input to provide relevant resources.
+    def prepare(self, state: ChatbotState) -> Optional[Dict[str, Any]]:
+        """Select and format resources without adding them to the state.
         
         Args:
-            inputs: The input state containing user message
+            state: The current chatbot state containing user message
             
         Returns:
-            Updated state with resource information
+            The resources and response as state changes, or None
         """
-        state = ChatbotState.model_validate(inputs)
         user_input = state.current_user_input
         
         if not user_input:
             # Cannot provide resources without input
-            return state.model_dump()
+            return None
             
         # Match the category based on user input
         category = self.match_category(user_input)
@@ -199,8 +205,17 @@ class ResourceAgent(BaseAgent):
         # Format the response
         response = self.format_response(resources)
         
-        # Update the state
-        state.agent_responses["resource"] = response
-        state.suggested_resources = resources
+        return {"agent_responses": {"resource": response}, "suggested_resources": resources}
+        
+    def process(self, state: ChatbotState) -> ChatbotState:
+        """Process the user input to provide relevant resources.
         
-        return state.model_dump() 
\ No newline at end of file
+        Uses the resources prepared speculatively for this turn, if any.
+        
+        Args:
+            state: The current chatbot state containing user message
+            
+        Returns:
+            Updated state with resource information
+        """
+        return self.apply(state, self.take_changes(state)) 
\ No newline at end of file
@@ -13,19 +13,33 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from .base_agent import BaseAgent
 from .state import ChatbotState, SafetyCheck
+from .metrics import metrics
 from ml_models.toxicity_moderator import ToxicityModerator  # This would be your toxicity model
+from ml_models.keyword_matcher import shared_matcher
+
+metrics.counter("chatbot_rolling_risk_escalations_total", "Safety checks raised by the session's cumulative risk, by level")
+
+# High-risk keywords that might need intervention; the API's admission
+# pre-screen matches the same lexicon
+HIGH_RISK_KEYWORDS = [
+    "kill myself", "end my life", "want to die", 
+    "suicide plan", "hurt myself", "self-harm"
+]
 
 class SafetyAgent(BaseAgent):
     """Agent responsible for safety checks on user input."""
     
-    def __init__(self, model_name: str = "toxicity-moderator", parameters: Optional[Dict[str, Any]] = None):
+    cpu_bound = True
+    
+    def __init__(self, model_name: str = "toxicity-moderator", parameters: Optional[Dict[str, Any]] = None, lazy: bool = False):
         """Initialize the Safety Agent.
         
         Args:
             model_name: The name of the toxicity model to use
             parameters: Optional parameters for the toxicity model
+            lazy: Defer initialize() until the agent is first used
         """
-        super().__init__(model_name, parameters)
+        super().__init__(model_name, parameters, lazy)
         
     def initialize(self):
         """Initialize the toxicity moderator."""
@@ -39,10 +53,19 @@ class SafetyAgent(BaseAgent):
         ]
         
         # Define high-risk keywords that might need intervention
-        self.high_risk_keywords = [
-            "kill myself", "end my life", "want to die", 
-            "suicide plan", "hurt myself", "self-harm"
-        ]
+        self.high_risk_keywords = list(HIGH_RISK_KEYWORDS)
+        
+        # Both lexicons are matched by the shared keyword automaton
+        self.matcher = shared_matcher
+        self.matcher.register("safety.sensitive_topics", self.sensitive_topics)
+        self.matcher.register("safety.high_risk", self.high_risk_keywords)
+        
+        # Rolling risk across the turns of a session; escalation on it can be
+        # turned off with the rolling_risk_escalation parameter
+        from NLP.crisis_detection import CrisisDetector, RISK_LEVELS
+        self.crisis_detector = CrisisDetector(**self.parameters.get("crisis_detection", {}))
+        self.risk_levels = RISK_LEVELS
+        self.rolling_risk_escalation = self.parameters.get("rolling_risk_escalation", True)
         
     def detect_sensitive_topics(self, text: str) -> List[str]:
         """Detect sensitive topics in the text.
@@ -53,7 +76,8 @@ class SafetyAgent(BaseAgent):
         Returns:
             A list of detected sensitive topics
         """
-        return [topic for topic in self.sensitive_topics if topic.lower() in text.lower()]
+        found = self.matcher.match(text).get("safety.sensitive_topics", set())
+        return [topic for topic in self.sensitive_topics if topic.lower() in found]
     
     def assess_risk_level(self, text: str, toxicity_score: float) -> Dict[str, Any]:
         """Assess the risk level of the user input.
@@ -65,7 +89,7 @@ class SafetyAgent(BaseAgent):
         Returns:
             A dictionary with risk assessment information
         """
-        needs_intervention = any(keyword.lower() in text.lower() for keyword in self.high_risk_keywords)
+        needs_intervention = bool(self.matcher.match(text).get("safety.high_risk"))
         
         if needs_intervention or toxicity_score > 0.8:
             risk_level = "high"
@@ -79,22 +103,61 @@ class SafetyAgent(BaseAgent):
             "needs_human_intervention": needs_intervention
         }
         
-    def process(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    def assess_rolling_risk(
+        self,
+        state: ChatbotState,
+        toxicity_score: float,
+        sensitive_topics: List[str],
+        risk_assessment: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Update the session's rolling risk and raise the assessment to its level.
+        
+        Only the rolling state in the user's risk factors is read, never the
+        conversation, so this costs the same on every turn. A high cumulative
+        risk asks for human intervention like a high-risk message does.
+        
+        Args:
+            state: The current chatbot state
+            toxicity_score: The toxicity score from the moderator
+            sensitive_topics: The sensitive topics found in the message
+            risk_assessment: The assessment of the message on its own
+            
+        Returns:
+            The risk assessment, escalated if the cumulative risk is higher
+        """
+        risk_factors = state.ensure_user_info().risk_factors
+        rolling = self.crisis_detector.update_safety(
+            risk_factors.get("rolling_risk"),
+            toxicity_score,
+            sensitive_topics,
+            risk_assessment["needs_human_intervention"]
+        )
+        risk_factors["rolling_risk"] = rolling
+        
+        cumulative = self.crisis_detector.risk_level(rolling["score"])
+        if not self.rolling_risk_escalation or self.risk_levels.index(cumulative) <= self.risk_levels.index(risk_assessment["risk_level"]):
+            return risk_assessment
+        metrics.inc("chatbot_rolling_risk_escalations_total", level=cumulative)
+        return {
+            "risk_level": cumulative,
+            "needs_human_intervention": risk_assessment["needs_human_intervention"] or cumulative == "high"
+        }
+        
+    def process(self, state: ChatbotState) -> ChatbotState:
         """Process the user input for safety concerns.
         
         Args:
-            inputs: The input state containing user message
+            state: The current chatbot state containing user message
             
         Returns:
             Updated state with safety check results
         """
-        state = ChatbotState.model_validate(inputs)
         user_input = state.current_user_input
         
         if not user_input:
             # No user input to check
             state.safety_check = SafetyCheck(is_safe=True, toxicity_score=0.0)
-            return state.model_dump()
+            return state
         
         # Check toxicity
         toxicity_score = self.toxicity_moderator.check_toxicity(user_input)
@@ -105,6 +168,9 @@ class SafetyAgent(BaseAgent):
         # Assess risk
         risk_assessment = self.assess_risk_level(user_input, toxicity_score)
         
+        # Fold the message into the session's rolling risk and escalate on it
+        risk_assessment = self.assess_rolling_risk(state, toxicity_score, sensitive_topics, risk_assessment)
+        
         # Create safety check
         safety_check = SafetyCheck(
             is_safe=toxicity_score < 0.7 and risk_assessment["risk_level"] != "high",
@@ -117,4 +183,4 @@ class SafetyAgent(BaseAgent):
         # Update the state
         state.safety_check = safety_check
         
-        return state.model_dump() 
\ No newline at end of file
+        return state 
\ No newline at end of file
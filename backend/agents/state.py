@@ -4,7 +4,8 @@ Stating definition for the Mental Health Chatbot Langgraph.
 This file defines the state structure used by the Langgraph orchestration.
 """
 
-from typing import Dict, List, Optional, Any, Literal
+from typing import Dict, List, Optional, Any, Literal, TypedDict, Union
+import datetime
 from pydantic import BaseModel, Field
 
 class Message(BaseModel):
@@ -25,6 +26,8 @@ class EmotionAnalysis(BaseModel):
     primary_emotion: str = Field(...)
     confidence: float = Field(...)
     secondary_emotions: Dict[str, float] = Field(default_factory=dict)
+    backend: Optional[str] = None
+    valence: Optional[float] = None
 
 class ResourceInfo(BaseModel):
     """Information about mental health resources."""
@@ -41,9 +44,15 @@ class SafetyCheck(BaseModel):
     risk_level: Literal["low", "medium", "high"] = Field(default="low")
     needs_human_intervention: bool = Field(default=False)
 
+class ConversationSummary(BaseModel):
+    """Rolling summary of the turns compacted out of the conversation window."""
+    text: str = Field(default="")
+    messages_summarized: int = Field(default=0)
+
 class ChatbotState(BaseModel):
     """The complete state of the chatbot system."""
     conversation: List[Message] = Field(default_factory=list)
+    conversation_summary: Optional[ConversationSummary] = None
     current_user_input: Optional[str] = None
     current_agent: Optional[str] = None
     user_info: Optional[UserInfo] = None
@@ -51,4 +60,74 @@ class ChatbotState(BaseModel):
     safety_check: Optional[SafetyCheck] = None
     suggested_resources: List[ResourceInfo] = Field(default_factory=list)
     agent_responses: Dict[str, str] = Field(default_factory=dict)
-    final_response: Optional[str] = None 
\ No newline at end of file
+    final_response: Optional[str] = None
+    # Changes prepared speculatively by agents for the current turn, by agent name;
+    # applied only by the agent the turn is routed to and never stored
+    candidates: Dict[str, Dict[str, Any]] = Field(default_factory=dict, exclude=True)
+    # time.monotonic() by which the current turn should be answered, if the
+    # request set a latency budget; never stored
+    deadline: Optional[float] = Field(default=None, exclude=True)
+    # Emotion classifier that analysed the current turn; kept after the
+    # memory agent clears the analysis, and never stored
+    emotion_backend: Optional[str] = Field(default=None, exclude=True)
+    # Emotion analysis started in the background for the current turn, as a
+    # concurrent.futures.Future; never stored
+    pending_emotion: Optional[Any] = Field(default=None, exclude=True)
+    # Version of the stored session this state was read from, which stores
+    # shared between processes check on write; kept across turns, never stored
+    store_version: Optional[int] = Field(default=None, exclude=True)
+    
+    def start_turn(self, user_input: str, deadline: Optional[float] = None) -> None:
+        """Reset the per-turn fields and set the new user input.
+        
+        A turn that ends early (e.g. on human intervention) skips the memory
+        agent, so leftovers from it must not leak into the next turn.
+        
+        Args:
+            user_input: The user message of the new turn
+            deadline: time.monotonic() by which the turn should be answered
+        """
+        self.current_user_input = user_input
+        self.deadline = deadline
+        self.emotion_backend = None
+        self.current_agent = None
+        self.emotion_analysis = None
+        self.safety_check = None
+        self.suggested_resources = []
+        self.agent_responses = {}
+        self.final_response = None
+        self.candidates = {}
+        self.pending_emotion = None
+        
+    def ensure_user_info(self) -> UserInfo:
+        """Return the user information, creating it on the first turn."""
+        if self.user_info is None:
+            self.user_info = UserInfo(user_id=f"user_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}")
+        return self.user_info
+
+class GraphState(TypedDict):
+    """The envelope passed between graph nodes.
+    
+    Nodes share one live ChatbotState object for the whole turn instead of
+    re-validating and re-dumping it at every step. Validation happens only
+    at the API boundary.
+    """
+    state: ChatbotState
+
+def as_chatbot_state(inputs: Union[ChatbotState, GraphState, Dict[str, Any]]) -> ChatbotState:
+    """Return the ChatbotState carried by the inputs.
+    
+    Live state objects are returned as-is; plain dictionaries (e.g. a stored
+    session) are validated once.
+    
+    Args:
+        inputs: A ChatbotState, a GraphState envelope or a dumped state
+        
+    Returns:
+        The ChatbotState for the inputs
+    """
+    if isinstance(inputs, ChatbotState):
+        return inputs
+    if isinstance(inputs.get("state"), ChatbotState):
+        return inputs["state"]
+    return ChatbotState.model_validate(inputs)
\ No newline at end of file
@@ -6,33 +6,63 @@ should handle the user query.
 """
 
 from typing import Dict, Any, Optional, List
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 import sys
 import os
+import time
 
 # Add the project root to sys.path to import ml_models
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, get_transformer_executor
 from .state import ChatbotState, EmotionAnalysis
+from .metrics import metrics
 from ml_models.emotion_classifier import EmotionClassifier  # This would be your emotion model
+from ml_models.keyword_matcher import shared_matcher
+
+metrics.counter("chatbot_emotion_classifications_total", "Emotion analyses, by the backend that produced them")
+metrics.counter("chatbot_emotion_fallbacks_total", "Transformer analyses replaced by the keyword classifier, by reason")
 
 class TriageAgent(BaseAgent):
     """Agent responsible for triaging user queries to the appropriate agent."""
     
-    def __init__(self, model_name: str = "llm-triage", parameters: Optional[Dict[str, Any]] = None):
+    cpu_bound = True
+    
+    def __init__(self, model_name: str = "llm-triage", parameters: Optional[Dict[str, Any]] = None, lazy: bool = False):
         """Initialize the Triage Agent.
         
         Args:
             model_name: The name of the language model to use
             parameters: Optional parameters for the language model
+            lazy: Defer initialize() until the agent is first used
         """
-        super().__init__(model_name, parameters)
+        super().__init__(model_name, parameters, lazy)
         
     def initialize(self):
         """Initialize the emotion classifier and other resources."""
         # Initialize emotion classifier
         self.emotion_classifier = EmotionClassifier()
         
+        # With EMOTION_MODEL=transformer (or the emotion_model parameter) the
+        # transformer classifier analyses messages and the keyword classifier
+        # above is the fast fallback when it misses the turn's deadline
+        self.transformer = None
+        if self.parameters.get("emotion_model", os.getenv("EMOTION_MODEL", "keyword")) == "transformer":
+            from emotion_classifier import get_emotion_classifier
+            self.transformer = get_emotion_classifier(batching=True)
+        
+        # Lexicon sentiment gives every analysis a valence, whichever
+        # classifier produced it; SENTIMENT_LEXICON (or the sentiment_lexicon
+        # parameter) points at a full VADER lexicon file to use instead of
+        # the built-in one
+        from NLP.sentiment_analysis import SentimentAnalyzer
+        self.sentiment = SentimentAnalyzer(
+            lexicon_path=self.parameters.get("sentiment_lexicon", os.getenv("SENTIMENT_LEXICON"))
+        )
+        
+        # Questions asked at or below this valence go to the empathy agent
+        self.distress_valence = self.parameters.get("distress_valence", -0.6)
+        
         # Define categories of queries
         self.info_seeking_keywords = [
             "what is", "how do I", "resources", "help for", 
@@ -44,23 +74,78 @@ class TriageAgent(BaseAgent):
             "stressed", "overwhelmed", "lonely", "afraid", "scared"
         ]
         
-    def classify_emotion(self, text: str) -> EmotionAnalysis:
+        # Matched by the shared keyword automaton
+        self.matcher = shared_matcher
+        self.matcher.register("triage.info_seeking", self.info_seeking_keywords)
+        
+    def classify_emotion(self, text: str, deadline: Optional[float] = None) -> EmotionAnalysis:
         """Classify the emotion in the user's text.
         
+        With a transformer classifier configured, the transformer runs while
+        the keyword classifier scores the text as a hedge. If the transformer
+        has not answered by the deadline, or fails, the keyword result is used.
+        
         Args:
             text: The user input text
+            deadline: time.monotonic() by which the analysis is needed; None
+                waits for the transformer however long it takes
             
         Returns:
-            Emotion analysis result
+            Emotion analysis result, tagged with the backend that produced it
+            and carrying the valence of the text
         """
+        if self.transformer is None:
+            return self._record(text, self._keyword_analysis(text))
+        
+        fast = None
+        if deadline is None:
+            results = self.transformer.classify(text)
+        else:
+            future = self._submit_transformer(text)
+            fast = self._keyword_analysis(text)
+            try:
+                results = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                # The transformer keeps running; its scores are cached for the next time
+                return self._record(text, fast, fallback="deadline")
+            except Exception as e:
+                results = {"error": str(e)}
+        if "error" in results:
+            return self._record(text, fast or self._keyword_analysis(text), fallback="error")
+        
+        primary_emotion = results["primary_emotion"]
+        return self._record(text, EmotionAnalysis(
+            primary_emotion=primary_emotion,
+            confidence=results["confidence"],
+            secondary_emotions={e["label"]: e["score"] for e in results["all_emotions"] if e["label"] != primary_emotion},
+            backend="transformer"
+        ))
+        
+    def _keyword_analysis(self, text: str) -> EmotionAnalysis:
         emotion_results = self.emotion_classifier.classify(text)
         
         return EmotionAnalysis(
             primary_emotion=emotion_results["primary_emotion"],
             confidence=emotion_results["confidence"],
-            secondary_emotions=emotion_results["secondary_emotions"]
+            secondary_emotions=emotion_results["secondary_emotions"],
+            backend="keyword"
         )
         
+    def _submit_transformer(self, text: str) -> Future:
+        # The batching front-end queues the text itself; a plain classifier
+        # runs on its own pool, as this agent may hold an agent worker
+        submit = getattr(self.transformer, "submit", None)
+        if submit is not None:
+            return submit(text)
+        return get_transformer_executor().submit(self.transformer.classify, text)
+        
+    def _record(self, text: str, analysis: EmotionAnalysis, fallback: Optional[str] = None) -> EmotionAnalysis:
+        analysis.valence = self.sentiment.polarity_scores(text)["compound"]
+        metrics.inc("chatbot_emotion_classifications_total", backend=analysis.backend)
+        if fallback:
+            metrics.inc("chatbot_emotion_fallbacks_total", reason=fallback)
+        return analysis
+        
     def determine_agent(self, text: str, emotion_analysis: EmotionAnalysis) -> str:
         """Determine which agent should handle the query.
         
@@ -71,8 +156,11 @@ class TriageAgent(BaseAgent):
         Returns:
             The name of the agent that should handle the query
         """
-        # Check if this is an information-seeking query
-        if any(keyword.lower() in text.lower() for keyword in self.info_seeking_keywords):
+        # Check if this is an information-seeking query; questions asked in
+        # clear distress get support before information
+        if self.matcher.match(text).get("triage.info_seeking"):
+            if emotion_analysis.valence is not None and emotion_analysis.valence <= self.distress_valence:
+                return "empathy"
             return "resource"
             
         # If strong emotional content, route to empathy agent
@@ -84,28 +172,28 @@ class TriageAgent(BaseAgent):
         # Default to empathy agent for most conversations
         return "empathy"
         
-    def process(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    def process(self, state: ChatbotState) -> ChatbotState:
         """Process the user input to determine routing.
         
         Args:
-            inputs: The input state containing user message
+            state: The current chatbot state containing user message
             
         Returns:
             Updated state with routing information
         """
-        state = ChatbotState.model_validate(inputs)
         user_input = state.current_user_input
         
         if not user_input:
             # No user input to process
-            return state.model_dump()
+            return state
             
-        # Analyze emotions
-        emotion_analysis = self.classify_emotion(user_input)
-        state.emotion_analysis = emotion_analysis
+        # Analyze emotions, unless that already ran alongside the safety check
+        if state.emotion_analysis is None:
+            state.emotion_analysis = self.classify_emotion(user_input, state.deadline)
+            state.emotion_backend = state.emotion_analysis.backend
         
         # Determine which agent should handle the query
-        agent = self.determine_agent(user_input, emotion_analysis)
+        agent = self.determine_agent(user_input, state.emotion_analysis)
         state.current_agent = agent
         
-        return state.model_dump() 
\ No newline at end of file
+        return state 
\ No newline at end of file
@@ -6,8 +6,13 @@ This is the main FastAPI application that serves the mental health chatbot.
 
 import os
 import sys
-from typing import Dict, Any, List, Optional
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, Tuple
 from fastapi import FastAPI, HTTPException, Depends, Request, Body
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 import uvicorn
@@ -27,15 +32,29 @@ from agents import (
     create_agent_graph,
     ChatbotState
 )
+from agents.metrics import metrics
+from sessions import create_session_store, SessionLocks, SessionConflict, new_session_id
+from startup import StartupTracker
+from admission import create_admission_controller, Overloaded
+from streaming import TurnStreamer, format_event, resource_list, emotion_backend
+from ml_models.score_cache import cache_stats
 
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the models in the background so the server starts accepting connections at once."""
+    warmup = asyncio.create_task(startup.run(warm_up))
+    yield
+    warmup.cancel()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Mental Health Chatbot API",
     description="API for a mental health chatbot using Langgraph for agent orchestration",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -47,12 +66,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize the agents
-triage_agent = TriageAgent(model_name="llm-triage")
-empathy_agent = EmpathyAgent(model_name="empathy-llm")
-resource_agent = ResourceAgent(model_name="resource-llm")
-safety_agent = SafetyAgent(model_name="toxicity-moderator")
-memory_agent = MemoryAgent(model_name="memory-manager")
+# Initialize the agents; their models are loaded at startup, see lifespan()
+triage_agent = TriageAgent(model_name="llm-triage", lazy=True)
+empathy_agent = EmpathyAgent(model_name="empathy-llm", lazy=True)
+resource_agent = ResourceAgent(model_name="resource-llm", lazy=True)
+safety_agent = SafetyAgent(model_name="toxicity-moderator", lazy=True)
+memory_agent = MemoryAgent(model_name="memory-manager", lazy=True)
 
 # Create the agent graph
 agent_graph = create_agent_graph(
@@ -63,62 +82,217 @@ agent_graph = create_agent_graph(
     memory_agent=memory_agent
 )
 
-# Session storage (in-memory for demonstration)
-# In production, use a proper database
-sessions = {}
+# Session storage, selected with the SESSION_STORE environment variable
+sessions = create_session_store()
+session_locks = SessionLocks()
+
+# Turns of one session are serialized per process only; with a store shared
+# between workers, a turn that loses the race to another worker is run again
+# on top of the stored state up to this many times, after a random backoff
+# that doubles each time so the racing workers spread out
+SESSION_CONFLICT_RETRIES = int(os.getenv("SESSION_CONFLICT_RETRIES", 5))
+SESSION_CONFLICT_BACKOFF = float(os.getenv("SESSION_CONFLICT_BACKOFF", 0.01))
+
+# Bounded admission with a priority lane for crisis messages
+admission = create_admission_controller()
+
+metrics.gauge("chatbot_sessions", "Sessions held by the session store")
+metrics.gauge("chatbot_session_store_bytes", "Bytes used by stored sessions")
+metrics.counter("chatbot_session_store_events_total", "Session store lookups and removals, by kind")
+metrics.counter("chatbot_session_conflicts_total", "Turns whose session another worker updated first, by endpoint")
+metrics.gauge("chatbot_score_cache_hit_rate", "Share of classifier score lookups served from cache, by cache")
+metrics.gauge("chatbot_score_cache_entries", "Scores held by the classifier score cache, by cache")
+metrics.counter("chatbot_score_cache_lookups_total", "Classifier score cache lookups, by cache and result")
+
+startup = StartupTracker({
+    "triage": triage_agent,
+    "empathy": empathy_agent,
+    "resource": resource_agent,
+    "safety": safety_agent,
+    "memory": memory_agent
+})
+
+async def warm_up():
+    """Run one throwaway turn through the graph so the first real request is not slowed down."""
+    state = ChatbotState()
+    state.start_turn("Hello, I have been feeling a bit anxious lately.")
+    await agent_graph.ainvoke({"state": state})
 
 # Input/Output models
 class ChatInput(BaseModel):
     message: str = Field(..., description="User message")
     session_id: Optional[str] = Field(None, description="Session ID for continuing a conversation")
+    latency_budget_ms: Optional[float] = Field(
+        None, gt=0, description="Time the turn may take; slow models fall back to faster ones when it runs out"
+    )
 
 class ChatOutput(BaseModel):
     response: str = Field(..., description="Chatbot response")
     session_id: str = Field(..., description="Session ID for the conversation")
     resources: Optional[List[Dict[str, Any]]] = Field(None, description="Suggested resources")
+    emotion_backend: Optional[str] = Field(None, description="Emotion classifier that analysed the message")
+
+# Latency budget for requests that do not set one, from LATENCY_BUDGET_MS
+DEFAULT_LATENCY_BUDGET_MS = float(os.getenv("LATENCY_BUDGET_MS", 0)) or None
+
+def turn_deadline(chat_input: ChatInput) -> Optional[float]:
+    """Return the time.monotonic() by which the turn should be answered, if it has a budget."""
+    budget = chat_input.latency_budget_ms or DEFAULT_LATENCY_BUDGET_MS
+    return time.monotonic() + budget / 1000 if budget else None
 
 @app.post("/chat", response_model=ChatOutput)
 async def chat(chat_input: ChatInput):
     """Process a chat message and return a response."""
+    # The budget counts from arrival, so time spent queued for admission is included
+    deadline = turn_deadline(chat_input)
+    with metrics.timer("chatbot_request", endpoint="/chat"):
+        try:
+            async with admission.admit(chat_input.message):
+                return await handle_chat(chat_input, deadline)
+        except Overloaded as e:
+            raise overloaded_response(e)
+
+def overloaded_response(error: Overloaded) -> HTTPException:
+    """Build the 503 returned to shed requests."""
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": str(error.retry_after)})
+
+async def load_session(session_id: Optional[str]) -> Tuple[str, ChatbotState]:
+    """Return the ID and state of the session a turn continues.
+    
+    States are decoded only here, at the API boundary. Requests without an
+    ID, or with an unknown or expired one, start a new session under a new
+    ID; IDs are never reused.
+    """
+    state = await asyncio.to_thread(sessions.get, session_id) if session_id else None
+    if state is None:
+        return new_session_id(), ChatbotState()
+    return session_id, state
+
+async def handle_chat(chat_input: ChatInput, deadline: Optional[float] = None) -> Dict[str, Any]:
+    """Run one turn through the graph and build the ChatOutput fields."""
     message = chat_input.message
-    session_id = chat_input.session_id
     
-    # Get or create session state
-    if session_id and session_id in sessions:
-        # Continue existing conversation
-        state = ChatbotState.model_validate(sessions[session_id])
-    else:
-        # Start new conversation
-        state = ChatbotState()
-        session_id = f"session_{len(sessions) + 1}"
+    # Turns of the same session run one at a time; other sessions are not blocked
+    async with session_locks.hold(chat_input.session_id):
+        for attempt in range(SESSION_CONFLICT_RETRIES + 1):
+            session_id, state = await load_session(chat_input.session_id)
+            
+            # Update state with user input
+            state.start_turn(message, deadline)
+            
+            # Run the agent graph off the event loop; the nodes share the live state object
+            try:
+                result = await agent_graph.ainvoke({"state": state})
+                result_state = result["state"]
+                
+                # Store updated state; a store shared between processes can
+                # wait on another worker's write lock, so not on the event loop
+                size = await asyncio.to_thread(sessions.set, session_id, result_state)
+                metrics.observe("chatbot_state_bytes", size)
+                break
+            except SessionConflict:
+                metrics.inc("chatbot_session_conflicts_total", endpoint="/chat")
+                await asyncio.sleep(random.uniform(0, SESSION_CONFLICT_BACKOFF * 2 ** attempt))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
+        else:
+            raise HTTPException(status_code=409, detail="Session is being updated by another request, please retry")
     
-    # Update state with user input
-    state.current_user_input = message
+    # Prepare response
+    response = result_state.final_response or "I'm not sure how to respond to that."
     
-    # Run the agent graph
+    return {
+        "response": response,
+        "session_id": session_id,
+        "resources": resource_list(result_state),
+        "emotion_backend": emotion_backend(result_state)
+    }
+
+@app.post("/chat/stream")
+async def chat_stream(chat_input: ChatInput):
+    """Process a chat message and stream the response as Server-Sent Events.
+    
+    Events are sent as each agent finishes: session, safety (plus crisis when
+    a human needs to step in), triage, resources, delta text chunks and a
+    closing done event carrying the same fields as /chat.
+    """
+    deadline = turn_deadline(chat_input)
+    # Shedding is decided before the stream starts, so the client still gets a 503
     try:
-        result = agent_graph.invoke(state.model_dump())
-        result_state = ChatbotState.model_validate(result)
-        
-        # Store updated state
-        sessions[session_id] = result_state.model_dump()
-        
-        # Prepare response
-        response = result_state.final_response or "I'm not sure how to respond to that."
+        lane = admission.screen(chat_input.message)
+    except Overloaded as e:
+        raise overloaded_response(e)
+    
+    async def events():
+        with metrics.timer("chatbot_request", endpoint="/chat/stream"):
+            async with admission.slot(lane):
+                async for event in stream_turn(chat_input, deadline):
+                    yield event
+    
+    # Proxies must not buffer the stream, or the early events lose their point
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def stream_turn(chat_input: ChatInput, deadline: Optional[float] = None):
+    """Run one turn through the graph, yielding Server-Sent Events as agents finish."""
+    message = chat_input.message
+    
+    async with session_locks.hold(chat_input.session_id):
+        session_id, state = await load_session(chat_input.session_id)
+        yield format_event("session", {"session_id": session_id})
         
-        # Extract resources
-        resources = None
-        if result_state.suggested_resources:
-            resources = [resource.model_dump() for resource in result_state.suggested_resources]
-            
-        return {
-            "response": response,
-            "session_id": session_id,
-            "resources": resources
-        }
+        state.start_turn(message, deadline)
+        streamer = TurnStreamer()
+        try:
+            async for update in agent_graph.astream({"state": state}, stream_mode="updates"):
+                for node in update:
+                    for event, data in streamer.node_events(node, state):
+                        yield format_event(event, data)
+            size = await asyncio.to_thread(sessions.set, session_id, state)
+            metrics.observe("chatbot_state_bytes", size)
+        except SessionConflict:
+            # Events of this run have been sent, so it cannot be run again
+            metrics.inc("chatbot_session_conflicts_total", endpoint="/chat/stream")
+            yield format_event("error", {"detail": "Session is being updated by another request, please retry"})
+            return
+        except Exception as e:
+            # The response has already started, so the error is reported in the stream
+            metrics.inc("chatbot_request_errors_total", endpoint="/chat/stream")
+            yield format_event("error", {"detail": f"Error processing message: {str(e)}"})
+            return
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing message: {str(e)}")
+    for event, data in streamer.final_events(state, session_id):
+        yield format_event(event, data)
+
+@app.get("/sessions/stats")
+async def session_stats():
+    """Session store counters."""
+    return await asyncio.to_thread(sessions.stats)
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Agent and request latencies, counters, session store size and score cache hit rates in Prometheus text format."""
+    admission.stats()
+    stats = await asyncio.to_thread(sessions.stats)
+    metrics.set("chatbot_sessions", stats["sessions"], backend=stats["backend"])
+    metrics.set("chatbot_session_store_bytes", stats["bytes"], backend=stats["backend"])
+    for kind in ("hits", "misses", "evictions", "expirations"):
+        metrics.set("chatbot_session_store_events_total", stats[kind], backend=stats["backend"], kind=kind)
+    for name, cache in cache_stats().items():
+        metrics.set("chatbot_score_cache_hit_rate", cache["hit_rate"], cache=name)
+        metrics.set("chatbot_score_cache_entries", cache["size"], cache=name)
+        for result in ("hits", "misses"):
+            metrics.set("chatbot_score_cache_lookups_total", cache[result], cache=name, result=result)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint; returns 503 until the models are loaded and warmed up."""
+    status = startup.status()
+    return JSONResponse(status_code=200 if startup.ready else 503, content=status)
 
 @app.get("/health")
 async def health_check():
@@ -0,0 +1,33 @@
+"""
+Gunicorn configuration for serving the Mental Health Chatbot API with
+several worker processes:
+
+    cd backend && gunicorn app:app
+
+The app and its models are loaded once in the master process and shared
+copy-on-write by the forked workers; set PRELOAD_APP=0 to have each worker
+load its own copy instead. WEB_CONCURRENCY sets the number of workers.
+Connections that must not cross fork(), such as the sqlite session store's,
+are opened in each worker on first use.
+"""
+
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("PRELOAD_APP", "1") != "0"
+# Model loading happens before the workers report in, so allow for it
+timeout = int(os.getenv("WORKER_TIMEOUT", 120))
+
+def when_ready(server):
+    # Runs in the master once the app is imported (with preload_app)
+    if preload_app:
+        import app
+        import serving
+        serving.preload(app.startup.agents)
+
+def post_fork(server, worker):
+    import serving
+    threads = serving.configure_worker_threads(server.cfg.workers)
+    server.log.info("Worker %s using %d inference threads", worker.pid, threads)
@@ -0,0 +1,70 @@
+"""
+Multi-worker serving for the Mental Health Chatbot API
+
+With gunicorn's preload_app the app is imported once in the master process
+and the workers are forked from it. Loading the agents' models in the
+master as well lets every worker share the weight pages copy-on-write
+instead of loading its own copy, and the CPU threads used for inference are
+split between the workers so they do not oversubscribe the machine.
+"""
+
+import gc
+import os
+import sys
+from typing import Dict, Optional
+
+from agents.base_agent import BaseAgent
+
+# Thread pools of the numeric libraries that read these at import time
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+def worker_threads(workers: int, cpus: Optional[int] = None) -> int:
+    """Number of inference threads each worker gets.
+
+    Args:
+        workers: Number of worker processes
+        cpus: Number of CPUs, os.cpu_count() by default
+
+    Returns:
+        The CPUs divided evenly between the workers, at least one
+    """
+    cpus = cpus or os.cpu_count() or 1
+    return max(1, cpus // max(1, workers))
+
+def configure_worker_threads(workers: int) -> int:
+    """Limit the inference threads of the current worker process.
+
+    Called in each worker right after the fork. torch is configured directly
+    when the master has already imported it; otherwise the environment
+    variables are set so that a later import picks the limit up.
+
+    Args:
+        workers: Number of worker processes
+
+    Returns:
+        The number of threads this worker uses
+    """
+    threads = worker_threads(workers)
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(threads))
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+    return threads
+
+def preload(agents: Dict[str, BaseAgent]):
+    """Load the agents' models in the master process before the workers fork.
+
+    Only the weights are loaded here. The warmup turn still runs in each
+    worker at startup, because inference starts thread pools that do not
+    survive a fork. Afterwards the loaded objects are moved out of reach of
+    the garbage collector, whose bookkeeping writes would otherwise copy the
+    shared pages into every worker.
+
+    Args:
+        agents: The agents to load, by component name
+    """
+    for agent in agents.values():
+        agent.ensure_initialized()
+    gc.collect()
+    gc.freeze()
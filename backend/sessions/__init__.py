@@ -0,0 +1,21 @@
+"""
+Mental Health Chatbot Session Storage
+
+This package contains the session store backends used by the chatbot API.
+"""
+
+from .base_store import SessionStore, SessionConflict
+from .memory_store import MemorySessionStore
+from .sqlite_store import SQLiteSessionStore
+from .factory import create_session_store
+from .locks import SessionLocks, new_session_id
+
+__all__ = [
+    "SessionStore",
+    "SessionConflict",
+    "MemorySessionStore",
+    "SQLiteSessionStore",
+    "create_session_store",
+    "SessionLocks",
+    "new_session_id"
+]
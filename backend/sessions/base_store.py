@@ -0,0 +1,141 @@
+"""
+Base Session Store for the Mental Health Chatbot
+
+This defines the interface that all session storage backends implement.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, Tuple
+import threading
+import sys
+import os
+
+# Add the backend directory to sys.path to import the agents package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.state import ChatbotState
+
+class SessionConflict(Exception):
+    """Raised by set() when the stored session changed since the state was read."""
+
+    def __init__(self, session_id: str):
+        super().__init__(f"Session {session_id} was updated by another request")
+        self.session_id = session_id
+
+class SessionStore(ABC):
+    """Base class that all session storage backends must inherit from."""
+
+    backend_name = "base"
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        """Initialize the session store.
+
+        Args:
+            ttl_seconds: Optional idle time after which a session expires
+        """
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._stats_lock = threading.Lock()
+
+    def _count(self, counter: str, amount: int = 1):
+        """Increment one of the store counters."""
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def encode(self, state: ChatbotState) -> bytes:
+        """Serialize a state for storage.
+
+        Pydantic's JSON is faster to encode and decode than the msgpack
+        formats measured in bench_state_encoding.
+        """
+        return state.model_dump_json().encode()
+
+    def decode(self, payload: bytes) -> ChatbotState:
+        """Deserialize a stored state.
+
+        Raises:
+            ValueError: If the payload is not a valid state
+        """
+        return ChatbotState.model_validate_json(payload)
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[ChatbotState]:
+        """Load the state of a session.
+
+        Args:
+            session_id: The session to load
+
+        Returns:
+            The session state, or None if it is unknown or expired
+        """
+        pass
+
+    @abstractmethod
+    def set(self, session_id: str, state: ChatbotState) -> int:
+        """Store the state of a session.
+
+        Args:
+            session_id: The session to store
+            state: The state to store
+
+        Returns:
+            The size of the stored payload in bytes
+
+        Raises:
+            SessionConflict: If another process stored the session after this
+                state was read (only stores shared between processes check)
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Remove a session from the store.
+
+        Args:
+            session_id: The session to remove
+        """
+        pass
+
+    @abstractmethod
+    def __contains__(self, session_id: str) -> bool:
+        """Check whether a live session exists, without counting a hit or miss."""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Return the number of stored sessions."""
+        pass
+
+    def size_bytes(self) -> int:
+        """Return the approximate number of bytes used by stored sessions."""
+        return 0
+
+    def totals(self) -> Tuple[int, int]:
+        """Return the number of sessions and their size in bytes, for stats().
+
+        Stores where these take a scan override this to reuse recent values.
+        """
+        return len(self), self.size_bytes()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the store counters.
+
+        Returns:
+            A dictionary with size, hit, miss, eviction and expiration counts
+        """
+        sessions, size = self.totals()
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.backend_name,
+                "sessions": sessions,
+                "bytes": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
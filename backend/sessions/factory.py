@@ -0,0 +1,49 @@
+"""
+Session store selection for the Mental Health Chatbot.
+
+This module builds the configured session store from environment settings.
+"""
+
+from typing import Dict, Any, Optional
+import os
+
+from .base_store import SessionStore
+from .memory_store import MemorySessionStore
+from .sqlite_store import SQLiteSessionStore
+
+def _optional_number(value: Optional[str], cast=int):
+    """Parse an optional numeric setting, where empty or "none" means no limit."""
+    if value is None or value.strip().lower() in ("", "none"):
+        return None
+    return cast(value)
+
+def create_session_store(backend: Optional[str] = None) -> SessionStore:
+    """Create the session store selected by the environment.
+    
+    Settings:
+        SESSION_STORE: "memory" (default) or "sqlite"
+        SESSION_MAX_SESSIONS: Maximum number of sessions kept
+        SESSION_MAX_BYTES: Maximum total size of sessions kept in memory
+        SESSION_TTL_SECONDS: Idle time after which a session expires
+        SESSION_DB_PATH: Database file for the sqlite backend
+    
+    Args:
+        backend: Optional backend name overriding SESSION_STORE
+        
+    Returns:
+        The configured session store
+    """
+    backend = (backend or os.getenv("SESSION_STORE", "memory")).lower()
+    options: Dict[str, Any] = {}
+    if "SESSION_MAX_SESSIONS" in os.environ:
+        options["max_sessions"] = _optional_number(os.environ["SESSION_MAX_SESSIONS"])
+    if "SESSION_TTL_SECONDS" in os.environ:
+        options["ttl_seconds"] = _optional_number(os.environ["SESSION_TTL_SECONDS"], float)
+    
+    if backend == "memory":
+        if "SESSION_MAX_BYTES" in os.environ:
+            options["max_bytes"] = _optional_number(os.environ["SESSION_MAX_BYTES"])
+        return MemorySessionStore(**options)
+    if backend == "sqlite":
+        return SQLiteSessionStore(path=os.getenv("SESSION_DB_PATH", "sessions.db"), **options)
+    raise ValueError(f"Unknown session store backend: {backend}")
@@ -0,0 +1,52 @@
+"""
+Session concurrency helpers for the Mental Health Chatbot.
+
+Turns for the same session are serialized with a per-session lock, while
+turns for different sessions run without any shared lock.
+"""
+
+from typing import Dict, AsyncIterator, Optional
+from contextlib import asynccontextmanager
+import asyncio
+import secrets
+
+def new_session_id() -> str:
+    """Create a random, collision-resistant session ID."""
+    return f"session_{secrets.token_urlsafe(16)}"
+
+class SessionLocks:
+    """Per-session asyncio locks that are created on demand and dropped when idle."""
+
+    def __init__(self):
+        """Initialize the lock table."""
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._waiters: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, session_id: Optional[str]) -> AsyncIterator[None]:
+        """Hold the lock of a session for the duration of a turn.
+
+        Args:
+            session_id: The session whose turns must not interleave; None for
+                a turn that starts a new session, whose ID no other request
+                can know yet, so nothing is locked
+        """
+        if session_id is None:
+            yield
+            return
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        self._waiters[session_id] = self._waiters.get(session_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._waiters[session_id] -= 1
+            if not self._waiters[session_id]:
+                del self._waiters[session_id]
+                del self._locks[session_id]
+
+    def __len__(self) -> int:
+        """Return the number of sessions with a turn in progress or waiting."""
+        return len(self._locks)
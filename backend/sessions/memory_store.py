@@ -0,0 +1,109 @@
+"""
+In-Memory Session Store for the Mental Health Chatbot.
+
+Sessions are kept in process memory with LRU eviction and an optional
+time-to-live, bounded both by session count and by total size. They are
+held encoded, so every get() returns a fresh state: a turn that fails
+halfway changes nothing until set() stores the completed one.
+"""
+
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import threading
+import time
+
+from .base_store import SessionStore, ChatbotState
+
+class MemorySessionStore(SessionStore):
+    """LRU + TTL session store kept in process memory."""
+
+    backend_name = "memory"
+
+    def __init__(
+        self,
+        max_sessions: Optional[int] = 10000,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 24 * 60 * 60
+    ):
+        """Initialize the in-memory session store.
+
+        Args:
+            max_sessions: Optional maximum number of sessions to keep
+            max_bytes: Optional cap on the total encoded size of all sessions
+            ttl_seconds: Optional idle time after which a session expires
+        """
+        super().__init__(ttl_seconds)
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        # session_id -> (encoded state, size in bytes, last use time), oldest first
+        self._sessions: "OrderedDict[str, Tuple[bytes, int, float]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def _is_expired(self, used_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - used_at > self.ttl_seconds
+
+    def _remove(self, session_id: str):
+        _, size, _ = self._sessions.pop(session_id)
+        self._total_bytes -= size
+
+    def get(self, session_id: str) -> Optional[ChatbotState]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and self._is_expired(entry[2], time.monotonic()):
+                self._remove(session_id)
+                self._count("expirations")
+                entry = None
+            if entry is None:
+                self._count("misses")
+                return None
+            self._sessions[session_id] = (entry[0], entry[1], time.monotonic())
+            self._sessions.move_to_end(session_id)
+            self._count("hits")
+        return self.decode(entry[0])
+
+    def set(self, session_id: str, state: ChatbotState) -> int:
+        payload = self.encode(state)
+        size = len(payload)
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+            self._sessions[session_id] = (payload, size, time.monotonic())
+            self._total_bytes += size
+            self._evict()
+        return size
+
+    def _evict(self):
+        """Drop expired sessions, then least recently used ones until within the caps."""
+        now = time.monotonic()
+        while self._sessions:
+            oldest = next(iter(self._sessions))
+            if not self._is_expired(self._sessions[oldest][2], now):
+                break
+            self._remove(oldest)
+            self._count("expirations")
+        while len(self._sessions) > 1 and (
+            (self.max_sessions is not None and len(self._sessions) > self.max_sessions)
+            or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._sessions))
+            self._remove(oldest)
+            self._count("evictions")
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return entry is not None and not self._is_expired(entry[2], time.monotonic())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes
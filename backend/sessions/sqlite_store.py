@@ -0,0 +1,196 @@
+"""
+SQLite Session Store for the Mental Health Chatbot.
+
+Sessions are persisted in a local SQLite database so that they survive
+restarts and can be shared by several worker processes on the same host.
+Turns of one session are only serialized within a process, so each row
+carries a version: a write succeeds only if the row still has the version
+the state was read at, and raises SessionConflict otherwise.
+"""
+
+from typing import Dict, Any, Optional, Tuple
+import os
+import sqlite3
+import threading
+import time
+
+from .base_store import SessionStore, SessionConflict, ChatbotState
+
+class SQLiteSessionStore(SessionStore):
+    """Persistent session store backed by a local SQLite database."""
+
+    backend_name = "sqlite"
+
+    def __init__(
+        self,
+        path: str = "sessions.db",
+        max_sessions: Optional[int] = 100000,
+        ttl_seconds: Optional[float] = 7 * 24 * 60 * 60,
+        purge_interval: int = 100,
+        totals_ttl: float = 30.0
+    ):
+        """Initialize the SQLite session store.
+
+        Args:
+            path: Path to the database file, shared by all worker processes
+            max_sessions: Optional maximum number of sessions to keep
+            ttl_seconds: Optional idle time after which a session expires
+            purge_interval: Number of writes between expiry/eviction sweeps
+            totals_ttl: Seconds for which stats() reuses the session count
+                and byte total, which take a full table scan
+        """
+        super().__init__(ttl_seconds)
+        self.path = path
+        self.max_sessions = max_sessions
+        self.purge_interval = purge_interval
+        self.totals_ttl = totals_ttl
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._totals: Optional[Tuple[int, int]] = None
+        self._totals_at = float("-inf")
+
+        # SQLite connections must not be used across fork(), and the store is
+        # created when the app is imported, which under gunicorn's
+        # preload_app happens in the master. The connection is therefore
+        # opened on first use in each process; see _connection()
+        self._conn = None
+        self._pid = None
+        self._inherited = []
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this process's connection, opening it on first use; call with _lock held."""
+        if self._pid != os.getpid():
+            if self._conn is not None:
+                # Opened by the parent before forking. Closing it here would
+                # touch the parent's locks, so it is only kept from being
+                # garbage collected
+                self._inherited.append(self._conn)
+            # WAL lets readers in other processes proceed while one process writes
+            conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, "
+                "payload BLOB NOT NULL, "
+                "updated_at REAL NOT NULL, "
+                "version INTEGER NOT NULL DEFAULT 0)"
+            )
+            # Databases created before rows were versioned
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(sessions)")]
+            if "version" not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _expiry_cutoff(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds is not None else float("-inf")
+
+    def get(self, session_id: str) -> Optional[ChatbotState]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT payload, updated_at, version FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is not None and row[1] < self._expiry_cutoff():
+                self._connection().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                self._count("expirations")
+                row = None
+        if row is None:
+            self._count("misses")
+            return None
+        try:
+            state = self.decode(row[0])
+        except ValueError:
+            # Written by a version with a different state schema
+            self.delete(session_id)
+            self._count("misses")
+            return None
+        state.store_version = row[2]
+        self._count("hits")
+        return state
+
+    def set(self, session_id: str, state: ChatbotState) -> int:
+        payload = self.encode(state)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            written = 0
+            if state.store_version is not None:
+                written = conn.execute(
+                    "UPDATE sessions SET payload = ?, updated_at = ?, version = version + 1 "
+                    "WHERE session_id = ? AND version = ?",
+                    (payload, now, session_id, state.store_version)
+                ).rowcount
+            if written:
+                version = state.store_version + 1
+            else:
+                # A new session, or one that expired or was evicted since it
+                # was read; if the row exists, another process wrote it
+                written = conn.execute(
+                    "INSERT INTO sessions (session_id, payload, updated_at, version) VALUES (?, ?, ?, 0) "
+                    "ON CONFLICT(session_id) DO NOTHING",
+                    (session_id, payload, now)
+                ).rowcount
+                if not written:
+                    raise SessionConflict(session_id)
+                version = 0
+            state.store_version = version
+            self._writes += 1
+            if self._writes % self.purge_interval == 0:
+                self._purge()
+        return len(payload)
+
+    def _purge(self):
+        """Delete expired sessions and trim the table to max_sessions."""
+        if self.ttl_seconds is not None:
+            cursor = self._connection().execute("DELETE FROM sessions WHERE updated_at < ?", (self._expiry_cutoff(),))
+            self._count("expirations", max(cursor.rowcount, 0))
+        if self.max_sessions is not None:
+            cursor = self._connection().execute(
+                "DELETE FROM sessions WHERE session_id IN ("
+                "SELECT session_id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,)
+            )
+            self._count("evictions", max(cursor.rowcount, 0))
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT 1 FROM sessions WHERE session_id = ? AND updated_at >= ?",
+                (session_id, self._expiry_cutoff())
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM sessions").fetchone()[0]
+
+    def totals(self) -> Tuple[int, int]:
+        # Other processes write to the same table, so a running count kept
+        # here would drift; the scan is rerun at most once per totals_ttl
+        now = time.monotonic()
+        with self._lock:
+            if self._totals is None or now - self._totals_at >= self.totals_ttl:
+                self._totals = self._connection().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM sessions"
+                ).fetchone()
+                self._totals_at = now
+            return self._totals
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._pid = None
@@ -0,0 +1,71 @@
+"""
+Startup for the Mental Health Chatbot API
+
+Agents are created lazily so that importing the app is cheap. When the
+server starts, their models are loaded concurrently and a warmup turn is
+run before the service reports itself as ready.
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+from agents.base_agent import BaseAgent
+
+class StartupTracker:
+    """Loads agents concurrently, runs a warmup and tracks readiness."""
+
+    def __init__(self, agents: Dict[str, BaseAgent]):
+        """Initialize the tracker.
+
+        Args:
+            agents: The agents to load, by component name
+        """
+        self.agents = agents
+        self.ready = False
+        self.error: Optional[str] = None
+        self.load_times: Dict[str, float] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    async def _load(self, name: str, agent: BaseAgent):
+        await asyncio.to_thread(agent.ensure_initialized)
+        self.load_times[name] = agent.load_time or 0.0
+
+    async def run(self, warmup: Callable[[], Awaitable[Any]]):
+        """Load all agents concurrently, then run the warmup.
+
+        Args:
+            warmup: Coroutine function running a first inference end to end
+        """
+        self.started_at = time.perf_counter()
+        try:
+            await asyncio.gather(*[self._load(name, agent) for name, agent in self.agents.items()])
+
+            started = time.perf_counter()
+            await warmup()
+            self.load_times["warmup"] = time.perf_counter() - started
+
+            self.ready = True
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self.finished_at = time.perf_counter()
+
+    def status(self) -> Dict[str, Any]:
+        """Return the readiness status and per-component load times in seconds."""
+        if self.ready:
+            status = "ready"
+        elif self.error:
+            status = "failed"
+        else:
+            status = "starting"
+        total = None
+        if self.started_at is not None and self.finished_at is not None:
+            total = self.finished_at - self.started_at
+        return {
+            "status": status,
+            "error": self.error,
+            "load_times": {name: round(seconds, 4) for name, seconds in self.load_times.items()},
+            "total_seconds": round(total, 4) if total is not None else None
+        }
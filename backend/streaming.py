@@ -0,0 +1,131 @@
+"""
+Streaming for the Mental Health Chatbot API
+
+Turns the per-node updates of the agent graph into Server-Sent Events, so
+clients see the safety verdict, the triage decision and the response text
+as soon as each agent finishes instead of after the whole turn.
+"""
+
+import json
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from agents import ChatbotState
+from agents.graph import HUMAN_INTERVENTION_MESSAGE
+
+# Agent responses that make up the final response, in the order the memory
+# agent joins them
+RESPONSE_PARTS = ["safety_warning", "empathy", "resource"]
+
+Event = Tuple[str, Dict[str, Any]]
+
+def format_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event.
+
+    Args:
+        event: The event name
+        data: The JSON payload
+
+    Returns:
+        The event in text/event-stream framing
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def split_chunks(text: str) -> List[str]:
+    """Split text into sentence-sized chunks that join back into the same text."""
+    # Break after sentence ends and line breaks, but not inside numbers or URLs
+    return [chunk for chunk in re.split(r"(?<=[^\W\d][.!?])(?=\s)|(?<=\n)(?=[^\n])", text) if chunk]
+
+def resource_list(state: ChatbotState) -> Optional[List[Dict[str, Any]]]:
+    """Return the suggested resources as dictionaries, or None if there are none."""
+    if not state.suggested_resources:
+        return None
+    return [resource.model_dump() for resource in state.suggested_resources]
+
+def emotion_backend(state: ChatbotState) -> Optional[str]:
+    """Return the emotion classifier that analysed the turn, if one ran."""
+    return state.emotion_backend
+
+class TurnStreamer:
+    """Translates the graph updates of one turn into stream events."""
+
+    def __init__(self):
+        """Initialize the streamer for a new turn."""
+        self.sent_parts: List[str] = []
+        self.sent_text = False
+        self.sent_safety = False
+
+    def _text(self, text: str) -> List[Event]:
+        # Parts are separated the way the memory agent joins them, so the
+        # deltas add up to the final response
+        if self.sent_text:
+            text = "\n\n" + text
+        self.sent_text = True
+        return [("delta", {"text": chunk}) for chunk in split_chunks(text)]
+
+    def node_events(self, node: str, state: ChatbotState) -> List[Event]:
+        """Return the events for a node that has just finished.
+
+        Args:
+            node: Name of the graph node
+            state: The live state after the node ran
+
+        Returns:
+            List of (event name, payload) pairs
+        """
+        events: List[Event] = []
+        # Sent after the "safety" node, which does not wait for the emotion analysis
+        if state.safety_check and not self.sent_safety:
+            self.sent_safety = True
+            safety = state.safety_check
+            events.append(("safety", {
+                "is_safe": safety.is_safe,
+                "toxicity_score": safety.toxicity_score,
+                "risk_level": safety.risk_level,
+                "sensitive_topics": safety.sensitive_topics,
+                "needs_human_intervention": safety.needs_human_intervention
+            }))
+            # Crisis messaging goes out before any other agent runs
+            if safety.needs_human_intervention:
+                events.append(("crisis", {"message": HUMAN_INTERVENTION_MESSAGE}))
+        if node == "triage":
+            emotion = state.emotion_analysis
+            events.append(("triage", {
+                "route": state.current_agent,
+                "emotion": emotion.primary_emotion if emotion else None,
+                "confidence": emotion.confidence if emotion else None,
+                "backend": emotion.backend if emotion else None,
+                "valence": emotion.valence if emotion else None
+            }))
+        elif node == "resource":
+            events.append(("resources", {"resources": resource_list(state)}))
+
+        # Stream response parts as soon as they exist
+        for part in RESPONSE_PARTS:
+            if part in state.agent_responses and part not in self.sent_parts:
+                self.sent_parts.append(part)
+                events.extend(self._text(state.agent_responses[part]))
+        return events
+
+    def final_events(self, state: ChatbotState, session_id: str) -> List[Event]:
+        """Return the closing events once the graph has finished.
+
+        Args:
+            state: The final state of the turn
+            session_id: Session ID for the conversation
+
+        Returns:
+            List of (event name, payload) pairs
+        """
+        response = state.final_response or "I'm not sure how to respond to that."
+        events: List[Event] = []
+        # Responses not built from agent parts (such as the human intervention message)
+        if not self.sent_text:
+            events.extend(self._text(response))
+        events.append(("done", {
+            "response": response,
+            "session_id": session_id,
+            "resources": resource_list(state),
+            "emotion_backend": emotion_backend(state)
+        }))
+        return events
@@ -0,0 +1,79 @@
+"""
+Admission control benchmark for the Mental Health Chatbot API.
+
+Fires a burst of routine messages with a few crisis messages mixed in at
+an in-process ASGI client, and reports latency per lane, how many routine
+requests were shed with 503, and the queue wait recorded for each lane.
+The client shares the event loop with the app, so end-to-end latencies
+include the time spent handling the whole burst; the queue wait is what
+admission control decides.
+
+Usage:
+    python benchmarks/bench_admission.py --routine 2000 --crisis 20 --max-concurrent 16 --max-queue 500
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from corpus import MESSAGES, format_summary
+
+def configure(args):
+    # The app reads its admission settings when it is imported
+    os.environ["ADMISSION_MAX_CONCURRENT"] = str(args.max_concurrent)
+    os.environ["ADMISSION_MAX_QUEUE"] = str(args.max_queue)
+    os.environ["ADMISSION_MAX_QUEUE_WAIT"] = str(args.max_queue_wait)
+
+async def run(args):
+    import httpx
+    import app as api
+    from admission import crisis_prescreen
+    from agents.metrics import metrics
+
+    rng = random.Random(args.seed)
+    routine = [m for kind in ("sadness", "anxiety", "info", "gratitude") for m in MESSAGES[kind]]
+    # Only messages the pre-screen flags take the crisis lane
+    crisis = [m for m in MESSAGES["crisis"] + MESSAGES["sensitive"] if crisis_prescreen(m)]
+    requests = [("routine", rng.choice(routine)) for _ in range(args.routine)]
+    for _ in range(args.crisis):
+        requests.insert(rng.randrange(len(requests) + 1), ("crisis", rng.choice(crisis)))
+
+    latencies = {"crisis": [], "routine": []}
+    statuses = {}
+
+    async def send(client, lane, message):
+        started = time.perf_counter()
+        response = await client.post("/chat", json={"message": message})
+        statuses[(lane, response.status_code)] = statuses.get((lane, response.status_code), 0) + 1
+        if response.status_code == 200:
+            latencies[lane].append(time.perf_counter() - started)
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=600.0) as client:
+        await client.post("/chat", json={"message": "hello"})
+        await asyncio.gather(*[send(client, lane, message) for lane, message in requests])
+
+    for lane in ("crisis", "routine"):
+        print(format_summary(f"{lane} latency", latencies[lane]))
+    print("responses: " + ", ".join(f"{lane} {status}: {count}" for (lane, status), count in sorted(statuses.items())))
+    for series in metrics.snapshot()["chatbot_admission_wait_seconds"]:
+        quantiles = series["quantiles"]
+        print(
+            f"queue wait {series['labels']['lane']:<8} n={series['count']:<6} "
+            f"p50 {quantiles[0.5] * 1000:>8.2f} ms  p95 {quantiles[0.95] * 1000:>8.2f} ms  p99 {quantiles[0.99] * 1000:>8.2f} ms"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routine", type=int, default=2000, help="routine messages in the burst")
+    parser.add_argument("--crisis", type=int, default=20, help="crisis messages mixed into the burst")
+    parser.add_argument("--max-concurrent", type=int, default=16, help="ADMISSION_MAX_CONCURRENT")
+    parser.add_argument("--max-queue", type=int, default=500, help="ADMISSION_MAX_QUEUE")
+    parser.add_argument("--max-queue-wait", type=float, default=2.0, help="ADMISSION_MAX_QUEUE_WAIT in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the burst")
+    args = parser.parse_args()
+    configure(args)
+    asyncio.run(run(args))
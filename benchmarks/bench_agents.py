@@ -0,0 +1,87 @@
+"""
+Per-agent benchmark for the Mental Health Chatbot.
+
+Runs each agent's process() in graph order (safety, triage, then empathy or
+resource, then memory) on corpus messages, starting from states with
+conversation histories of increasing length, and prints latency
+percentiles per agent. It also checks that the state as a session store
+encodes it stays within the memory agent's max_state_bytes, and exits
+with status 1 if it does not.
+
+Usage:
+    python benchmarks/bench_agents.py --lengths 0,20,200 --iterations 200 --seed 0
+    python benchmarks/bench_agents.py --max-state-bytes 8192
+"""
+
+import argparse
+import sys
+import time
+
+from corpus import build_corpus, seed_everything, format_summary
+from bench_state_encoding import build_state
+
+from agents import TriageAgent, EmpathyAgent, ResourceAgent, SafetyAgent, MemoryAgent
+from sessions import MemorySessionStore
+
+def run_turn(agents, state, samples):
+    """Run one turn through the agents in graph order, timing each process() call.
+
+    Returns whether the turn reached the memory agent.
+    """
+    def timed(name):
+        started = time.perf_counter()
+        agents[name].process(state)
+        samples[name].append(time.perf_counter() - started)
+
+    timed("safety")
+    timed("triage")
+    # Follow the graph: crisis turns end after triage
+    if state.safety_check.needs_human_intervention:
+        return False
+    if state.current_agent in ("empathy", "resource"):
+        timed(state.current_agent)
+    timed("memory")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", default="0,20,200", help="conversation lengths in turns before the timed turn")
+    parser.add_argument("--iterations", type=int, default=200, help="turns timed per length")
+    parser.add_argument("--seed", type=int, default=None, help="seed random and numpy.random for repeatable results")
+    parser.add_argument("--max-state-bytes", type=int, default=None, help="memory agent state budget (default: the agent's)")
+    args = parser.parse_args()
+    seed_everything(args.seed)
+
+    agents = {
+        "safety": SafetyAgent(model_name="toxicity-moderator"),
+        "triage": TriageAgent(model_name="llm-triage"),
+        "empathy": EmpathyAgent(model_name="empathy-llm"),
+        "resource": ResourceAgent(model_name="resource-llm"),
+        "memory": MemoryAgent(
+            model_name="memory-manager",
+            parameters={} if args.max_state_bytes is None else {"max_state_bytes": args.max_state_bytes}
+        ),
+    }
+    store = MemorySessionStore()
+    ok = True
+    messages = [message for conversation in build_corpus(50, 10) for message in conversation]
+
+    for length in [int(value) for value in args.lengths.split(",")]:
+        base = build_state(length)
+        samples = {name: [] for name in agents}
+        largest = 0
+        for i in range(args.iterations):
+            # Each timed turn starts from the same history
+            state = base.model_copy(deep=True)
+            state.start_turn(messages[i % len(messages)])
+            # Crisis turns end before the memory agent compacts the history
+            if run_turn(agents, state, samples):
+                largest = max(largest, len(store.encode(state)))
+
+        budget = agents["memory"].max_state_bytes
+        ok = ok and largest <= budget
+        print(f"history of {length} turns, largest stored state {largest} of {budget} bytes"
+              f"{' OVER BUDGET' if largest > budget else ''}")
+        for name, values in samples.items():
+            print("  " + format_summary(name, values))
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,96 @@
+"""
+Micro-batching benchmark for the transformer EmotionClassifier.
+
+Runs concurrent client threads against the unbatched classifier and the
+BatchingEmotionClassifier front-end for several max batch size / max wait
+settings, and prints throughput against latency percentiles.
+
+Usage:
+    python benchmarks/bench_batching.py --clients 32 --requests 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Every repetition must run the model, not hit the score cache
+os.environ["SCORE_CACHE_SIZE"] = "0"
+
+from emotion_classifier import EmotionClassifier, BatchingEmotionClassifier
+
+MESSAGES = [
+    "hi",
+    "I feel sad today",
+    "thanks, that helped a lot",
+    "I can't stop worrying about my exams and I haven't slept properly in days",
+    "My manager yelled at me again in front of everyone and I'm so angry I could scream",
+    "Honestly I don't know what to feel anymore. Everything is grey and nothing seems to matter, "
+    "even the things I used to love. My friends keep asking what's wrong and I can't explain it.",
+]
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def run_clients(classify, clients, requests, seed):
+    """Run client threads that each send `requests` messages; return (throughput, latencies)."""
+    latencies = []
+    lock = threading.Lock()
+
+    def client(index):
+        rng = random.Random(seed + index)
+        local = []
+        for _ in range(requests):
+            text = rng.choice(MESSAGES)
+            started = time.perf_counter()
+            classify(text)
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, latencies
+
+def report(name, throughput, latencies, extra=""):
+    print(
+        f"{name:<28} {throughput:>9.1f} msg/s  "
+        f"p50 {percentile(latencies, 0.50) * 1000:>7.1f} ms  "
+        f"p95 {percentile(latencies, 0.95) * 1000:>7.1f} ms  "
+        f"p99 {percentile(latencies, 0.99) * 1000:>7.1f} ms  {extra}"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32, help="concurrent client threads")
+    parser.add_argument("--requests", type=int, default=20, help="messages per client")
+    parser.add_argument("--batch-sizes", default="4,8,16,32", help="max batch sizes to try")
+    parser.add_argument("--waits", default="1,5,10", help="max wait times (ms) to try")
+    parser.add_argument("--seed", type=int, default=0, help="seed for message selection")
+    args = parser.parse_args()
+
+    model = EmotionClassifier()
+    model.classify("warmup")
+
+    # The classifier serializes calls to its pipeline, so the unbatched
+    # baseline behaves like a shared instance
+    throughput, latencies = run_clients(model.classify, args.clients, args.requests, args.seed)
+    report("unbatched", throughput, latencies)
+
+    for batch_size in [int(value) for value in args.batch_sizes.split(",")]:
+        for wait in [float(value) for value in args.waits.split(",")]:
+            batching = BatchingEmotionClassifier(model, max_batch_size=batch_size, max_wait_ms=wait)
+            throughput, latencies = run_clients(batching.classify, args.clients, args.requests, args.seed)
+            stats = batching.stats()
+            batching.close()
+            report(f"batch={batch_size} wait={wait:g}ms", throughput, latencies, f"mean batch {stats['mean_batch_size']:.1f}")
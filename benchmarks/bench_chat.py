@@ -0,0 +1,49 @@
+"""
+End-to-end /chat benchmark through an in-process ASGI client.
+
+Replays the synthetic conversation corpus against the FastAPI app without a
+network hop, several conversations at a time, and reports throughput,
+turn latency percentiles and the per-agent latencies recorded by the app's
+own metrics.
+
+Usage:
+    python benchmarks/bench_chat.py --conversations 50 --turns 10 --concurrency 8 --seed 0
+"""
+
+import argparse
+import asyncio
+import time
+
+from corpus import build_corpus, replay, seed_everything, format_summary
+
+import httpx
+import app as api
+from agents.metrics import metrics
+
+async def run(args):
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # Load the models before timing
+        await client.post("/chat", json={"message": "hello"})
+        started = time.perf_counter()
+        latencies, errors = await replay(client, build_corpus(args.conversations, args.turns), args.concurrency)
+        elapsed = time.perf_counter() - started
+
+    print(format_summary("/chat turn", latencies, f"{len(latencies) / elapsed:.1f} turns/s, {errors} errors"))
+    for series in metrics.snapshot()["chatbot_agent_latency_seconds"]:
+        quantiles = series["quantiles"]
+        print(
+            f"  agent {series['labels']['agent']:<21} n={series['count']:<6} "
+            f"mean {series['sum'] / series['count'] * 1000:>8.3f} ms  "
+            f"p50 {quantiles[0.5] * 1000:>8.3f} ms  p95 {quantiles[0.95] * 1000:>8.3f} ms  p99 {quantiles[0.99] * 1000:>8.3f} ms"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=50, help="conversations to replay")
+    parser.add_argument("--turns", type=int, default=10, help="user messages per conversation")
+    parser.add_argument("--concurrency", type=int, default=8, help="conversations in flight at once")
+    parser.add_argument("--seed", type=int, default=None, help="seed random and numpy.random for repeatable results")
+    args = parser.parse_args()
+    seed_everything(args.seed)
+    asyncio.run(run(args))
@@ -0,0 +1,87 @@
+"""
+Benchmark for the rolling crisis risk score.
+
+Replays a conversation in which no single message is high risk but the risk
+builds up over turns. For each turn it prints the SafetyAgent's risk level
+for the message alone next to the cumulative score and level. It then
+compares the cost per turn of the O(1) rolling update with re-scanning
+every user message of the conversation so far, for several conversation
+lengths.
+
+Usage:
+    python benchmarks/bench_crisis_detection.py --lengths 10,100,1000
+"""
+
+import argparse
+import time
+
+import corpus  # noqa: F401  (puts the backend on sys.path)
+
+from agents import SafetyAgent, TriageAgent, ChatbotState
+from NLP.crisis_detection import CrisisDetector
+from ml_models.score_cache import ScoreCache
+from ml_models.toxicity_moderator import ToxicityModerator
+from ml_models.emotion_classifier import EmotionClassifier
+
+BUILDING_RISK = [
+    "hi",
+    "I feel so sad and lonely lately",
+    "I've been drinking a lot of alcohol to cope",
+    "I'm so useless and worthless, I hate how stupid I am",
+    "more alcohol tonight, I'm sad and I can't stop",
+    "I'm worthless, I hate myself and everyone would be better without me",
+    "I feel depressed and empty and I'm drinking again",
+]
+
+def replay_building_risk():
+    safety = SafetyAgent(parameters={"rolling_risk_escalation": False})
+    triage = TriageAgent()
+    state = ChatbotState()
+    print(f"{'turn':<5} {'message level':<14} {'score':>6} {'cumulative':<11} message")
+    for turn, message in enumerate(BUILDING_RISK, 1):
+        state.start_turn(message)
+        safety(state)
+        message_level = state.safety_check.risk_level
+        analysis = triage.classify_emotion(message)
+        rolling = state.user_info.risk_factors["rolling_risk"]
+        # What the MemoryAgent does at the end of the turn
+        safety.crisis_detector.update_emotion(rolling, analysis.primary_emotion, analysis.confidence)
+        level = safety.crisis_detector.risk_level(rolling["score"])
+        print(f"{turn:<5} {message_level:<14} {rolling['score']:>6.3f} {level:<11} {message}")
+
+def rescan(detector, toxicity, emotion, topics, messages):
+    """Rebuild the rolling state from every message, as a history re-scan would."""
+    rolling = None
+    for message in messages:
+        rolling = detector.update_safety(rolling, toxicity.check_toxicity(message), topics(message), False)
+        result = emotion.classify(message)
+        detector.update_emotion(rolling, result["primary_emotion"], result["confidence"])
+    return rolling
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", default="10,100,1000", help="conversation lengths in user messages")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions per measurement; the best is kept")
+    args = parser.parse_args()
+
+    replay_building_risk()
+
+    detector = CrisisDetector()
+    safety = SafetyAgent()
+    # Uncached, so the re-scan pays for scoring every message as it would with a real model
+    toxicity = ToxicityModerator(cache=ScoreCache(maxsize=0))
+    emotion = EmotionClassifier(cache=ScoreCache(maxsize=0))
+    print()
+    for length in [int(value) for value in args.lengths.split(",")]:
+        messages = (BUILDING_RISK * (length // len(BUILDING_RISK) + 1))[:length]
+        rolling = rescan(detector, toxicity, emotion, safety.detect_sensitive_topics, messages[:-1])
+        incremental = rescanned = float("inf")
+        for _ in range(args.repeat):
+            state = dict(rolling, topics=dict(rolling["topics"]))
+            started = time.perf_counter()
+            detector.update_safety(state, toxicity.check_toxicity(messages[-1]), safety.detect_sensitive_topics(messages[-1]), False)
+            incremental = min(incremental, time.perf_counter() - started)
+            started = time.perf_counter()
+            rescan(detector, toxicity, emotion, safety.detect_sensitive_topics, messages)
+            rescanned = min(rescanned, time.perf_counter() - started)
+        print(f"{length:>6} messages  rolling update {incremental * 1e6:>9.1f} us/turn  full re-scan {rescanned * 1e6:>11.1f} us/turn")
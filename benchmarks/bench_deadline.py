@@ -0,0 +1,66 @@
+"""
+Deadline benchmark for the emotion analysis in TriageAgent.
+
+Stands in for the transformer classifier with one whose latency follows a
+log-normal distribution (--median-ms, --sigma), as real inference does under
+load, and times TriageAgent.classify_emotion() for several latency budgets.
+For each budget it reports the analysis latency and how often the keyword
+classifier answered instead. No budget waits for the transformer every time.
+
+Usage:
+    python benchmarks/bench_deadline.py --budgets-ms none,100,50,20 --median-ms 30 --sigma 0.6
+"""
+
+import argparse
+import random
+import time
+
+from corpus import build_corpus, format_summary
+
+from agents import TriageAgent
+from agents.metrics import metrics
+
+class SlowTransformer:
+    """Returns transformer-shaped results after a random delay."""
+
+    def __init__(self, median_ms, sigma, seed):
+        self.median = median_ms / 1000
+        self.sigma = sigma
+        self.rng = random.Random(seed)
+
+    def classify(self, text):
+        time.sleep(self.median * self.rng.lognormvariate(0, self.sigma))
+        return {
+            "primary_emotion": "sadness",
+            "confidence": 0.9,
+            "all_emotions": [{"label": "sadness", "score": 0.9}, {"label": "neutral", "score": 0.1}]
+        }
+
+def counter(name, **labels):
+    for series in metrics.snapshot().get(name, []):
+        if series["labels"] == labels:
+            return series["value"]
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budgets-ms", default="none,100,50,20", help="latency budgets to try; none waits for the transformer")
+    parser.add_argument("--median-ms", type=float, default=30.0, help="median transformer latency")
+    parser.add_argument("--sigma", type=float, default=0.6, help="spread of the log-normal transformer latency")
+    parser.add_argument("--messages", type=int, default=200, help="messages per budget")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the simulated latencies")
+    args = parser.parse_args()
+
+    messages = [m for conversation in build_corpus(args.messages, 1, args.seed) for m in conversation]
+    agent = TriageAgent(model_name="llm-triage")
+    for budget in args.budgets_ms.split(","):
+        agent.transformer = SlowTransformer(args.median_ms, args.sigma, args.seed)
+        budget_s = None if budget == "none" else float(budget) / 1000
+        before = counter("chatbot_emotion_classifications_total", backend="keyword")
+        latencies = []
+        for message in messages:
+            started = time.monotonic()
+            agent.classify_emotion(message, None if budget_s is None else started + budget_s)
+            latencies.append(time.monotonic() - started)
+        fallbacks = counter("chatbot_emotion_classifications_total", backend="keyword") - before
+        print(format_summary(f"budget {budget:>4} ms", latencies, f"fallback {fallbacks / len(messages):.1%}"))
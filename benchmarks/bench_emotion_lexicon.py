@@ -0,0 +1,57 @@
+"""
+Microbenchmark for the rule-based EmotionClassifier keyword counting.
+
+Compares the old per-keyword word-boundary search (one regex per keyword
+per message) with the precompiled single-alternation scan used by
+classify(), on short messages and on multi-KB messages.
+
+Usage:
+    python benchmarks/bench_emotion_lexicon.py --repeat 2000
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml_models.emotion_classifier import EmotionClassifier
+
+SHORT = "I'm so worried and stressed about tomorrow, but also a bit excited."
+FILLER = (
+    "Work has been a lot lately and I keep going over the same conversations in my head. "
+    "Some days are fine and then out of nowhere everything feels heavy again. "
+)
+LONG = (FILLER * 40) + "Honestly I feel sad and lonely most evenings, and I'm angry at myself for it."
+
+def per_keyword_counts(classifier, text):
+    """The previous implementation: one word-boundary search per keyword."""
+    text_lower = text.lower()
+    counts = {}
+    for emotion, keywords in classifier.emotion_keywords.items():
+        if emotion == "neutral":
+            continue
+        counts[emotion] = sum(1 for keyword in keywords if re.search(rf'\b{keyword}\b', text_lower))
+    return counts
+
+def single_pass_counts(classifier, text):
+    """The current implementation: one scan of the precompiled alternation."""
+    counts = {emotion: 0 for emotion in classifier.emotions if emotion != "neutral"}
+    for keyword in set(classifier._keyword_pattern.findall(text.lower())):
+        counts[classifier.emotions[classifier._keyword_index[keyword]]] += 1
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000, help="calls per measurement")
+    args = parser.parse_args()
+
+    classifier = EmotionClassifier()
+    for name, text in [("short", SHORT), ("long", LONG)]:
+        assert per_keyword_counts(classifier, text) == single_pass_counts(classifier, text)
+        print(f"{name} input ({len(text)} chars)")
+        for label, fn in [("per-keyword search", per_keyword_counts), ("single pass", single_pass_counts)]:
+            seconds = min(timeit.repeat(lambda: fn(classifier, text), number=args.repeat, repeat=5)) / args.repeat
+            print(f"  {label:<20} {seconds * 1e6:>9.1f} us/message")
@@ -0,0 +1,147 @@
+"""
+Parity check and overhead benchmark for the agent graph executors.
+
+Replays the conversation corpus through the LangGraph executor and the
+native StaticGraphExecutor with the same seeds and checks that every turn
+ends in the same state, for invoke, ainvoke and astream. It then measures
+per-turn time with the real agents and with pass-through agents, which
+isolates the executor's own overhead.
+
+Usage:
+    python benchmarks/bench_executor.py --conversations 50 --turns 10
+"""
+
+import argparse
+import asyncio
+import time
+
+from corpus import build_corpus, seed_everything, format_summary
+
+from agents import TriageAgent, EmpathyAgent, ResourceAgent, SafetyAgent, MemoryAgent, create_agent_graph, ChatbotState
+from agents.base_agent import BaseAgent
+
+# Fields holding wall-clock times, which differ between any two runs
+VOLATILE_KEYS = {"timestamp", "latest_assessment", "user_id"}
+
+class PassThroughAgent(BaseAgent):
+    """Agent that leaves the state as it is, so only the executor is timed."""
+
+    def process(self, state: ChatbotState) -> ChatbotState:
+        return state
+
+class SeededAgent(BaseAgent):
+    """Reseeds the generators before every call of the wrapped agent.
+    
+    LangGraph itself draws from the global random generator, so seeding once
+    per run would hand the agents different numbers under each executor.
+    """
+
+    def __init__(self, agent: BaseAgent, seed: int):
+        self.agent = agent
+        self.seed = seed
+        self.calls = 0
+        self.cpu_bound = agent.cpu_bound
+        super().__init__(agent.model_name)
+
+    def __getattr__(self, attribute):
+        # Helpers such as classify_emotion() come from the wrapped agent
+        return getattr(self.agent, attribute)
+
+    @property
+    def name(self) -> str:
+        return self.agent.name
+
+    def reseed(self):
+        self.calls += 1
+        seed_everything(self.seed * 1000003 + self.calls)
+
+    def prepare(self, state: ChatbotState):
+        self.reseed()
+        return self.agent.prepare(state)
+
+    def process(self, state: ChatbotState) -> ChatbotState:
+        self.reseed()
+        return self.agent.process(state)
+
+def make_agents():
+    return dict(
+        triage_agent=TriageAgent(model_name="llm-triage"),
+        empathy_agent=EmpathyAgent(model_name="empathy-llm"),
+        resource_agent=ResourceAgent(model_name="resource-llm"),
+        safety_agent=SafetyAgent(model_name="toxicity-moderator"),
+        memory_agent=MemoryAgent(model_name="memory-manager"),
+    )
+
+def comparable(value):
+    """Drop the volatile fields from a dumped state."""
+    if isinstance(value, dict):
+        return {key: comparable(item) for key, item in value.items() if key not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [comparable(item) for item in value]
+    return value
+
+async def run_turn(graph, state, mode):
+    if mode == "invoke":
+        return graph.invoke({"state": state})["state"]
+    if mode == "ainvoke":
+        return (await graph.ainvoke({"state": state}))["state"]
+    async for _ in graph.astream({"state": state}, stream_mode="updates"):
+        pass
+    return state
+
+async def replay(agents, executor, parallel, corpus, mode, seed):
+    """Replay the corpus through a graph and return the state dump after every turn."""
+    seeded = {name: SeededAgent(agent, seed) for name, agent in agents.items()}
+    graph = create_agent_graph(**seeded, executor=executor, parallel=parallel)
+    dumps = []
+    for conversation in corpus:
+        state = ChatbotState()
+        for message in conversation:
+            state.start_turn(message)
+            state = await run_turn(graph, state, mode)
+            dumps.append(comparable(state.model_dump()))
+    return dumps
+
+async def time_turns(graph, corpus, mode):
+    latencies = []
+    for conversation in corpus:
+        state = ChatbotState()
+        for message in conversation:
+            state.start_turn(message)
+            started = time.perf_counter()
+            await run_turn(graph, state, mode)
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+async def main(args):
+    corpus = build_corpus(args.conversations, args.turns)
+    agents = make_agents()
+
+    ok = True
+    for parallel in (False, True):
+        for mode in ("invoke", "ainvoke", "astream"):
+            expected = await replay(agents, "langgraph", parallel, corpus, mode, args.seed)
+            actual = await replay(agents, "native", parallel, corpus, mode, args.seed)
+            mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+            ok = ok and mismatches == 0 and len(expected) == len(actual)
+            print(f"parity {'parallel' if parallel else 'sequential'} {mode:<8} {len(expected)} turns, {mismatches} mismatches")
+
+    passthrough = {name: PassThroughAgent(model_name="noop") for name in agents}
+    for label, turn_agents in (("real agents", agents), ("pass-through", passthrough)):
+        for mode in ("invoke", "ainvoke"):
+            for name in ("langgraph", "native"):
+                graph = create_agent_graph(**turn_agents, executor=name, parallel=False)
+                seed_everything(args.seed)
+                await time_turns(graph, corpus[:2], mode)
+                latencies = await time_turns(graph, corpus, mode)
+                print(format_summary(f"{label} {mode} {name}", latencies))
+    print("PASS" if ok else "FAIL")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=50, help="conversations to replay")
+    parser.add_argument("--turns", type=int, default=10, help="user messages per conversation")
+    parser.add_argument("--seed", type=int, default=0, help="seed for random and numpy.random in both runs")
+    args = parser.parse_args()
+    raise SystemExit(0 if asyncio.run(main(args)) else 1)
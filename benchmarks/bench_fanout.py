@@ -0,0 +1,74 @@
+"""
+Benchmark for running the safety check and emotion analysis concurrently.
+
+Compares per-turn latency of the sequential graph (safety, then triage)
+with the parallel one (safety alongside emotion analysis and speculative
+response preparation) through ainvoke. The rule-based models answer in
+microseconds, where the thread hand-off dominates; --model-latency-ms adds
+a blocking delay to both models, standing in for transformer inference
+(which releases the GIL the same way), to show how the two layouts scale.
+
+Usage:
+    python benchmarks/bench_fanout.py --model-latency-ms 0,20 --seed 0
+"""
+
+import argparse
+import asyncio
+import time
+
+from corpus import build_corpus, seed_everything, format_summary
+
+from agents import TriageAgent, EmpathyAgent, ResourceAgent, SafetyAgent, MemoryAgent, create_agent_graph, ChatbotState
+
+def with_latency(fn, seconds):
+    """Wrap a model call so that it blocks for `seconds` first."""
+    def slow(*args, **kwargs):
+        time.sleep(seconds)
+        return fn(*args, **kwargs)
+    return slow
+
+async def time_turns(graph, corpus):
+    latencies = []
+    for conversation in corpus:
+        state = ChatbotState()
+        for message in conversation:
+            state.start_turn(message)
+            started = time.perf_counter()
+            await graph.ainvoke({"state": state})
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+async def main(args):
+    corpus = build_corpus(args.conversations, args.turns)
+    for latency_ms in [float(value) for value in args.model_latency_ms.split(",")]:
+        agents = dict(
+            triage_agent=TriageAgent(model_name="llm-triage"),
+            empathy_agent=EmpathyAgent(model_name="empathy-llm"),
+            resource_agent=ResourceAgent(model_name="resource-llm"),
+            safety_agent=SafetyAgent(model_name="toxicity-moderator"),
+            memory_agent=MemoryAgent(model_name="memory-manager"),
+        )
+        if latency_ms:
+            moderator = agents["safety_agent"].toxicity_moderator
+            moderator.check_toxicity = with_latency(moderator.check_toxicity, latency_ms / 1000)
+            classifier = agents["triage_agent"].emotion_classifier
+            classifier.classify = with_latency(classifier.classify, latency_ms / 1000)
+
+        for executor in args.executors.split(","):
+            for parallel in (False, True):
+                graph = create_agent_graph(**agents, executor=executor, parallel=parallel)
+                seed_everything(args.seed)
+                await time_turns(graph, corpus[:1])
+                latencies = await time_turns(graph, corpus)
+                layout = "parallel" if parallel else "sequential"
+                print(format_summary(f"{latency_ms:g}ms {executor} {layout}", latencies))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=10, help="conversations to replay")
+    parser.add_argument("--turns", type=int, default=10, help="user messages per conversation")
+    parser.add_argument("--model-latency-ms", default="0,20", help="added latency per model call")
+    parser.add_argument("--executors", default="langgraph,native", help="graph executors to compare")
+    parser.add_argument("--seed", type=int, default=None, help="seed random and numpy.random for repeatable results")
+    args = parser.parse_args()
+    asyncio.run(main(args))
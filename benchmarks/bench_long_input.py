@@ -0,0 +1,64 @@
+"""
+Long message benchmark for the transformer EmotionClassifier.
+
+Builds messages of increasing length from the conversation corpus and
+times classify() on each. Long messages are split into overlapping windows,
+and at most EMOTION_MAX_WINDOWS of them are classified. The run is repeated
+with the pipeline's own truncation to the first 512 tokens.
+Reports the windows used, the latency and the primary emotion for each
+length.
+
+Usage:
+    python benchmarks/bench_long_input.py --words 20,200,500,1000,2000,5000 --max-windows 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Every repetition must run the model, not hit the score cache
+os.environ["SCORE_CACHE_SIZE"] = "0"
+
+from emotion_classifier import EmotionClassifier
+from corpus import MESSAGES, percentile
+
+def truncated(model, text):
+    """Classify only the first 512 tokens of a text, as the plain pipeline does."""
+    return model._format(model.classifier([text], truncation=True)[0])
+
+def long_message(words):
+    """Join corpus messages, sad ones towards the end, until the text has `words` words."""
+    sentences = MESSAGES["info"] + MESSAGES["gratitude"] + MESSAGES["anxiety"] + MESSAGES["sadness"]
+    text = []
+    while len(text) < words:
+        text.extend(sentences[len(text) % len(sentences)].split())
+    return " ".join(text[:words])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", default="20,200,500,1000,2000,5000", help="message lengths in words")
+    parser.add_argument("--max-windows", type=int, default=8, help="window cap for the long-input mode")
+    parser.add_argument("--window-overlap", type=int, default=64, help="tokens shared by neighbouring windows")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per length")
+    args = parser.parse_args()
+
+    model = EmotionClassifier(window_overlap=args.window_overlap, max_windows=args.max_windows)
+    modes = (("windowed", model.classify), ("truncated", lambda text: truncated(model, text)))
+    for label, classify in modes:
+        classify("warm up")
+        for words in [int(value) for value in args.words.split(",")]:
+            text = long_message(words)
+            windows = model.windows(text)[0] if label == "windowed" else [text]
+            latencies = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                result = classify(text)
+                latencies.append(time.perf_counter() - started)
+            print(
+                f"{label:<10} {words:>6} words  {len(windows):>3} windows  "
+                f"p50 {percentile(latencies, 0.50) * 1000:>8.1f} ms  max {max(latencies) * 1000:>8.1f} ms  "
+                f"{result['primary_emotion']} ({result['confidence']:.2f}){'  error: ' + result['error'] if 'error' in result else ''}"
+            )
@@ -0,0 +1,71 @@
+"""
+Benchmark for the rule-based ml_models classifiers.
+
+Times EmotionClassifier.classify / ToxicityModerator.check_toxicity one
+message at a time against classify_batch / check_toxicity_batch for
+several batch sizes, reports the cost per message, and counts the texts
+whose batch result differs from the single-message one.
+
+Usage:
+    python benchmarks/bench_ml_models.py --batch-sizes 1,16,256 --seed 0
+"""
+
+import argparse
+import time
+
+from corpus import build_corpus, seed_everything
+
+from ml_models.emotion_classifier import EmotionClassifier
+from ml_models.toxicity_moderator import ToxicityModerator
+from ml_models.score_cache import ScoreCache
+
+def mismatches(name, single, batch, texts):
+    """Count the texts whose batch result differs from scoring them alone."""
+    results = batch(texts)
+    if name == "toxicity":
+        return sum(1 for text, score in zip(texts, results) if single(text) != score)
+    return sum(
+        1 for i, text in enumerate(texts)
+        if single(text) != {
+            "primary_emotion": results["primary_emotion"][i],
+            "confidence": results["confidence"][i],
+            "secondary_emotions": {
+                emotion: results["scores"][i, j] for j, emotion in enumerate(results["emotions"])
+                if j != results["primary_index"][i] and emotion != "neutral"
+            }
+        }
+    )
+
+def per_message_us(fn, texts, repeat):
+    """Best-of-`repeat` time of fn(texts), in microseconds per message."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(texts)
+        best = min(best, time.perf_counter() - started)
+    return best / len(texts) * 1e6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", default="1,16,256", help="batch sizes to try")
+    parser.add_argument("--repeat", type=int, default=20, help="repetitions per measurement; the best is kept")
+    parser.add_argument("--seed", type=int, default=None, help="seed random and numpy.random for repeatable results")
+    args = parser.parse_args()
+    seed_everything(args.seed)
+
+    # Without the score cache, so the single-message path is timed doing the work
+    emotion = EmotionClassifier(cache=ScoreCache(maxsize=0))
+    toxicity = ToxicityModerator(cache=ScoreCache(maxsize=0))
+    messages = [message for conversation in build_corpus(100, 10) for message in conversation]
+
+    print(f"{'model':<20} {'batch':>6} {'single us/msg':>14} {'batch us/msg':>13} {'mismatches':>11}")
+    for batch_size in [int(value) for value in args.batch_sizes.split(",")]:
+        texts = (messages * (batch_size // len(messages) + 1))[:batch_size]
+        for name, single, batch in (
+            ("emotion", emotion.classify, emotion.classify_batch),
+            ("toxicity", toxicity.check_toxicity, toxicity.check_toxicity_batch),
+        ):
+            looped = per_message_us(lambda texts: [single(text) for text in texts], texts, args.repeat)
+            batched = per_message_us(batch, texts, args.repeat)
+            differ = mismatches(name, single, batch, texts)
+            print(f"{name:<20} {batch_size:>6} {looped:>14.2f} {batched:>13.2f} {differ:>11}")
@@ -0,0 +1,92 @@
+"""
+Backend comparison for the transformer EmotionClassifier.
+
+Loads the emotion model on each backend (PyTorch, ONNX Runtime and ONNX
+Runtime with int8 weights), checks that the ONNX backends pick the same
+primary emotion as PyTorch and how far their scores drift, and reports
+resident memory growth and single-message and batch latency for each.
+
+The ONNX backends need the optional extras (pip install
+optimum[onnxruntime]); the first run exports the model to EMOTION_ONNX_DIR.
+Backends are loaded one after another in this process, so the memory
+figure for each is its growth on top of the ones loaded before it.
+
+Usage:
+    python benchmarks/bench_onnx.py --backends torch,onnx,onnx-int8 --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Every repetition must run the model, not hit the score cache
+os.environ["SCORE_CACHE_SIZE"] = "0"
+
+from emotion_classifier import EmotionClassifier
+from bench_batching import MESSAGES, percentile
+from bench_shared_model import rss_mb
+from corpus import MESSAGES as CORPUS
+
+def scores(result):
+    return {item["label"]: item["score"] for item in result.get("all_emotions", [])}
+
+def compare(reference, results):
+    """Return (share of matching primary emotions, largest score difference)."""
+    matches = sum(1 for a, b in zip(reference, results) if a["primary_emotion"] == b["primary_emotion"])
+    drift = max(
+        abs(score - scores(b).get(label, 0.0))
+        for a, b in zip(reference, results)
+        for label, score in scores(a).items()
+    )
+    return matches / len(reference), drift
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8", help="backends to compare; the first is the reference")
+    parser.add_argument("--repeat", type=int, default=20, help="timed passes over the messages")
+    parser.add_argument("--min-agreement", type=float, default=0.9, help="fail if a backend agrees with the reference less often")
+    args = parser.parse_args()
+
+    texts = MESSAGES + [message for messages in CORPUS.values() for message in messages]
+    reference = None
+    ok = True
+    for backend in args.backends.split(","):
+        rss_before = rss_mb()
+        started = time.perf_counter()
+        classifier = EmotionClassifier(backend)
+        load_seconds = time.perf_counter() - started
+        rss_growth = rss_mb() - rss_before
+
+        results = [classifier.classify(text) for text in texts]
+        if any("error" in result for result in results):
+            print(f"{backend}: classification failed: {next(r['error'] for r in results if 'error' in r)}")
+            ok = False
+            continue
+
+        single = []
+        for _ in range(args.repeat):
+            for text in texts:
+                started = time.perf_counter()
+                classifier.classify(text)
+                single.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            classifier.classify_batch(texts)
+        batch_ms = (time.perf_counter() - started) / args.repeat * 1000
+
+        print(
+            f"{backend:<10} load {load_seconds:>6.1f} s  RSS +{rss_growth:>7.1f} MB  "
+            f"single p50 {percentile(single, 0.50) * 1000:>7.2f} ms  p95 {percentile(single, 0.95) * 1000:>7.2f} ms  "
+            f"batch of {len(texts)} {batch_ms:>8.1f} ms"
+        )
+        if reference is None:
+            reference = results
+            continue
+        agreement, drift = compare(reference, results)
+        ok = ok and agreement >= args.min_agreement
+        print(f"{'':<10} primary emotion agreement {agreement:.1%}, max score difference {drift:.4f}")
+    print("PASS" if ok else "FAIL")
+    raise SystemExit(0 if ok else 1)
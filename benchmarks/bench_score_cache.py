@@ -0,0 +1,59 @@
+"""
+Score cache benchmark for the rule-based ml_models classifiers.
+
+Replays the messages of the conversation corpus through
+EmotionClassifier.classify and ToxicityModerator.check_toxicity with and
+without the score cache. It checks that, in deterministic mode, every cached
+result equals the uncached one, and reports the hit rate and the time per
+message.
+
+Usage:
+    python benchmarks/bench_score_cache.py --conversations 1000 --cache-size 4096
+"""
+
+import argparse
+import time
+
+from corpus import build_corpus, percentile
+
+from ml_models.emotion_classifier import EmotionClassifier
+from ml_models.toxicity_moderator import ToxicityModerator
+from ml_models.score_cache import ScoreCache
+
+def timed(fn, messages):
+    """Return the results of fn over the messages and the per-message latencies."""
+    results = []
+    latencies = []
+    for message in messages:
+        started = time.perf_counter()
+        results.append(fn(message))
+        latencies.append(time.perf_counter() - started)
+    return results, latencies
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=1000, help="conversations whose messages are replayed")
+    parser.add_argument("--turns", type=int, default=10, help="user messages per conversation")
+    parser.add_argument("--cache-size", type=int, default=4096, help="entries per cache")
+    args = parser.parse_args()
+    messages = [message for conversation in build_corpus(args.conversations, args.turns) for message in conversation]
+
+    ok = True
+    for name, model in (("emotion", EmotionClassifier), ("toxicity", ToxicityModerator)):
+        uncached = model(cache=ScoreCache(maxsize=0))
+        cache = ScoreCache(maxsize=args.cache_size)
+        cached = model(cache=cache)
+        score = "classify" if name == "emotion" else "check_toxicity"
+
+        expected, plain = timed(getattr(uncached, score), messages)
+        actual, fast = timed(getattr(cached, score), messages)
+        mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+        ok = ok and mismatches == 0
+        stats = cache.stats()
+        print(
+            f"{name:<9} {len(messages)} messages  hit rate {stats['hit_rate']:.1%}  {mismatches} mismatches  "
+            f"uncached mean {sum(plain) / len(plain) * 1e6:>6.2f} us p99 {percentile(plain, 0.99) * 1e6:>6.2f} us  "
+            f"cached mean {sum(fast) / len(fast) * 1e6:>6.2f} us p99 {percentile(fast, 0.99) * 1e6:>6.2f} us"
+        )
+    print("PASS" if ok else "FAIL")
+    raise SystemExit(0 if ok else 1)
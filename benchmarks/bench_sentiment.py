@@ -0,0 +1,64 @@
+"""
+Sentiment analyzer benchmark.
+
+Scores the messages of the conversation corpus with
+SentimentAnalyzer.polarity_scores one at a time and with
+polarity_scores_batch in batches of several sizes. It checks that every
+batch result equals the single-message one, and reports messages per second
+for each mode. With the vaderSentiment package installed it also reports how
+often the compound valence has the same sign as VADER's.
+
+Usage:
+    python benchmarks/bench_sentiment.py --conversations 5000 --batch-sizes 1,64,1024,8192
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from corpus import build_corpus
+
+from NLP.sentiment_analysis import SentimentAnalyzer
+
+def throughput(fn, items, repeat):
+    """Return the results of fn over the items and the best items per second of repeat runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [fn(item) for item in items]
+        best = min(best, time.perf_counter() - started)
+    return results, len(items) / best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=5000, help="conversations whose messages are scored")
+    parser.add_argument("--turns", type=int, default=10, help="user messages per conversation")
+    parser.add_argument("--batch-sizes", default="1,64,1024,8192", help="comma-separated batch sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per mode; the fastest is reported")
+    args = parser.parse_args()
+    messages = [message for conversation in build_corpus(args.conversations, args.turns) for message in conversation]
+    analyzer = SentimentAnalyzer()
+    print(f"{len(messages)} messages, {len(analyzer.index)} vocabulary entries")
+
+    single, rate = throughput(analyzer.polarity_scores, messages, args.repeat)
+    expected = np.array([scores["compound"] for scores in single])
+    print(f"{'single':<12} {rate:>12,.0f} messages/s")
+
+    for size in [int(s) for s in args.batch_sizes.split(",")]:
+        batches = [messages[i:i + size] for i in range(0, len(messages), size)]
+        results, rate = throughput(analyzer.polarity_scores_batch, batches, args.repeat)
+        compound = np.concatenate([scores["compound"] for scores in results])
+        mismatches = int(np.count_nonzero(compound != expected))
+        print(f"{'batch ' + str(size):<12} {rate * len(messages) / len(batches):>12,.0f} messages/s  mismatches: {mismatches}")
+
+    try:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    except ImportError:
+        print("vaderSentiment not installed, skipping the comparison")
+    else:
+        unique = sorted(set(messages))
+        vader = SentimentIntensityAnalyzer()
+        reference = np.sign([vader.polarity_scores(message)["compound"] for message in unique])
+        ours = np.sign(analyzer.polarity_scores_batch(unique)["compound"])
+        print(f"sign agreement with VADER: {np.mean(reference == ours):.1%} of {len(unique)} unique messages")
@@ -0,0 +1,88 @@
+"""
+Shared model benchmark for the transformer EmotionClassifier.
+
+Simulates Streamlit browser sessions, each sending its first message from
+its own thread, and compares giving every session its own EmotionClassifier
+(the old behaviour) with sharing the process-wide model from
+get_emotion_classifier(). Reports resident memory growth and first-message
+latency for each session count.
+
+The per-session mode loads one copy of the model per session, so 50
+sessions need several GB of RAM; limit it with --per-session-max.
+
+Usage:
+    python benchmarks/bench_shared_model.py --sessions 1,50
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Every repetition must run the model, not hit the score cache
+os.environ["SCORE_CACHE_SIZE"] = "0"
+
+from emotion_classifier import EmotionClassifier, get_emotion_classifier
+from bench_batching import MESSAGES, percentile
+
+def rss_mb():
+    """Current resident set size of this process in MB."""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+def run_sessions(get_classifier, sessions, seed):
+    """Start one thread per session sending its first message; return per-session latencies."""
+    latencies = [0.0] * sessions
+    start = threading.Barrier(sessions)
+
+    def session(index):
+        text = random.Random(seed + index).choice(MESSAGES)
+        start.wait()
+        started = time.perf_counter()
+        get_classifier().classify(text)
+        latencies[index] = time.perf_counter() - started
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+def report(name, sessions, rss_before, latencies):
+    print(
+        f"{name:<12} {sessions:>4} sessions  "
+        f"RSS +{rss_mb() - rss_before:>8.1f} MB  "
+        f"first message p50 {percentile(latencies, 0.50) * 1000:>8.1f} ms  "
+        f"p95 {percentile(latencies, 0.95) * 1000:>8.1f} ms  "
+        f"max {max(latencies) * 1000:>8.1f} ms"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="1,50", help="session counts to simulate")
+    parser.add_argument("--per-session-max", type=int, default=50, help="largest session count run in per-session mode")
+    parser.add_argument("--seed", type=int, default=0, help="seed for message selection")
+    args = parser.parse_args()
+    counts = [int(value) for value in args.sessions.split(",")]
+
+    # Per-session models; the copies are dropped between runs
+    for sessions in counts:
+        if sessions > args.per_session_max:
+            print(f"{'per-session':<12} {sessions:>4} sessions  skipped (--per-session-max {args.per_session_max})")
+            continue
+        rss_before = rss_mb()
+        latencies = run_sessions(EmotionClassifier, sessions, args.seed)
+        report("per-session", sessions, rss_before, latencies)
+
+    # Shared model; loaded once by whichever session comes first
+    rss_before = rss_mb()
+    for sessions in counts:
+        latencies = run_sessions(lambda: get_emotion_classifier(batching=True), sessions, args.seed)
+        report("shared", sessions, rss_before, latencies)
+    print(f"shared batcher: {get_emotion_classifier(batching=True).stats()}")
@@ -0,0 +1,115 @@
+"""
+Memory per worker for multi-process serving.
+
+Forks worker processes the way gunicorn does and compares workers that each
+load the models themselves (the default without preload_app) with workers
+forked from a master that loaded them first (serving.preload). Each worker
+then runs the startup warmup and a few turns, and reports its resident set
+size and proportional set size (PSS, which splits shared pages between the
+processes that map them, so the PSS of all processes adds up to the real
+memory used).
+
+The rule-based agents are small; --transformer also loads the transformer
+EmotionClassifier in every worker (needs torch and transformers), which is
+where sharing the weights pays off.
+
+Usage:
+    python benchmarks/bench_workers.py --workers 4 --transformer
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from corpus import MESSAGES
+
+def memory_kb(pid="self"):
+    """Return the Rss, Pss and Shared (clean and dirty) figures of a process in kB."""
+    figures = {"Shared": 0}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss"):
+                figures[key] = int(value.split()[0])
+            elif key in ("Shared_Clean", "Shared_Dirty"):
+                figures["Shared"] += int(value.split()[0])
+    return figures
+
+def load_models(args):
+    import app
+    if args.transformer:
+        from emotion_classifier import get_emotion_classifier
+        get_emotion_classifier(batching=False)
+    return app
+
+def worker(args, write_fd):
+    import serving
+    serving.configure_worker_threads(args.workers)
+    app = load_models(args)
+    asyncio.run(app.startup.run(app.warm_up))
+    for message in MESSAGES["sadness"] + MESSAGES["anxiety"]:
+        state = app.ChatbotState()
+        state.start_turn(message)
+        app.agent_graph.invoke({"state": state})
+        if args.transformer:
+            from emotion_classifier import get_emotion_classifier
+            get_emotion_classifier(batching=False).classify(message)
+    with os.fdopen(write_fd, "w") as f:
+        json.dump(memory_kb(), f)
+
+def run_mode(args):
+    """Fork the workers for one mode and print their memory; runs in its own process."""
+    if args.mode == "preload":
+        import serving
+        app = load_models(args)
+        serving.preload(app.startup.agents)
+
+    readers = []
+    for _ in range(args.workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                worker(args, write_fd)
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        readers.append((pid, read_fd))
+
+    # Read before reaping, so every worker is still alive while the others measure
+    results = []
+    for pid, read_fd in readers:
+        with os.fdopen(read_fd) as f:
+            results.append(json.load(f))
+    for pid, _ in readers:
+        os.waitpid(pid, 0)
+
+    master = memory_kb()
+    rss = sum(result["Rss"] for result in results) / len(results) / 1024
+    pss = sum(result["Pss"] for result in results) / len(results) / 1024
+    shared = sum(result["Shared"] for result in results) / len(results) / 1024
+    total = (sum(result["Pss"] for result in results) + master["Pss"]) / 1024
+    print(
+        f"{args.mode:<10} {args.workers} workers  per worker RSS {rss:>8.1f} MB  PSS {pss:>8.1f} MB  "
+        f"shared {shared:>8.1f} MB  master PSS {master['Pss'] / 1024:>7.1f} MB  total PSS {total:>8.1f} MB"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="worker processes to fork")
+    parser.add_argument("--transformer", action="store_true", help="also load the transformer EmotionClassifier")
+    parser.add_argument("--mode", choices=("per-worker", "preload"), help="run a single mode (used internally)")
+    args = parser.parse_args()
+    if args.mode:
+        run_mode(args)
+    else:
+        # Each mode starts from a fresh interpreter, so the first leaves nothing behind for the second
+        for mode in ("per-worker", "preload"):
+            command = [sys.executable, os.path.abspath(__file__), "--mode", mode, "--workers", str(args.workers)]
+            if args.transformer:
+                command.append("--transformer")
+            subprocess.run(command, check=True)
@@ -0,0 +1,166 @@
+"""
+Shared helpers for the benchmark suite.
+
+Builds a synthetic multi-turn conversation corpus, replays it against the
+API, seeds the random number generators used by the classifiers and the
+EmpathyAgent, and summarizes latency samples.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+
+# The agents import ml_models from the project root and each other from backend/
+for path in (ROOT, BACKEND):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Messages by kind; the corpus mixes them the way real conversations drift
+MESSAGES = {
+    "greeting": [
+        "hi",
+        "hello, is anyone there?",
+        "hey, I just wanted to talk to someone",
+    ],
+    "sadness": [
+        "I feel so sad and lonely lately",
+        "Everything feels grey and I can't enjoy anything anymore",
+        "I've been crying a lot and I don't really know why",
+        "My friends keep asking what's wrong and I can't explain it. I just feel empty and tired all the time.",
+    ],
+    "anxiety": [
+        "I can't stop worrying about my exams",
+        "I'm so anxious and stressed, my heart keeps racing",
+        "I haven't slept properly in days because my mind won't stop going over everything that could go wrong",
+    ],
+    "anger": [
+        "My manager yelled at me again and I'm so angry",
+        "I'm frustrated with everyone around me right now",
+    ],
+    "info": [
+        "What is anxiety and how do I know if I have it?",
+        "How can I manage stress at work?",
+        "Can you suggest some techniques for better sleep?",
+        "Where can I find information about depression?",
+    ],
+    "sensitive": [
+        "I've been drinking a lot of alcohol to cope",
+        "Sometimes I think about self-harm",
+    ],
+    "crisis": [
+        "I want to kill myself",
+        "I don't want to live anymore",
+    ],
+    "gratitude": [
+        "thanks, that helped a bit",
+        "thank you for listening",
+        "ok, I'll try that",
+    ],
+}
+
+# Relative frequency of each kind after the first turn
+WEIGHTS = {
+    "sadness": 25,
+    "anxiety": 25,
+    "anger": 10,
+    "info": 20,
+    "sensitive": 5,
+    "crisis": 2,
+    "gratitude": 13,
+}
+
+def seed_everything(seed: Optional[int]):
+    """Seed random and numpy.random so classifier noise and response choices repeat.
+
+    Args:
+        seed: The seed, or None to leave the generators alone
+    """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+
+def build_corpus(conversations: int, turns: int, seed: int = 0) -> List[List[str]]:
+    """Build synthetic multi-turn conversations.
+
+    Args:
+        conversations: Number of conversations
+        turns: Number of user messages per conversation
+        seed: Seed for the corpus itself, independent of seed_everything()
+
+    Returns:
+        One list of user messages per conversation
+    """
+    rng = random.Random(seed)
+    kinds = list(WEIGHTS)
+    weights = [WEIGHTS[kind] for kind in kinds]
+    corpus = []
+    for _ in range(conversations):
+        messages = [rng.choice(MESSAGES["greeting"])]
+        for _ in range(turns - 1):
+            kind = rng.choices(kinds, weights)[0]
+            messages.append(rng.choice(MESSAGES[kind]))
+        corpus.append(messages[:turns])
+    return corpus
+
+async def replay(client, conversations: List[List[str]], concurrency: int):
+    """Replay conversations against /chat, each turn after the previous reply.
+
+    Args:
+        client: An httpx.AsyncClient for the API
+        conversations: The conversations to replay
+        concurrency: Number of conversations in flight at once
+
+    Returns:
+        The turn latencies in seconds and the number of failed turns
+    """
+    latencies = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for conversation in conversations:
+        queue.put_nowait(conversation)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            conversation = queue.get_nowait()
+            session_id = None
+            for message in conversation:
+                started = time.perf_counter()
+                response = await client.post("/chat", json={"message": message, "session_id": session_id})
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+                    break
+                session_id = response.json()["session_id"]
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latencies, errors
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Return the count, mean and p50/p95/p99 of latency samples in milliseconds."""
+    return {
+        "count": len(samples),
+        "mean_ms": sum(samples) / len(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+    }
+
+def format_summary(name: str, samples: List[float], extra: str = "") -> str:
+    stats = summarize(samples)
+    return (
+        f"{name:<28} n={stats['count']:<6} mean {stats['mean_ms']:>8.3f} ms  "
+        f"p50 {stats['p50_ms']:>8.3f} ms  p95 {stats['p95_ms']:>8.3f} ms  p99 {stats['p99_ms']:>8.3f} ms  {extra}"
+    ).rstrip()
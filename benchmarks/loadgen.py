@@ -0,0 +1,88 @@
+"""
+Async load generator for the Mental Health Chatbot API.
+
+Replays the synthetic multi-turn conversation corpus against a running
+server over HTTP and reports throughput and turn latency percentiles.
+With --spawn it starts a local uvicorn first; --seed then also seeds the
+server's random number generators so classifier noise and response choices
+repeat from run to run.
+
+Usage:
+    python benchmarks/loadgen.py --spawn --conversations 200 --concurrency 32 --seed 0
+    python benchmarks/loadgen.py --url http://localhost:8000 --conversations 200
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+
+from corpus import BACKEND, build_corpus, replay, format_summary
+
+import httpx
+
+# Seeds the generators before the app is imported, then serves it
+SERVE = (
+    "import random, sys, numpy, uvicorn\n"
+    "seed = int(sys.argv[1]) if sys.argv[1] != 'none' else None\n"
+    "if seed is not None:\n"
+    "    random.seed(seed)\n"
+    "    numpy.random.seed(seed)\n"
+    "uvicorn.run('app:app', host='127.0.0.1', port=int(sys.argv[2]), log_level='warning')\n"
+)
+
+def spawn_server(port, seed):
+    """Start uvicorn on the backend app in a subprocess."""
+    return subprocess.Popen(
+        [sys.executable, "-c", SERVE, "none" if seed is None else str(seed), str(port)],
+        cwd=BACKEND
+    )
+
+async def wait_ready(client, timeout):
+    """Poll /ready until the server has loaded and warmed up its models."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise TimeoutError(f"server not ready after {timeout:.0f}s")
+
+async def run(args):
+    url = args.url or f"http://127.0.0.1:{args.port}"
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+        await wait_ready(client, args.ready_timeout)
+        corpus = build_corpus(args.conversations, args.turns, args.corpus_seed)
+        started = time.perf_counter()
+        latencies, errors = await replay(client, corpus, args.concurrency)
+        elapsed = time.perf_counter() - started
+
+    print(f"{url}: {args.conversations} conversations x {args.turns} turns, concurrency {args.concurrency}")
+    print(format_summary("/chat turn", latencies, f"{len(latencies) / elapsed:.1f} turns/s, {errors} errors"))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server")
+    parser.add_argument("--spawn", action="store_true", help="start a local uvicorn for the run")
+    parser.add_argument("--port", type=int, default=8765, help="port for --spawn")
+    parser.add_argument("--conversations", type=int, default=200, help="conversations to replay")
+    parser.add_argument("--turns", type=int, default=10, help="user messages per conversation")
+    parser.add_argument("--concurrency", type=int, default=32, help="conversations in flight at once")
+    parser.add_argument("--corpus-seed", type=int, default=0, help="seed for the synthetic corpus")
+    parser.add_argument("--seed", type=int, default=None, help="with --spawn, seed the server's random and numpy.random")
+    parser.add_argument("--ready-timeout", type=float, default=120.0, help="seconds to wait for /ready")
+    args = parser.parse_args()
+    if not args.url and not args.spawn:
+        parser.error("pass --url or --spawn")
+
+    server = spawn_server(args.port, args.seed) if args.spawn else None
+    try:
+        asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
@@ -0,0 +1,137 @@
+"""
+Session contention load test for the Mental Health Chatbot API.
+
+Fires many concurrent turns at the same sessions through an in-process
+ASGI client and checks that every accepted turn was recorded, i.e. that no
+update was lost to interleaving requests.
+
+With --processes N the turns are split between N worker processes, each
+with its own copy of the app, sharing one SQLite session store as gunicorn
+workers do. Per-process session locks cannot serialize those turns, so this
+checks the store's version check and the API's retries instead. Turns that
+still conflict after the retries are rejected with 409, which the client
+sees, and are reported but not expected in the session.
+
+Usage:
+    python benchmarks/session_contention.py --sessions 20 --turns 25
+    python benchmarks/session_contention.py --sessions 20 --turns 25 --processes 4
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# The API lives in backend/ and imports its packages relative to it
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+# Every turn is fired at once; admit them all so that only the session locks are tested
+os.environ.setdefault("ADMISSION_MAX_QUEUE", "100000")
+
+import httpx
+
+MESSAGE = "I have been feeling a bit stressed about work lately"
+
+async def send_turns(app, session_ids, turns: int):
+    """Send `turns` concurrent turns to every session, interleaved across sessions.
+
+    Returns:
+        The status code, requested and returned session ID of every
+        response, and the number of turns run again after a session conflict
+    """
+    from agents.metrics import metrics
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        requested = [session_id for _ in range(turns) for session_id in session_ids]
+        responses = await asyncio.gather(*[
+            client.post("/chat", json={"message": MESSAGE, "session_id": session_id})
+            for session_id in requested
+        ])
+    conflicts = sum(series["value"] for series in metrics.snapshot().get("chatbot_session_conflicts_total", []))
+    results = [
+        (response.status_code, session_id, response.json().get("session_id"))
+        for session_id, response in zip(requested, responses)
+    ]
+    return results, conflicts
+
+def worker(session_ids, turns: int):
+    """Send a share of the turns from a separate worker process."""
+    import app as api
+    return asyncio.run(send_turns(api.app, session_ids, turns))
+
+async def run(num_sessions: int, turns: int, processes: int = 1) -> bool:
+    """Run the contention test.
+
+    Args:
+        num_sessions: Number of sessions to create
+        turns: Number of concurrent turns sent to each session
+        processes: Number of worker processes the turns are split between
+
+    Returns:
+        True if every session recorded every accepted turn
+    """
+    import app as api
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # Open the sessions
+        opened = await asyncio.gather(*[client.post("/chat", json={"message": MESSAGE}) for _ in range(num_sessions)])
+        session_ids = [response.json()["session_id"] for response in opened]
+        if len(set(session_ids)) != num_sessions:
+            print("FAIL: duplicate session IDs were issued")
+            return False
+
+    # Send all follow-up turns at once; with several processes the time
+    # includes starting them
+    started = time.perf_counter()
+    if processes == 1:
+        results, conflicts = await send_turns(api.app, session_ids, turns)
+    else:
+        shares = [turns // processes + (1 if i < turns % processes else 0) for i in range(processes)]
+        with multiprocessing.get_context("spawn").Pool(processes) as pool:
+            parts = pool.starmap(worker, [(session_ids, share) for share in shares])
+        results = [result for part, _ in parts for result in part]
+        conflicts = sum(part_conflicts for _, part_conflicts in parts)
+    elapsed = time.perf_counter() - started
+
+    rejected = [session_id for status, session_id, _ in results if status == 409]
+    failed = [status for status, _, _ in results if status not in (200, 409)]
+    moved = [returned for status, _, returned in results if status == 200 and returned not in session_ids]
+
+    # Each turn appends one user and one assistant message; older ones are
+    # compacted into the rolling summary, which keeps count of them
+    lost = {}
+    for session_id in session_ids:
+        expected = 2 * (turns + 1 - rejected.count(session_id))
+        state = api.sessions.get(session_id)
+        recorded = 0
+        if state:
+            recorded = len(state.conversation)
+            if state.conversation_summary:
+                recorded += state.conversation_summary.messages_summarized
+        if recorded != expected:
+            lost[session_id] = expected - recorded
+
+    total = len(results)
+    print(f"{total} turns over {num_sessions} sessions in {elapsed:.2f}s ({total / elapsed:.1f} turns/s)")
+    print(f"errors: {len(failed)}, session changes: {len(moved)}, sessions with lost turns: {len(lost)}")
+    print(f"conflicts retried: {conflicts}, turns rejected after retries: {len(rejected)}")
+    ok = not failed and not moved and not lost
+    print("PASS" if ok else "FAIL")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20, help="number of sessions")
+    parser.add_argument("--turns", type=int, default=25, help="concurrent turns per session")
+    parser.add_argument("--processes", type=int, default=1, help="worker processes sharing a SQLite session store")
+    args = parser.parse_args()
+    if args.processes > 1:
+        # The workers inherit these settings when they are started
+        os.environ["SESSION_STORE"] = "sqlite"
+        os.environ.setdefault("SESSION_DB_PATH", os.path.join(tempfile.mkdtemp(), "sessions.db"))
+    sys.exit(0 if asyncio.run(run(args.sessions, args.turns, args.processes)) else 1)
@@ -1,14 +1,91 @@
-from transformers import pipeline
+import os
+import threading
 import numpy as np
+from ml_models.batching import MicroBatcher
+from ml_models.score_cache import get_score_cache, normalize_whitespace
+
+MODEL_NAME = "j-hartmann/emotion-english-distilroberta-base"
+
+# Inference backends: full-precision PyTorch, the same model exported to
+# ONNX and run with ONNX Runtime, and that export with int8 weights
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+def default_backend():
+    return os.getenv("EMOTION_BACKEND", "torch")
+
+def onnx_export_dir(model_name=MODEL_NAME):
+    # Exports are written once and reused by every later process
+    root = os.getenv("EMOTION_ONNX_DIR", os.path.join(os.path.expanduser("~"), ".cache", "emotion-onnx"))
+    return os.path.join(root, model_name.replace("/", "--"))
+
+def export_onnx(model_name=MODEL_NAME, output_dir=None, quantize=False):
+    # Export the model to ONNX (and optionally quantize its weights to int8
+    # with dynamic quantization) unless the files are already there, and
+    # return the directory and the file name of the model to load.
+    # Needs the optional onnx extras: pip install optimum[onnxruntime]
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer
+
+    output_dir = output_dir or onnx_export_dir(model_name)
+    model_file = os.path.join(output_dir, "model.onnx")
+    if not os.path.exists(model_file):
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        model.save_pretrained(output_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(output_dir)
+    if not quantize:
+        return output_dir, "model.onnx"
+
+    quantized_file = os.path.join(output_dir, "model_int8.onnx")
+    if not os.path.exists(quantized_file):
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(model_file, quantized_file, weight_type=QuantType.QInt8)
+    return output_dir, "model_int8.onnx"
+
+def load_pipeline(backend=None, model_name=MODEL_NAME):
+    # Imported here so that importing this module stays cheap; the
+    # model itself is only loaded when a classifier is created
+    from transformers import pipeline, AutoTokenizer
+
+    backend = backend or default_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown emotion backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    if backend == "torch":
+        # Build the model straight from the memory-mapped safetensors file
+        # instead of initializing random weights and copying over them, so
+        # loading does not briefly need twice the memory
+        return pipeline("text-classification", model=model_name, top_k=None, model_kwargs={"low_cpu_mem_usage": True})
+
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    model_dir, file_name = export_onnx(model_name, quantize=backend == "onnx-int8")
+    model = ORTModelForSequenceClassification.from_pretrained(model_dir, file_name=file_name)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    return pipeline("text-classification", model=model, tokenizer=tokenizer, top_k=None)
+
+# Emotions whose strongest window decides the score of a long message, so
+# that one despairing paragraph is not averaged away by the rest of it
+RISK_EMOTIONS = ("sadness", "fear", "anger", "disgust")
 
 class EmotionClassifier:
-    def __init__(self):
-        # Initialize the emotion classifier using a pre-trained model
-        self.classifier = pipeline(
-            "text-classification",
-            model="j-hartmann/emotion-english-distilroberta-base",
-            top_k=None
-        )
+    def __init__(self, backend=None, window_overlap=None, max_windows=None):
+        # Initialize the emotion classifier using a pre-trained model, on
+        # the backend chosen by EMOTION_BACKEND unless one is given
+        self.backend = backend or default_backend()
+        self.classifier = load_pipeline(self.backend)
+
+        # Messages longer than the model's input are split into windows of
+        # its maximum length that overlap by window_overlap tokens; at most
+        # max_windows of them are classified per message, at least two so
+        # that the start and the end of a message are always kept
+        tokenizer = self.classifier.tokenizer
+        self.window_tokens = min(tokenizer.model_max_length, 512) - tokenizer.num_special_tokens_to_add()
+        self.window_overlap = window_overlap if window_overlap is not None else int(os.getenv("EMOTION_WINDOW_OVERLAP", 64))
+        self.max_windows = max_windows if max_windows is not None else int(os.getenv("EMOTION_MAX_WINDOWS", 8))
+        if self.max_windows < 2:
+            raise ValueError(f"max_windows must be at least 2, got {self.max_windows}")
+
+        # Scores of repeated messages, shared by the classifiers of this
+        # backend; the model is cased, so the keys keep the case
+        self.cache = get_score_cache(f"transformer.{self.backend}", normalize=normalize_whitespace)
         
         # Define the emotions we want to detect
         self.emotions = [
@@ -16,22 +93,180 @@ class EmotionClassifier:
             "surprise", "disgust", "neutral"
         ]
 
+        # The pipeline is not safe to call from several threads at once,
+        # so callers sharing one instance take turns
+        self._lock = threading.Lock()
+
+    def _format(self, predictions):
+        # Find the emotion with highest confidence
+        primary_emotion = max(predictions, key=lambda x: x['score'])
+
+        # The predictions may be the list held by the cache, so each label
+        # and score is copied into the result
+        return {
+            "primary_emotion": primary_emotion['label'],
+            "confidence": primary_emotion['score'],
+            "all_emotions": [dict(p) for p in predictions]
+        }
+
+    def _fallback(self, error):
+        return {
+            "primary_emotion": "neutral",
+            "confidence": 1.0,
+            "error": str(error)
+        }
+
+    def windows(self, text):
+        # Split a text into overlapping windows of at most window_tokens
+        # tokens; returns the window texts and the number of tokens each
+        # adds to the ones before it, used to weight its scores.
+        # The text is always tokenized to decide: with byte-level BPE one
+        # character (an emoji, most non-Latin scripts) can be several tokens,
+        # so the character count says nothing about whether it fits
+        offsets = self.classifier.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+        count = len(offsets)
+        if count <= self.window_tokens:
+            return [text], [count]
+
+        step = max(1, self.window_tokens - self.window_overlap)
+        last = count - self.window_tokens
+        starts = list(range(0, last, step)) + [last]
+        if len(starts) > self.max_windows:
+            # Spread the allowed windows evenly, always keeping the start and
+            # the end of the message
+            starts = sorted(set(np.linspace(0, last, self.max_windows).round().astype(int).tolist()))
+        windows = [self._window_text(text, offsets, start) for start in starts]
+        weights = [self.window_tokens] + [min(self.window_tokens, b - a) for a, b in zip(starts, starts[1:])]
+        return windows, weights
+
+    def _window_text(self, text, offsets, start):
+        # The text of the window_tokens tokens from start, trimmed to whole
+        # characters: tokens that share a character with a token outside the
+        # window would otherwise pull it in and overflow the model's input
+        end = start + self.window_tokens - 1
+        while start < end and start > 0 and offsets[start][0] < offsets[start - 1][1]:
+            start += 1
+        while end > start and end + 1 < len(offsets) and offsets[end + 1][0] < offsets[end][1]:
+            end -= 1
+        return text[offsets[start][0]:offsets[end][1]]
+
+    def _combine(self, window_predictions, weights):
+        # Max over the windows for the risk emotions and a mean weighted by
+        # the new tokens in each window for the others; the combined scores
+        # no longer add up to one
+        if len(window_predictions) == 1:
+            return window_predictions[0]
+        labels = [p['label'] for p in window_predictions[0]]
+        scores = np.array([[{p['label']: p['score'] for p in predictions}[label] for label in labels] for predictions in window_predictions])
+        mean = np.asarray(weights, dtype=float) @ scores / sum(weights)
+        peak = scores.max(axis=0)
+        combined = [
+            {"label": label, "score": float(peak[i] if label in RISK_EMOTIONS else mean[i])}
+            for i, label in enumerate(labels)
+        ]
+        return sorted(combined, key=lambda p: p['score'], reverse=True)
+
+    def _predict(self, texts):
+        # Run the windows of all texts through the model as one padded batch
+        inputs, spans, weights = [], [], []
+        for text in texts:
+            windows, window_weights = self.windows(text)
+            spans.append((len(inputs), len(inputs) + len(windows)))
+            inputs.extend(windows)
+            weights.append(window_weights)
+        with self._lock:
+            outputs = self.classifier(inputs, batch_size=len(inputs), truncation=True)
+        return [self._combine(outputs[start:end], w) for (start, end), w in zip(spans, weights)]
+
     def classify(self, text):
+        return self.classify_batch([text])[0]
+
+    def _predict_each(self, texts):
+        # Run a batch, and if it fails run its texts one by one, so that a
+        # text the model cannot handle only fails itself and not the other
+        # messages (often other users') batched with it. Failed texts get
+        # their exception in place of predictions
         try:
-            # Get predictions from the model
-            predictions = self.classifier(text)[0]
-            
-            # Find the emotion with highest confidence
-            primary_emotion = max(predictions, key=lambda x: x['score'])
-            
-            return {
-                "primary_emotion": primary_emotion['label'],
-                "confidence": primary_emotion['score'],
-                "all_emotions": predictions
-            }
+            return self._predict(texts)
         except Exception as e:
-            return {
-                "primary_emotion": "neutral",
-                "confidence": 1.0,
-                "error": str(e)
-            } 
\ No newline at end of file
+            if len(texts) == 1:
+                return [e]
+        results = []
+        for text in texts:
+            try:
+                results.append(self._predict([text])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def classify_batch(self, texts):
+        # Only the texts that are not cached go through the model
+        texts = list(texts)
+        if not texts:
+            return []
+        keys = [self.cache.key(text) for text in texts]
+        predictions = [self.cache.get(key) for key in keys]
+        missing = [i for i, p in enumerate(predictions) if p is None]
+        if missing:
+            computed = self._predict_each([texts[i] for i in missing])
+            for i, p in zip(missing, computed):
+                predictions[i] = p
+                if not isinstance(p, Exception):
+                    self.cache.put(keys[i], p)
+        return [self._fallback(p) if isinstance(p, Exception) else self._format(p) for p in predictions]
+
+class BatchingEmotionClassifier:
+    # Drop-in front-end for EmotionClassifier that queues concurrent
+    # classify() calls for up to max_wait_ms and runs them as one batch,
+    # grouping messages of similar length to keep padding low
+    def __init__(self, classifier=None, max_batch_size=16, max_wait_ms=5.0):
+        self.model = classifier or EmotionClassifier()
+        self.emotions = self.model.emotions
+        self.batcher = MicroBatcher(
+            self.model.classify_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms
+        )
+
+    def classify(self, text):
+        return self.batcher(text)
+
+    def submit(self, text):
+        # Queue a text and return a future for its result, so callers can
+        # stop waiting when they run out of time
+        return self.batcher.submit(text)
+
+    async def aclassify(self, text):
+        return await self.batcher.asubmit(text)
+
+    def classify_batch(self, texts):
+        return self.model.classify_batch(texts)
+
+    def stats(self):
+        return self.batcher.stats()
+
+    def close(self):
+        self.batcher.close()
+
+# Process-wide model registry. Every caller in the process (Streamlit
+# sessions, API workers, scripts) shares one loaded model instead of
+# loading its own copy of the pipeline
+_registry = {}
+_registry_lock = threading.RLock()
+
+def get_emotion_classifier(batching=True, backend=None):
+    # The batching front-end wraps the same shared model, so asking for
+    # both kinds still loads the weights only once
+    backend = backend or default_backend()
+    key = ("batching" if batching else "model", backend)
+    classifier = _registry.get(key)
+    if classifier is None:
+        with _registry_lock:
+            classifier = _registry.get(key)
+            if classifier is None:
+                if batching:
+                    classifier = BatchingEmotionClassifier(get_emotion_classifier(batching=False, backend=backend))
+                else:
+                    classifier = EmotionClassifier(backend)
+                _registry[key] = classifier
+    return classifier
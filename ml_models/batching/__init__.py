@@ -0,0 +1,197 @@
+"""
+Micro-Batching Inference Front-End
+
+This module queues concurrent single-item inference calls for a few
+milliseconds and runs them together through a batch function.
+"""
+
+from typing import Dict, Any, List, Callable, Optional
+from concurrent.futures import Future
+import asyncio
+import queue
+import threading
+import time
+
+class MicroBatcher:
+    """Collects concurrent requests into batches for a batch inference function."""
+    
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        length_fn: Callable[[Any], int] = len,
+        bucket_ratio: float = 2.0
+    ):
+        """Initialize the batcher.
+        
+        Args:
+            batch_fn: Function mapping a list of inputs to a list of results, in order
+            max_batch_size: Maximum number of requests collected into one batch
+            max_wait_ms: Maximum time the first request of a batch waits for more
+            length_fn: Function giving the padded length of an input
+            bucket_ratio: Longest/shortest length ratio allowed within one sub-batch
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.length_fn = length_fn
+        self.bucket_ratio = bucket_ratio
+        
+        self.batches = 0
+        self.items = 0
+        
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._closed = False
+        # Set if the worker thread stops on an error it could not attribute
+        # to one batch; queued and later requests then fail with it
+        self._error: Optional[BaseException] = None
+        # The worker thread starts with the first request, so a batcher created
+        # before the server forks its workers gets its thread in each of them
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        
+    def _start(self):
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._worker.start()
+        
+    def submit(self, item: Any) -> Future:
+        """Queue an input for the next batch.
+        
+        Args:
+            item: The input to run through the batch function
+            
+        Returns:
+            A future resolving to the result for this input
+            
+        Raises:
+            RuntimeError: If the batcher is closed or its worker has stopped
+        """
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        if self._error is not None:
+            raise RuntimeError("MicroBatcher worker has stopped") from self._error
+        if self._worker is None:
+            self._start()
+        future: Future = Future()
+        self._queue.put((item, future))
+        if self._error is not None:
+            # The worker stopped while this request was queued
+            self._fail_queued()
+        return future
+    
+    def __call__(self, item: Any) -> Any:
+        """Run an input through the next batch and wait for its result."""
+        return self.submit(item).result()
+    
+    async def asubmit(self, item: Any) -> Any:
+        """Run an input through the next batch without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(item))
+    
+    def close(self):
+        """Stop the worker thread once queued requests are served."""
+        if not self._closed:
+            self._closed = True
+            with self._worker_lock:
+                worker = self._worker
+            if worker is not None:
+                self._queue.put(None)
+                worker.join()
+            
+    def stats(self) -> Dict[str, Any]:
+        """Return batch counters."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0
+        }
+        
+    def _collect(self) -> Optional[List[tuple]]:
+        """Block for the first request, then gather more until the batch is full or the wait expires."""
+        first = self._queue.get()
+        if first is None:
+            return None
+        pending = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                # Serve what we have, then stop
+                self._queue.put(None)
+                break
+            pending.append(request)
+        return pending
+    
+    def _buckets(self, pending: List[tuple]) -> List[List[tuple]]:
+        """Split requests into runs of similar length so each padded sub-batch wastes little."""
+        ordered = sorted(pending, key=lambda request: self.length_fn(request[0]))
+        buckets = [[ordered[0]]]
+        shortest = max(1, self.length_fn(ordered[0][0]))
+        for request in ordered[1:]:
+            length = self.length_fn(request[0])
+            if length > shortest * self.bucket_ratio:
+                buckets.append([])
+                shortest = max(1, length)
+            buckets[-1].append(request)
+        return buckets
+    
+    @staticmethod
+    def _fail(requests: List[tuple], error: BaseException):
+        for _, future in requests:
+            if not future.done():
+                future.set_exception(error)
+                
+    def _fail_queued(self):
+        """Fail every request still queued with the error that stopped the worker."""
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if request is not None:
+                self._fail([request], self._error)
+    
+    def _serve(self, pending: List[tuple]):
+        """Run collected requests through the batch function, one bucket at a time."""
+        for bucket in self._buckets(pending):
+            # Skip requests whose callers have given up
+            bucket = [request for request in bucket if request[1].set_running_or_notify_cancel()]
+            if not bucket:
+                continue
+            try:
+                results = self.batch_fn([item for item, _ in bucket])
+            except Exception as e:
+                self._fail(bucket, e)
+                continue
+            for (_, future), result in zip(bucket, results):
+                future.set_result(result)
+            self.batches += 1
+            self.items += len(bucket)
+    
+    def _run(self):
+        try:
+            while True:
+                pending = self._collect()
+                if pending is None:
+                    return
+                try:
+                    self._serve(pending)
+                except Exception as e:
+                    # Such as length_fn failing on an input; only this batch fails
+                    self._fail(pending, e)
+                    continue
+                unanswered = [request for request in pending if not request[1].done()]
+                if unanswered:
+                    self._fail(unanswered, RuntimeError("Batch function returned fewer results than inputs"))
+        except BaseException as e:
+            self._error = e
+            self._fail_queued()
+            raise
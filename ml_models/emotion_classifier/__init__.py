@@ -4,20 +4,25 @@ Emotion Classifier Model
 This module provides emotion classification capabilities.
 """
 
-from typing import Dict, Any, List, Union, Optional
+from typing import Dict, Any, List, Union, Optional, Sequence, Tuple
 import re
-import random
+import numpy as np
+from ml_models.keyword_matcher import find_in_batch
+from ml_models.score_cache import ScoreCache, get_score_cache
 
 class EmotionClassifier:
     """A placeholder class for emotion classification."""
     
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(self, model_path: Optional[str] = None, cache: Optional[ScoreCache] = None):
         """Initialize the emotion classifier.
         
         Args:
             model_path: Optional path to a model file
+            cache: Cache for the scores of repeated messages; the process-wide
+                "emotion" cache by default
         """
         self.model_path = model_path
+        self.cache = cache if cache is not None else get_score_cache("emotion")
         # In a real implementation, this would load the actual model
         
         # Define emotion keywords for simple rule-based classification
@@ -29,6 +34,26 @@ class EmotionClassifier:
             "neutral": []  # Default
         }
         
+        # Column order of the score matrix returned by classify_batch
+        self.emotions = list(self.emotion_keywords)
+        
+        # One word-boundary alternation over all keywords, longest first,
+        # compiled once so each message is scanned a single time
+        self._keyword_index = {}
+        for emotion_index, emotion in enumerate(self.emotions):
+            for keyword in self.emotion_keywords[emotion]:
+                self._keyword_index[keyword] = emotion_index
+        alternation = "|".join(re.escape(k) for k in sorted(self._keyword_index, key=len, reverse=True))
+        self._keyword_pattern = re.compile(rf"\b(?:{alternation})\b")
+        self._keyword_ids = {keyword: i for i, keyword in enumerate(self._keyword_index)}
+        self._keyword_emotion = np.array(list(self._keyword_index.values()), dtype=np.intp)
+        
+        self._neutral_column = self.emotions.index("neutral")
+        self._keyword_columns = np.array([i for i in range(len(self.emotions)) if i != self._neutral_column], dtype=np.intp)
+        # Upper bounds of the low scores given to texts without keywords
+        self._no_scores = (0.0,) * len(self.emotions)
+        self._neutral_ceilings = np.array([0.3 if self.emotions[i] in ("sadness", "anxiety") else 0.2 for i in self._keyword_columns])
+        
     def classify(self, text: str) -> Dict[str, Any]:
         """Classify the emotions in the given text.
         
@@ -41,53 +66,156 @@ class EmotionClassifier:
         Returns:
             A dictionary with emotion classification results
         """
+        # The cache holds the primary column and the score row, from which
+        # each call builds a fresh result
+        primary, scores = self.cache.get_or_compute(text, lambda rng: self._classify(text, rng))
+        return {
+            "primary_emotion": self.emotions[primary],
+            "confidence": scores[primary],
+            "secondary_emotions": {
+                emotion: scores[i] for i, emotion in enumerate(self.emotions)
+                if i != primary and i != self._neutral_column
+            }
+        }
+    
+    def _classify(self, text: str, rng) -> Tuple[int, Tuple[float, ...]]:
         # In a real implementation, this would use the model for prediction
         # For this placeholder, we'll use a simple keyword-based approach
         
         text_lower = text.lower()
-        emotion_counts = {}
-        
-        # Count emotion keywords
-        for emotion, keywords in self.emotion_keywords.items():
-            if emotion == "neutral":
-                continue
-            count = sum(1 for keyword in keywords if re.search(rf'\b{keyword}\b', text_lower))
-            emotion_counts[emotion] = count
+        counts = [0] * len(self.emotions)
+        
+        # Count distinct emotion keywords with one scan of the precompiled pattern
+        for keyword in set(self._keyword_pattern.findall(text_lower)):
+            counts[self._keyword_index[keyword]] += 1
             
-        # If no emotions detected, default to neutral
-        if sum(emotion_counts.values()) == 0:
-            primary_emotion = "neutral"
+        # The draws from rng are made in the order _score_rows() reads them
+        scores = [0.0] * len(self.emotions)
+        if not any(counts):
+            # If no emotions detected, default to neutral with low random scores
+            primary = self._neutral_column
             confidence = 0.6
-            secondary_emotions = {
-                "sadness": random.uniform(0.0, 0.3),
-                "anxiety": random.uniform(0.0, 0.3),
-                "anger": random.uniform(0.0, 0.2),
-                "joy": random.uniform(0.0, 0.2)
-            }
+            for column, ceiling in zip(self._keyword_columns.tolist(), self._neutral_ceilings.tolist()):
+                scores[column] = rng.uniform(0.0, ceiling)
         else:
-            # Determine primary emotion
-            max_count = max(emotion_counts.values())
-            primary_emotions = [e for e, c in emotion_counts.items() if c == max_count]
-            primary_emotion = random.choice(primary_emotions)
+            # Determine primary emotion, breaking ties at random
+            max_count = max(counts)
+            primary = rng.choice([i for i, count in enumerate(counts) if count == max_count])
             
             # Calculate confidence (0.7-0.95 range)
-            base_confidence = 0.7 + (max_count * 0.05)
-            confidence = min(0.95, base_confidence)
+            confidence = min(0.95, 0.7 + max_count * 0.05)
             
-            # Generate secondary emotions
-            secondary_emotions = {}
-            for emotion in self.emotion_keywords:
-                if emotion == primary_emotion or emotion == "neutral":
-                    continue
-                    
-                # Base score on keyword count with some randomness
-                count = emotion_counts.get(emotion, 0)
-                base_score = 0.2 + (count * 0.1)
-                random_factor = random.uniform(-0.1, 0.1)
-                secondary_emotions[emotion] = max(0.1, min(0.7, base_score + random_factor))
+            # Base secondary scores on keyword count with some randomness
+            for column in self._keyword_columns.tolist():
+                if column != primary:
+                    scores[column] = max(0.1, min(0.7, 0.2 + counts[column] * 0.1 + rng.uniform(-0.1, 0.1)))
+        scores[primary] = confidence
+        return primary, tuple(scores)
+    
+    def keyword_counts(self, texts: Sequence[str]) -> np.ndarray:
+        """Count the distinct keywords of each emotion in each text.
+        
+        All texts are scanned as one joined string, so the regex engine makes
+        a single pass over the whole batch.
+        
+        Args:
+            texts: The texts to count keywords in
+            
+        Returns:
+            An integer array of shape (len(texts), len(self.emotions))
+        """
+        counts = np.zeros((len(texts), len(self.emotions)), dtype=np.int64)
+        text_ids, keywords = find_in_batch(self._keyword_pattern, texts)
+        if not keywords:
+            return counts
+        keyword_ids = np.fromiter((self._keyword_ids[k] for k in keywords), dtype=np.int64, count=len(keywords))
+        
+        # Each keyword counts once per text, however often it occurs
+        pairs = np.unique(text_ids * len(self._keyword_ids) + keyword_ids)
+        text_ids, keyword_ids = np.divmod(pairs, len(self._keyword_ids))
+        np.add.at(counts, (text_ids, self._keyword_emotion[keyword_ids]), 1)
+        return counts
+    
+    def _score_rows(self, counts: np.ndarray, noise: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Apply _classify()'s rules to a keyword count matrix with array operations.
+        
+        Args:
+            counts: Keyword counts, as returned by keyword_counts()
+            noise: Uniform draws in [0, 1), four per text, as returned by
+                ScoreCache.noise()
+            
+        Returns:
+            The primary column of each text and its score matrix
+        """
+        n = len(counts)
+        columns = self._keyword_columns
+        keyword_counts = counts[:, columns]
+        max_count = keyword_counts.max(axis=1)
+        is_neutral = max_count == 0
+        
+        # The first draw picks among the equally frequent emotions
+        ties = keyword_counts == max_count[:, None]
+        pick = (noise[:, 0] * ties.sum(axis=1)).astype(np.intp)
+        primary = columns[np.argmax(np.cumsum(ties, axis=1) > pick[:, None], axis=1)]
+        primary = np.where(is_neutral, self._neutral_column, primary)
+        confidence = np.where(is_neutral, 0.6, np.minimum(0.95, 0.7 + max_count * 0.05))
+        
+        # The following draws go to the other emotions in column order
+        slots = np.minimum(1 + columns - (columns > primary[:, None]), noise.shape[1] - 1)
+        factors = -0.1 + (0.1 - -0.1) * np.take_along_axis(noise, slots, axis=1)
+        secondary = np.clip(0.2 + keyword_counts * 0.1 + factors, 0.1, 0.7)
+        
+        # Texts without keywords use the draws in order for their low scores
+        scores = np.zeros((n, len(self.emotions)))
+        neutral_scores = 0.0 + (self._neutral_ceilings - 0.0) * noise[:, :len(columns)]
+        scores[:, columns] = np.where(is_neutral[:, None], neutral_scores, secondary)
+        scores[np.arange(n), primary] = confidence
+        return primary, scores
+    
+    def _score_texts(self, texts: Sequence[str], keys: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+        if len(texts) == 1:
+            # Setting up the arrays costs more than scoring one text directly
+            primary, scores = self._classify(texts[0], self.cache.rng(keys[0]))
+            return np.array([primary], dtype=np.intp), np.array([scores])
+        return self._score_rows(self.keyword_counts(texts), self.cache.noise(keys, 4))
+    
+    def classify_batch(self, texts: Sequence[str]) -> Dict[str, Any]:
+        """Classify the emotions in a batch of texts.
+        
+        Cached texts are looked up together; the rest are scored with array
+        operations in one pass. Their noise comes from the same seeds as in
+        classify(), so each text gets the same result as classifying it alone.
+        
+        Args:
+            texts: The texts to classify emotions from
+            
+        Returns:
+            A dictionary with the column order ("emotions"), a score matrix
+            ("scores", shape (len(texts), len(emotions))), the index and name
+            of each primary emotion, and each primary emotion's confidence
+        """
+        n = len(texts)
+        keys = [self.cache.key(text) for text in texts]
+        cached = self.cache.get_many(keys)
+        misses = [i for i, value in enumerate(cached) if value is None]
+        
+        if len(misses) == n:
+            primary, scores = self._score_texts(texts, keys)
+            self.cache.put_many(keys, zip(primary.tolist(), map(tuple, scores.tolist())))
+        else:
+            primary = np.array([value[0] if value is not None else 0 for value in cached], dtype=np.intp)
+            scores = np.array([value[1] if value is not None else self._no_scores for value in cached]).reshape(n, len(self.emotions))
+            if misses:
+                miss_keys = [keys[i] for i in misses]
+                miss_primary, miss_scores = self._score_texts([texts[i] for i in misses], miss_keys)
+                primary[misses] = miss_primary
+                scores[misses] = miss_scores
+                self.cache.put_many(miss_keys, zip(miss_primary.tolist(), map(tuple, miss_scores.tolist())))
         
         return {
-            "primary_emotion": primary_emotion,
-            "confidence": confidence,
-            "secondary_emotions": secondary_emotions
-        } 
\ No newline at end of file
+            "emotions": list(self.emotions),
+            "scores": scores,
+            "primary_index": primary,
+            "primary_emotion": np.array(self.emotions, dtype=object)[primary] if n else np.array([], dtype=object),
+            "confidence": scores[np.arange(n), primary]
+        }
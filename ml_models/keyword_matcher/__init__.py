@@ -0,0 +1,199 @@
+"""
+Keyword Matcher
+
+This module provides a shared multi-pattern keyword matcher. Every lexicon
+used by the agents and models is compiled into one Aho-Corasick automaton,
+and a message is scanned once to find every hit in every lexicon.
+"""
+
+from typing import Dict, Any, List, Optional, Pattern, Sequence, Set, Tuple, Iterable, NamedTuple
+from collections import OrderedDict, deque
+import hashlib
+import threading
+import numpy as np
+
+class KeywordHit(NamedTuple):
+    """A keyword found in a text."""
+    category: str
+    keyword: str
+    start: int
+    end: int
+
+class _Automaton:
+    """Compiled Aho-Corasick automaton with a dense transition table."""
+    
+    def __init__(self, patterns: List[Tuple[str, str]]):
+        """Build the automaton.
+        
+        Args:
+            patterns: (category, lowercase keyword) pairs
+        """
+        self.patterns = patterns
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        
+        # Trie of all keywords
+        for pattern_id, (_, keyword) in enumerate(patterns):
+            node = 0
+            for ch in keyword:
+                if ch not in goto[node]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[node][ch] = len(goto) - 1
+                node = goto[node][ch]
+            outputs[node].append(pattern_id)
+            
+        # Failure links, breadth first; each node inherits the outputs of its
+        # failure node and missing transitions are filled in from it, which
+        # turns the trie into a DFA that never backtracks while scanning
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(edges) for edges in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                fail[child] = delta[fail[node]].get(ch, 0) if node else 0
+                outputs[child] = outputs[child] + outputs[fail[child]]
+            for ch, target in delta[fail[node]].items():
+                delta[node].setdefault(ch, target)
+                
+        self.delta = delta
+        self.outputs = outputs
+        
+    def scan(self, text: str) -> List[KeywordHit]:
+        """Return every keyword occurrence in the (already lowercased) text."""
+        delta = self.delta
+        outputs = self.outputs
+        patterns = self.patterns
+        hits = []
+        state = 0
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                for pattern_id in outputs[state]:
+                    category, keyword = patterns[pattern_id]
+                    hits.append(KeywordHit(category, keyword, i + 1 - len(keyword), i + 1))
+        return hits
+
+def find_in_batch(pattern: Pattern[str], texts: Sequence[str], group: int = 0) -> Tuple[np.ndarray, List[str]]:
+    """Find a regex's matches in the lowercased texts of a batch in one pass.
+    
+    The texts are joined with newlines, which are word boundaries, and
+    scanned as one string. Boundaries are taken from the lowercased texts,
+    since lowercasing can change a text's length ("İ" becomes two characters).
+    
+    Args:
+        pattern: The compiled pattern, written for lowercase text
+        texts: The texts to scan
+        group: The group reported for each match
+        
+    Returns:
+        The index of the text each match is in, and the matched strings
+    """
+    lowered = [text.lower() for text in texts]
+    matches = list(pattern.finditer("\n".join(lowered)))
+    if not matches:
+        return np.zeros(0, dtype=np.int64), []
+    starts = np.cumsum([0] + [len(text) + 1 for text in lowered[:-1]])
+    positions = np.fromiter((m.start() for m in matches), dtype=np.int64, count=len(matches))
+    return np.searchsorted(starts, positions, side="right") - 1, [m.group(group) for m in matches]
+
+class KeywordMatcher:
+    """Case-insensitive matcher over a set of named keyword lexicons."""
+    
+    def __init__(self, memo_size: int = 128):
+        """Initialize an empty matcher.
+        
+        Args:
+            memo_size: Number of recent texts whose hits are remembered, so
+                that the agents of one turn share a single scan
+        """
+        self.memo_size = memo_size
+        self._lexicons: Dict[str, List[str]] = {}
+        self._automaton: Optional[_Automaton] = None
+        self._memo: "OrderedDict[bytes, Dict[str, Set[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+    def register(self, category: str, keywords: Iterable[str]) -> None:
+        """Add or replace a lexicon.
+        
+        Args:
+            category: The lexicon name reported with each hit
+            keywords: The keywords of the lexicon
+        """
+        with self._lock:
+            self._lexicons[category] = [keyword.lower() for keyword in keywords if keyword]
+            self._automaton = None
+            self._memo.clear()
+            
+    def compile(self) -> None:
+        """Build the automaton over all registered lexicons."""
+        self._compiled()
+        
+    def _compiled(self) -> _Automaton:
+        automaton = self._automaton
+        if automaton is None:
+            with self._lock:
+                if self._automaton is None:
+                    patterns = [
+                        (category, keyword)
+                        for category, keywords in self._lexicons.items()
+                        for keyword in dict.fromkeys(keywords)
+                    ]
+                    self._automaton = _Automaton(patterns)
+                automaton = self._automaton
+        return automaton
+    
+    def scan(self, text: str) -> List[KeywordHit]:
+        """Find every keyword of every lexicon in the text in one pass.
+        
+        Args:
+            text: The text to scan
+            
+        Returns:
+            The hits with their category and character offsets
+        """
+        lowered = text.lower()
+        hits = self._compiled().scan(lowered)
+        if not hits or len(lowered) == len(text):
+            return hits
+
+        # Some characters lowercase to several ("İ" becomes "i̇"), which
+        # shifts the offsets; map them back to the characters of the text
+        origin = [i for i, ch in enumerate(text) for _ in ch.lower()]
+        return [hit._replace(start=origin[hit.start], end=origin[hit.end - 1] + 1) for hit in hits]
+    
+    def match(self, text: str) -> Dict[str, Set[str]]:
+        """Return the keywords found in the text, grouped by lexicon.
+        
+        Results for recent texts are remembered (keyed by a hash of the text,
+        not the text itself), so several agents checking the same message
+        share one scan.
+        
+        Args:
+            text: The text to scan
+            
+        Returns:
+            A dictionary mapping lexicon names to the keywords found
+        """
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._lock:
+            found = self._memo.get(key)
+            if found is not None:
+                self._memo.move_to_end(key)
+                return found
+            
+        found: Dict[str, Set[str]] = {}
+        for hit in self.scan(text):
+            found.setdefault(hit.category, set()).add(hit.keyword)
+            
+        with self._lock:
+            self._memo[key] = found
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return found
+
+# The matcher shared by all agents and models, so one automaton covers
+# every lexicon
+shared_matcher = KeywordMatcher()
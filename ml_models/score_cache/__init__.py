@@ -0,0 +1,238 @@
+"""
+Score Cache
+
+This module provides a bounded LRU cache for classifier scores. Entries are
+keyed by a hash of the normalized message text and hold only the scores, so
+the raw text of a message is never kept. Short messages such as "hi" or
+"thanks" repeat across users and are scored once.
+"""
+
+from typing import Dict, Any, Callable, Iterable, List, Optional, Sequence
+from collections import OrderedDict
+import hashlib
+import os
+import random
+import threading
+import numpy as np
+
+# SplitMix64 constants. Draw j of a text's noise is a hash of its seed and j,
+# so any draw of any number of texts can be computed in one array operation
+_GAMMA = 0x9E3779B97F4A7C15
+_MIX1 = 0xBF58476D1CE4E5B9
+_MIX2 = 0x94D049BB133111EB
+_MASK = (1 << 64) - 1
+
+class SeededNoise:
+    """Random generator for one text whose draws match ScoreCache.noise()."""
+    
+    def __init__(self, seed: int):
+        self.seed = seed
+        self.draws = 0
+        
+    def random(self) -> float:
+        """Return the next float in [0, 1)."""
+        self.draws += 1
+        z = (self.seed + self.draws * _GAMMA) & _MASK
+        z = ((z ^ (z >> 30)) * _MIX1) & _MASK
+        z = ((z ^ (z >> 27)) * _MIX2) & _MASK
+        return ((z ^ (z >> 31)) >> 11) * 2.0 ** -53
+    
+    def uniform(self, low: float, high: float) -> float:
+        """Return the next float in [low, high), computed as random.uniform does."""
+        return low + (high - low) * self.random()
+    
+    def choice(self, seq: Sequence[Any]) -> Any:
+        """Return an element of seq, using one draw."""
+        return seq[int(self.random() * len(seq))]
+
+def normalize_text(text: str) -> str:
+    """Lowercase the text and collapse runs of whitespace."""
+    return " ".join(text.lower().split())
+
+def normalize_whitespace(text: str) -> str:
+    """Collapse runs of whitespace, keeping the case for cased models."""
+    return " ".join(text.split())
+
+class ScoreCache:
+    """Thread-safe LRU cache of scores keyed by a normalized-text hash."""
+    
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        deterministic: bool = True,
+        normalize: Callable[[str], str] = normalize_text
+    ):
+        """Initialize an empty cache.
+        
+        Args:
+            maxsize: Maximum number of entries; 0 disables caching
+            deterministic: Whether classifiers should draw their random noise
+                from a generator seeded by the text hash, so that a cached
+                result is the same as scoring the text again
+            normalize: Function mapping texts that score the same to one key
+        """
+        self.maxsize = maxsize
+        self.deterministic = deterministic
+        self.normalize = normalize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[bytes, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+    def key(self, text: str) -> bytes:
+        """Return the cache key of a text."""
+        return hashlib.blake2b(self.normalize(text).encode("utf-8"), digest_size=16).digest()
+    
+    def rng(self, key: bytes):
+        """Return the random generator a classifier should use for a text.
+        
+        In deterministic mode this is a generator seeded by the key; otherwise
+        it is the global random module, as before.
+        """
+        if self.deterministic:
+            return SeededNoise(int.from_bytes(key[:8], "big"))
+        return random
+    
+    def noise(self, keys: Sequence[bytes], draws: int) -> np.ndarray:
+        """Return the first draws of rng() for many keys at once.
+        
+        Args:
+            keys: The cache keys of the texts being scored
+            draws: Number of draws per text
+            
+        Returns:
+            A float array of shape (len(keys), draws) in [0, 1); row i holds
+            the values rng(keys[i]).random() would return, in order
+        """
+        if not self.deterministic:
+            return np.random.random_sample((len(keys), draws))
+        seeds = np.frombuffer(b"".join(key[:8] for key in keys), dtype=">u8").astype(np.uint64)
+        z = seeds[:, None] + np.arange(1, draws + 1, dtype=np.uint64) * np.uint64(_GAMMA)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(_MIX1)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(_MIX2)
+        return ((z ^ (z >> np.uint64(31))) >> np.uint64(11)) * 2.0 ** -53
+    
+    def get(self, key: bytes) -> Optional[Any]:
+        """Return the cached scores for a key, or None on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+        
+    def put(self, key: bytes, value: Any) -> None:
+        """Store the scores for a key, evicting the least recently used entries."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+                
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[Any]]:
+        """Return the cached scores for each key, None for misses, under one lock."""
+        if self.maxsize <= 0:
+            with self._lock:
+                self.misses += len(keys)
+            return [None] * len(keys)
+        with self._lock:
+            entries = self._entries
+            values = [entries.get(key) for key in keys]
+            for key, value in zip(keys, values):
+                if value is not None:
+                    entries.move_to_end(key)
+            found = len(values) - values.count(None)
+            self.hits += found
+            self.misses += len(values) - found
+        return values
+    
+    def put_many(self, keys: Iterable[bytes], values: Iterable[Any]) -> None:
+        """Store the scores for several keys under one lock."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            entries = self._entries
+            for key, value in zip(keys, values):
+                entries[key] = value
+                entries.move_to_end(key)
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+                self.evictions += 1
+                
+    def get_or_compute(self, text: str, compute: Callable[[Any], Any]) -> Any:
+        """Return the cached scores for a text, computing them on a miss.
+        
+        Args:
+            text: The text being scored
+            compute: Function of the random generator (see rng()) returning
+                the scores
+            
+        Returns:
+            The cached or freshly computed scores
+        """
+        key = self.key(text)
+        value = self.get(key)
+        if value is None:
+            value = compute(self.rng(key))
+            self.put(key, value)
+        return value
+    
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+            
+    def stats(self) -> Dict[str, Any]:
+        """Return the size, counters and hit rate of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "deterministic": self.deterministic
+            }
+
+# Process-wide caches by name, shared by every instance of a classifier
+_caches: Dict[str, ScoreCache] = {}
+_caches_lock = threading.Lock()
+
+def get_score_cache(name: str, normalize: Callable[[str], str] = normalize_text) -> ScoreCache:
+    """Return the process-wide cache with the given name, creating it if needed.
+    
+    New caches are sized by SCORE_CACHE_SIZE (0 disables caching) and use
+    deterministic noise unless SCORE_CACHE_DETERMINISTIC is 0.
+    
+    Args:
+        name: The cache name, e.g. "emotion" or "toxicity"
+        normalize: Text normalization used for the keys of a new cache
+        
+    Returns:
+        The shared cache
+    """
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = ScoreCache(
+                maxsize=int(os.getenv("SCORE_CACHE_SIZE", 4096)),
+                deterministic=os.getenv("SCORE_CACHE_DETERMINISTIC", "1") != "0",
+                normalize=normalize
+            )
+            _caches[name] = cache
+        return cache
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the stats of every process-wide cache, by name."""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -4,21 +4,42 @@ Toxicity Moderator Model
 This module provides toxicity detection capabilities.
 """
 
-from typing import Dict, Any, List, Union, Optional
-import random
+from typing import Dict, Any, List, Union, Optional, Sequence
+import re
+import numpy as np
+from ml_models.keyword_matcher import shared_matcher, find_in_batch
+from ml_models.score_cache import ScoreCache, get_score_cache
 
 class ToxicityModerator:
     """A placeholder class for toxicity detection."""
     
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(self, model_path: Optional[str] = None, cache: Optional[ScoreCache] = None):
         """Initialize the toxicity moderator.
         
         Args:
             model_path: Optional path to a model file
+            cache: Cache for the scores of repeated messages; the process-wide
+                "toxicity" cache by default
         """
         self.model_path = model_path
+        self.cache = cache if cache is not None else get_score_cache("toxicity")
         # In a real implementation, this would load the actual model
         
+        # List of potentially concerning terms
+        self.concerning_terms = [
+            "kill", "die", "suicide", "hurt", "harm", "hate",
+            "stupid", "idiot", "dumb", "useless", "worthless"
+        ]
+        
+        # Lookahead alternation so overlapping terms are all found in one scan
+        alternation = "|".join(re.escape(t) for t in sorted(self.concerning_terms, key=len, reverse=True))
+        self._term_pattern = re.compile(rf"(?=({alternation}))")
+        self._term_ids = {term: i for i, term in enumerate(self.concerning_terms)}
+        
+        # Single messages are matched by the shared keyword automaton
+        self.matcher = shared_matcher
+        self.matcher.register("toxicity.concerning_terms", self.concerning_terms)
+        
     def check_toxicity(self, text: str) -> float:
         """Check the toxicity of the given text.
         
@@ -31,23 +52,83 @@ class ToxicityModerator:
         Returns:
             A toxicity score between 0.0 and 1.0
         """
+        return self.cache.get_or_compute(text, lambda rng: self._check_toxicity(text, rng))
+    
+    def _check_toxicity(self, text: str, rng) -> float:
         # In a real implementation, this would use the model to predict toxicity
         # For this placeholder, we'll use a simple heuristic
         
-        # List of potentially concerning terms
-        concerning_terms = [
-            "kill", "die", "suicide", "hurt", "harm", "hate",
-            "stupid", "idiot", "dumb", "useless", "worthless"
-        ]
-        
-        # Count occurrences of concerning terms
-        text_lower = text.lower()
-        count = sum(1 for term in concerning_terms if term in text_lower)
+        # Count the distinct concerning terms present
+        count = len(self.matcher.match(text).get("toxicity.concerning_terms", ()))
         
         # Calculate a basic score based on term count
         base_score = min(count * 0.2, 0.8)
         
         # Add some randomness for demonstration purposes
-        random_factor = random.uniform(-0.1, 0.1)
+        random_factor = rng.uniform(-0.1, 0.1)
+        
+        return max(0.0, min(1.0, base_score + random_factor))
+    
+    def term_counts(self, texts: Sequence[str]) -> np.ndarray:
+        """Count the distinct concerning terms in each text.
+        
+        All texts are scanned as one joined string in a single regex pass.
         
-        return max(0.0, min(1.0, base_score + random_factor)) 
\ No newline at end of file
+        Args:
+            texts: The texts to count terms in
+            
+        Returns:
+            An integer array of shape (len(texts),)
+        """
+        counts = np.zeros(len(texts), dtype=np.int64)
+        text_ids, terms = find_in_batch(self._term_pattern, texts, group=1)
+        if not terms:
+            return counts
+        term_ids = np.fromiter((self._term_ids[t] for t in terms), dtype=np.int64, count=len(terms))
+        
+        # Each term counts once per text, however often it occurs
+        pairs = np.unique(text_ids * len(self._term_ids) + term_ids)
+        np.add.at(counts, pairs // len(self._term_ids), 1)
+        return counts
+    
+    def check_toxicity_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Check the toxicity of a batch of texts.
+        
+        Cached texts are looked up together; the rest are scored with array
+        operations in one pass, with noise from the same seeds as in
+        check_toxicity(), so each text gets the same score as checking it
+        alone.
+        
+        Args:
+            texts: The texts to check for toxicity
+            
+        Returns:
+            An array of toxicity scores between 0.0 and 1.0, one per text
+        """
+        keys = [self.cache.key(text) for text in texts]
+        cached = self.cache.get_many(keys)
+        misses = [i for i, value in enumerate(cached) if value is None]
+        if len(misses) == len(texts):
+            scores = self._score_texts(texts, keys)
+            self.cache.put_many(keys, scores.tolist())
+            return scores
+        
+        scores = np.array([value if value is not None else 0.0 for value in cached], dtype=float)
+        if misses:
+            miss_keys = [keys[i] for i in misses]
+            miss_scores = self._score_texts([texts[i] for i in misses], miss_keys)
+            scores[misses] = miss_scores
+            self.cache.put_many(miss_keys, miss_scores.tolist())
+        return scores
+    
+    def _score_texts(self, texts: Sequence[str], keys: List[bytes]) -> np.ndarray:
+        if len(texts) == 1:
+            # Setting up the arrays costs more than scoring one text directly
+            return np.array([self._check_toxicity(texts[0], self.cache.rng(keys[0]))])
+        return self._score_rows(self.term_counts(texts), self.cache.noise(keys, 1))
+    
+    def _score_rows(self, counts: np.ndarray, noise: np.ndarray) -> np.ndarray:
+        """Apply _check_toxicity()'s rules to term counts, with one uniform draw per text."""
+        base_scores = np.minimum(counts * 0.2, 0.8)
+        random_factors = -0.1 + (0.1 - -0.1) * noise[:, 0]
+        return np.clip(base_scores + random_factors, 0.0, 1.0)